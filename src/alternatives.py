@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# alternatives.py
+"""
+Enumerates several distinct timetables from a single model build.
+
+The model is built once. After each solution a diversity cut is added: the
+next timetable must differ from every earlier one in at least --min-diff
+slots (theory cells and per-group lab windows). Each timetable is streamed
+as one JSON line as soon as it is found, so a department head can be given
+"a few alternatives" without editing data.json and re-running.
+
+Reads from:
+- config.json
+- data.json
+
+Writes to:
+- alternatives.jsonl (one record per timetable)
+
+Usage:
+    python3 alternatives.py
+    python3 alternatives.py --count 10 --min-diff 20
+    python3 alternatives.py --sections CSE-7 IT-7 --output cse7_alternatives.jsonl
+    python3 alternatives.py --no-profile
+"""
+
+import argparse
+import json
+import sys
+import time
+from ortools.sat.python import cp_model
+from engine import (add_profile_arguments, apply_solution, apply_solver_profile, build_instance, build_model,
+                    extract_solution, load_data, load_solver_profile, print_model_stats, prune_domains, report_failure,
+                    share_rows)
+
+
+def decision_values(solver, variables):
+    """Returns {key: value} of the slots alternatives are compared on."""
+    values = {('theory',) + key: solver.Value(var) for key, var in variables['new_classes'].items()}
+    values.update({('lab',) + key: solver.Value(var) for key, var in variables['lab_subject'].items()})
+    return values
+
+
+def decision_exprs(variables):
+    """Returns {key: variable or expression}, with the same keys as decision_values()."""
+    exprs = {('theory',) + key: var for key, var in variables['new_classes'].items()}
+    exprs.update({('lab',) + key: var for key, var in variables['lab_subject'].items()})
+    return exprs
+
+
+def add_diversity_cut(model, exprs, values, min_diff):
+    """Requires the next solution to differ from `values` in at least min_diff slots."""
+    differs = []
+    for key, expr in exprs.items():
+        d = model.NewBoolVar(f"differs_{len(differs)}")
+        model.Add(expr != values[key]).OnlyEnforceIf(d)
+        differs.append(d)
+    model.Add(sum(differs) >= min(min_diff, len(differs)))
+
+
+def distance(a, b):
+    """Number of slots in which two solutions differ."""
+    return sum(1 for key in a if a[key] != b[key])
+
+
+def enumerate_timetables(config_data, timetable_data, sections, count, min_diff, output_path,
+                         formulation="int", resources="slot", solver_params=""):
+    """
+    Finds up to `count` timetables, each differing from all earlier ones in
+    at least min_diff slots, and appends them to output_path as they come.
+    solver_params (see engine.load_solver_profile()) apply to every solve.
+
+    Returns the number of timetables found.
+    """
+    start = time.perf_counter()
+    inst = build_instance(config_data, timetable_data, sections)
+    _, impossible_cells = prune_domains(inst)
+    if impossible_cells:
+        report_failure(cp_model.INFEASIBLE)
+        return 0
+    model, variables = build_model(inst, formulation, resources)
+    print_model_stats(model, time.perf_counter() - start, f"{formulation}/{resources}")
+    exprs = decision_exprs(variables)
+
+    found = []
+    status = None
+    with open(output_path, 'w') as out:
+        while len(found) < count:
+            solver = cp_model.CpSolver()
+            apply_solver_profile(solver, solver_params)
+            solver.parameters.max_time_in_seconds = config_data['settings']['solver_timeout_seconds']
+            status = solver.Solve(model)
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+
+            values = decision_values(solver, variables)
+            nearest = min((distance(values, other) for other in found), default=None)
+            timetable = share_rows(timetable_data)
+            apply_solution(timetable, inst, extract_solution(solver, inst, variables))
+            out.write(json.dumps({'index': len(found) + 1, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                  'seconds': time.perf_counter() - start, 'min_differing_slots': nearest,
+                                  'timetable': timetable}) + "\n")
+            out.flush()
+            found.append(values)
+            print(f"  ✓ Timetable {len(found)} after {time.perf_counter() - start:.3f}s"
+                  + (f", differs from the closest earlier one in {nearest} slots" if nearest is not None else ""))
+            add_diversity_cut(model, exprs, values, min_diff)
+
+    if len(found) < count:
+        if status == cp_model.INFEASIBLE and found:
+            print(f"No further timetable differs from all earlier ones in {min_diff} slots.")
+        elif status is not None:
+            report_failure(status)
+    return len(found)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate distinct timetables from one model build.")
+    parser.add_argument('--sections', nargs='+', help="Sections to solve (default: all sections in config.json)")
+    parser.add_argument('--count', type=int, default=5, help="Maximum number of timetables")
+    parser.add_argument('--min-diff', type=int, default=10,
+                        help="Minimum number of slots in which each timetable differs from every earlier one")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json')
+    parser.add_argument('--output', default='alternatives.jsonl')
+    parser.add_argument('--formulation', choices=["int", "bool"], default="int")
+    parser.add_argument('--resources', choices=["slot", "interval"], default="slot")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config_data, timetable_data = load_data(args.config, args.data)
+    sections = args.sections or list(config_data['sections'])
+    found = enumerate_timetables(config_data, timetable_data, sections, args.count, args.min_diff, args.output,
+                                 args.formulation, args.resources, load_solver_profile(args.profile))
+    if not found:
+        sys.exit(1)
+    print(f"✅ Wrote {found} timetable(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
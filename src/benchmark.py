@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# benchmark.py
+"""
+Synthetic scale benchmark for the timetable solver.
+
+Generates valid config.json/data.json pairs at chosen scales (sections,
+teachers, lab rooms, share of "To Be Assigned" classes), runs the engine
+on each of them in a fresh process and appends one JSON record per run to
+a results file:
+
+- model build time (instance + pruning + model)
+- variable and constraint counts
+- time to the first feasible solution and total solve time
+- solver status and peak RSS of the process
+
+Records carry a --label (e.g. a version or commit) so runs of two versions
+can be compared with --baseline.
+
+Writes to:
+- benchmark_results.jsonl
+
+Usage:
+    python3 benchmark.py
+    python3 benchmark.py --sections 7 28 84 --formulation int bool --label v2
+    python3 benchmark.py --sections 28 --baseline benchmark_results.jsonl --label v2
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+SLOTS = ["9-10", "10-11", "11-12", "12-1", "2-3", "3-4", "4-5"]
+LAB_SLOTS = ["9-11", "11-1", "3-5"]
+# Theory may use one 2-hour window per day plus the 2-3 slot; the other windows stay free for labs
+THEORY_WINDOWS = [("9-10", "10-11"), ("11-12", "12-1"), ("3-4", "4-5")]
+
+
+def generate_instance(num_sections, num_teachers, num_lab_rooms, tba_density=0.9, subjects_per_section=4,
+                      labs_per_section=3, timeout=60):
+    """
+    Returns (config, data) for a synthetic faculty.
+
+    Every section has its own theory room and subjects_per_section core
+    subjects taught 3 times a week, laid out so that each subject is taught
+    at most once a day and two lab windows stay free every day. A share
+    (1 - tba_density) of those classes is pre-assigned where the teacher is
+    not already busy; the rest are "To Be Assigned". Teachers are shared
+    round-robin across sections. The result is well formed but not
+    guaranteed to be feasible.
+    """
+    teachers = [f"T{i:03d}" for i in range(num_teachers)]
+    config = {
+        'settings': {
+            'days': DAYS,
+            'all_slots': SLOTS,
+            'lab_slot': LAB_SLOTS,
+            'groups': ["A", "B"],
+            'solver_timeout_seconds': timeout,
+        },
+        'sections': [],
+        'section_theory_rooms': {},
+        'lab_rooms': [f"L{i:03d}" for i in range(num_lab_rooms)],
+        'core_subjects': {},
+        'subjects': {},
+        'labs': {},
+    }
+    data = {day: [] for day in DAYS}
+    teacher_busy = set()  # (teacher, day, slot) of pre-assigned classes
+    assigned_index = 0
+
+    for i in range(num_sections):
+        section = f"SEC{i}-{3 + 2 * (i % 3)}"
+        subjects = [f"SUB{j}" for j in range(subjects_per_section)]
+        teacher_of = {s: teachers[(i * subjects_per_section + j) % num_teachers] for j, s in enumerate(subjects)}
+        labs = [f"{s} Lab" for s in subjects[:labs_per_section]]
+        config['sections'].append(section)
+        config['section_theory_rooms'][section] = f"R{i:03d}"
+        config['core_subjects'][section] = subjects
+        config['subjects'][section] = [[s, teacher_of[s]] for s in subjects]
+        config['labs'][section] = labs
+
+        # Candidate theory cells, day by day; the theory window rotates with the section
+        cells = []
+        for d, day in enumerate(DAYS):
+            window = THEORY_WINDOWS[(i + d) % len(THEORY_WINDOWS)]
+            cells += [(day, window[0]), (day, window[1]), (day, "2-3")]
+        classes = 3 * subjects_per_section
+        # Consecutive cells of a day get different subjects (cell k -> subject k mod n)
+        planned = {cell: subjects[k % subjects_per_section] for k, cell in enumerate(cells[:classes])}
+
+        rows = {day: {'section': section} for day in DAYS}
+        for day in DAYS:
+            for slot in SLOTS:
+                rows[day][slot] = [{'status': "Free"}]
+        for (day, slot), subject in planned.items():
+            teacher = teacher_of[subject]
+            pre_assign = (assigned_index % 100) >= tba_density * 100
+            assigned_index += 1
+            if pre_assign and (teacher, day, slot) not in teacher_busy:
+                teacher_busy.add((teacher, day, slot))
+                rows[day][slot] = [{'status': "Assigned", 'subject': subject, 'teacher': teacher,
+                                    'room': config['section_theory_rooms'][section]}]
+            else:
+                rows[day][slot] = [{'status': "To Be Assigned"}]
+        for day in DAYS:
+            data[day].append(rows[day])
+
+    return config, data
+
+
+def measure(directory, formulation, resources):
+    """Solves one instance with engine.solve_sections() in this process and returns its metrics."""
+    from engine import load_data, solve_sections
+
+    metrics = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        config, data = load_data(os.path.join(directory, 'config.json'), os.path.join(directory, 'data.json'))
+        # Default CP-SAT parameters, so runs of two versions stay comparable
+        solve_sections(config, data, config['sections'], formulation, resources, metrics=metrics, solver_params="")
+
+    if 'solver' not in metrics:
+        # Pruning proved a cell impossible before the model was built
+        return {'status': "INFEASIBLE", 'build_seconds': metrics['instance_seconds'] + metrics['prune_seconds']}
+    return {
+        'status': metrics['solver']['status'],
+        'build_seconds': metrics['build_seconds'],
+        'variables': metrics['variables'],
+        'constraints': metrics['constraints'],
+        'first_solution_seconds': metrics['first_solution_seconds'],
+        'solve_seconds': metrics['solver']['wall_seconds'],
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_case(scale, formulation, resources, timeout):
+    """Generates one instance and measures it in a fresh process (for an honest peak RSS)."""
+    config, data = generate_instance(scale['sections'], scale['teachers'], scale['lab_rooms'],
+                                     scale['tba_density'], timeout=timeout)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, content in (('config.json', config), ('data.json', data)):
+            with open(os.path.join(directory, name), 'w') as f:
+                json.dump(content, f)
+        cmd = [sys.executable, os.path.abspath(__file__), '--measure', directory,
+               '--formulation', formulation, '--resources', resources]
+        result = subprocess.run(cmd, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        return {'status': "ERROR", 'error': result.stderr.strip().splitlines()[-1:]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def load_baseline(path, label=None):
+    """Returns the latest baseline record per case key."""
+    records = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                record = json.loads(line)
+                if label is None or record.get('label') == label:
+                    records[case_key(record)] = record
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read baseline. {e}", file=sys.stderr)
+    return records
+
+
+def case_key(record):
+    return (record['sections'], record['teachers'], record['lab_rooms'], record['tba_density'],
+            record['formulation'], record['resources'])
+
+
+def format_seconds(value):
+    return "-" if value is None else f"{value:.3f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark model build and solve on synthetic instances.")
+    parser.add_argument('--sections', type=int, nargs='+', default=[7, 28, 84], help="Scales to run")
+    parser.add_argument('--teachers-per-section', type=float, default=3.0)
+    parser.add_argument('--lab-rooms-per-section', type=float, default=0.75)
+    parser.add_argument('--tba-density', type=float, default=0.9,
+                        help="Share of theory classes left 'To Be Assigned' (the rest are pre-assigned)")
+    parser.add_argument('--formulation', nargs='+', choices=["int", "bool"], default=["int"])
+    parser.add_argument('--resources', nargs='+', choices=["slot", "interval"], default=["slot"])
+    parser.add_argument('--timeout', type=int, default=60, help="Solver time limit per run (seconds)")
+    parser.add_argument('--label', default="", help="Tag stored with every record, e.g. a version")
+    parser.add_argument('--results', default='benchmark_results.jsonl')
+    parser.add_argument('--baseline', help="Results file to compare against")
+    parser.add_argument('--baseline-label', help="Only compare with baseline records carrying this label")
+    parser.add_argument('--measure', metavar='DIR', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.formulation[0], args.resources[0])))
+        return
+
+    baseline = load_baseline(args.baseline, args.baseline_label) if args.baseline else {}
+    print(f"{'sections':>8} {'form/res':>14} {'status':>10} {'vars':>7} {'cons':>7} "
+          f"{'build s':>8} {'first s':>8} {'solve s':>8} {'RSS MB':>7}" + ("  vs baseline" if baseline else ""))
+
+    for num_sections in args.sections:
+        scale = {
+            'sections': num_sections,
+            'teachers': max(1, round(num_sections * args.teachers_per_section)),
+            'lab_rooms': max(2, round(num_sections * args.lab_rooms_per_section)),
+            'tba_density': args.tba_density,
+        }
+        for formulation in args.formulation:
+            for resources in args.resources:
+                metrics = run_case(scale, formulation, resources, args.timeout)
+                record = {'label': args.label, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"), **scale,
+                          'formulation': formulation, 'resources': resources, **metrics}
+                with open(args.results, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+
+                line = (f"{num_sections:>8} {formulation + '/' + resources:>14} {record['status']:>10} "
+                        f"{record.get('variables', '-'):>7} {record.get('constraints', '-'):>7} "
+                        f"{format_seconds(record.get('build_seconds')):>8} "
+                        f"{format_seconds(record.get('first_solution_seconds')):>8} "
+                        f"{format_seconds(record.get('solve_seconds')):>8} "
+                        f"{record.get('peak_rss_mb', 0):>7.1f}")
+                old = baseline.get(case_key(record))
+                if old and old.get('solve_seconds') and record.get('solve_seconds'):
+                    line += f"  solve x{old['solve_seconds'] / record['solve_seconds']:.2f}"
+                print(line)
+
+    print(f"\nResults appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
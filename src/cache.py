@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# cache.py
+"""
+Content-addressed on-disk cache for engine.py.
+
+Entries are keyed by a hash of everything they are computed from (config,
+timetable, sections, formulation, resource mode, pruning and the source of the
+engine modules), so a changed input or a changed engine never hits a
+stale entry. Each kind is kept in its own subdirectory:
+
+- instance/  the compiled instance (id maps, domains, availability), pickled
+- model/     the CP-SAT model as a text proto plus the variable handles
+- solution/  the solution found for an instance (and hints)
+- labs/      the lab phase of a two-phase solve, keyed only by what labs depend on
+
+When the cache grows beyond its size limit the least recently used entries
+are deleted. engine.py uses it with --cache DIR.
+
+Usage:
+    python3 cache.py --cache .timetable_cache        (show the cache contents)
+    python3 cache.py --cache .timetable_cache --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from collections import namedtuple
+from ortools.sat.python import cp_model
+from ortools.sat.python.cp_model_helper import FlatIntExpr
+
+DEFAULT_MAX_MB = 256
+KINDS = ("instance", "model", "solution", "labs")
+# Modules whose source decides what an instance, model or solution looks like
+ENGINE_SOURCES = [os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+                  for name in ('engine.py', 'grid.py', 'occupancy.py', 'verify.py')]
+
+# Variables and linear expressions are stored by proto index and restored on the loaded model
+VarRef = namedtuple('VarRef', ['index'])
+ExprRef = namedtuple('ExprRef', ['terms', 'offset'])
+
+_engine_version = None
+
+
+def engine_version():
+    """Hash of the engine sources, so entries built by another version are never reused."""
+    global _engine_version
+    if _engine_version is None:
+        digest = hashlib.sha256()
+        for path in ENGINE_SOURCES:
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        _engine_version = digest.hexdigest()[:16]
+    return _engine_version
+
+
+def input_hash(config_data, timetable_data, sections, formulation, resources):
+    """Returns a short, stable hash of everything a model is built from."""
+    payload = json.dumps([config_data, timetable_data, sorted(sections), formulation, resources], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def cache_key(config_data, timetable_data, sections, formulation, resources, options, extra=None):
+    """
+    Returns the cache key of a compiled instance/model built with `options`
+    (pruning, labs only); `extra` (e.g. hints) is folded in for solutions.
+    """
+    key = input_hash(config_data, timetable_data, sections, formulation, resources)
+    payload = json.dumps([key, options, engine_version(), extra], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+
+def entry_path(cache_dir, kind, key, suffix=".pkl"):
+    return os.path.join(cache_dir, kind, key + suffix)
+
+
+def write_atomic(path, data, mode='wb'):
+    """Writes to a temporary file and renames it into place."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_pickle(cache_dir, kind, key):
+    """Returns a cached object, or None on a miss. A hit refreshes the entry's LRU time."""
+    path = entry_path(cache_dir, kind, key)
+    try:
+        with open(path, 'rb') as f:
+            value = pickle.load(f)
+    except (FileNotFoundError, pickle.UnpicklingError, EOFError):
+        return None
+    os.utime(path)
+    return value
+
+
+def store_pickle(cache_dir, kind, key, value, max_mb=DEFAULT_MAX_MB):
+    write_atomic(entry_path(cache_dir, kind, key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    evict(cache_dir, max_mb)
+
+
+def to_refs(value):
+    """Replaces the variables and expressions inside a variables dict by VarRef/ExprRef."""
+    if isinstance(value, dict):
+        return {k: to_refs(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_refs(v) for v in value]
+    if isinstance(value, cp_model.IntVar):
+        return VarRef(value.Index())
+    if isinstance(value, cp_model.LinearExpr):
+        flat = FlatIntExpr(value)
+        return ExprRef([(var.Index(), coeff) for var, coeff in zip(flat.vars, flat.coeffs)], flat.offset)
+    return value
+
+
+def from_refs(model, value):
+    """Inverse of to_refs() on the loaded model."""
+    if isinstance(value, dict):
+        return {k: from_refs(model, v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [from_refs(model, v) for v in value]
+    if isinstance(value, VarRef):
+        return model.GetIntVarFromProtoIndex(value.index)
+    if isinstance(value, ExprRef):
+        return sum(coeff * model.GetIntVarFromProtoIndex(i) for i, coeff in value.terms) + value.offset
+    return value
+
+
+def store_model(cache_dir, key, model, variables, max_mb=DEFAULT_MAX_MB):
+    """Caches a built model (without hints) and its variable handles."""
+    os.makedirs(os.path.join(cache_dir, "model"), exist_ok=True)
+    tmp_path = entry_path(cache_dir, "model", key, ".tmp.pb.txt")
+    model.ExportToFile(tmp_path)
+    os.replace(tmp_path, entry_path(cache_dir, "model", key, ".pb.txt"))
+    store_pickle(cache_dir, "model", key, to_refs(variables), max_mb)
+
+
+def load_model(cache_dir, key):
+    """Returns (model, variables) from the cache, or (None, None) on a miss."""
+    proto_path = entry_path(cache_dir, "model", key, ".pb.txt")
+    refs = load_pickle(cache_dir, "model", key)
+    if refs is None or not os.path.exists(proto_path):
+        return None, None
+    model = cp_model.CpModel()
+    with open(proto_path, 'r') as f:
+        if not model.Proto().parse_text_format(f.read()):
+            return None, None
+    os.utime(proto_path)
+    return model, from_refs(model, refs)
+
+
+def entries(cache_dir):
+    """Returns [(last use, size, path)] of every cached file."""
+    found = []
+    for kind in KINDS:
+        directory = os.path.join(cache_dir, kind)
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            found.append((stat.st_mtime, stat.st_size, path))
+    return found
+
+
+def evict(cache_dir, max_mb=DEFAULT_MAX_MB):
+    """Deletes least recently used files until the cache fits in max_mb. Returns the number deleted."""
+    files = sorted(entries(cache_dir))
+    total = sum(size for _, size, _ in files)
+    deleted = 0
+    for _, size, path in files:
+        if total <= max_mb * 1024 * 1024:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the engine.py cache.")
+    parser.add_argument('--cache', default='.timetable_cache')
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        shutil.rmtree(args.cache, ignore_errors=True)
+        print(f"Cleared {args.cache}")
+        return
+    files = entries(args.cache)
+    for kind in KINDS:
+        kind_files = [size for _, size, path in files if os.path.basename(os.path.dirname(path)) == kind]
+        print(f"{kind:>9}: {len(kind_files):4d} files, {sum(kind_files) / 1024 / 1024:8.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+# corpus.py
+"""
+Corpus of recorded timetable instances, for measuring solver changes on
+the timetables we actually run.
+
+Every instance is stored under the hash of its input:
+- <hash>.pb.txt  the built CpModelProto (text format)
+- <hash>.json    metadata and the input itself (config, timetable,
+                 sections, formulation, resources), so the instance can
+                 be rebuilt with another formulation
+
+Instances are added by `engine.py --record DIR` or by the seed command,
+which converts the shipped data/*-tt.json timetables the same way
+dataGeneration.js does ("CSE A" -> "CSE-A-3", "9:00 AM - 10:00 AM" -> "9-10").
+Of those, third-btech is recorded as is and fifth-btech with theory blocks
+(it has no "To Be Assigned" slots). first-year and first-mtech are skipped:
+their sections are not in config.json, and first-year also has a Saturday
+and 2-hour rows.
+
+Usage:
+    python3 corpus.py seed
+    python3 corpus.py replay
+    python3 corpus.py replay --params "num_workers: 1" "num_workers: 8" --formulation int bool
+"""
+
+import argparse
+import contextlib
+import copy
+import glob
+import io
+import json
+import os
+import re
+import sys
+import time
+from ortools.sat.python import cp_model
+from cache import input_hash
+from engine import LAB_SLOT_MAP, build_instance, build_model, prune_domains
+from verify import THEORY_BLOCKS
+
+# Semester of each shipped timetable, by file name prefix
+SEMESTER_BY_PREFIX = {"first": 1, "second": 2, "third": 3, "fourth": 4,
+                      "fifth": 5, "sixth": 6, "seventh": 7, "eighth": 8}
+
+
+def record_instance(directory, model, config_data, timetable_data, sections, formulation, resources, source=""):
+    """Writes a built model and its input to the corpus. Returns its hash."""
+    os.makedirs(directory, exist_ok=True)
+    key = input_hash(config_data, timetable_data, sections, formulation, resources)
+    model.ExportToFile(os.path.join(directory, f"{key}.pb.txt"))
+    proto = model.Proto()
+    meta = {
+        'hash': key,
+        'source': source,
+        'recorded': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'sections': list(sections),
+        'formulation': formulation,
+        'resources': resources,
+        'variables': len(proto.variables),
+        'constraints': len(proto.constraints),
+        'config': config_data,
+        'timetable': timetable_data,
+    }
+    with open(os.path.join(directory, f"{key}.json"), 'w') as f:
+        json.dump(meta, f)
+    print(f"Recorded instance {key} ({', '.join(sections)}) to {directory}")
+    return key
+
+
+def build_corpus_model(config_data, timetable_data, sections, formulation, resources):
+    """
+    Builds a model like engine.py does. If pruning empties a domain the
+    unpruned model is kept instead, so infeasible instances stay valid models.
+    """
+    inst = build_instance(config_data, timetable_data, sections)
+    _, impossible_cells = prune_domains(inst)
+    if impossible_cells:
+        inst = build_instance(config_data, timetable_data, sections)
+    model, _ = build_model(inst, formulation, resources)
+    return model
+
+
+def format_time_key(time_range):
+    """Converts "9:00 AM - 10:00 AM" to "9-10" (like formatTimeKey in dataGeneration.js)."""
+    match = re.match(r"(\d+):\d+\s+(?:AM|PM)\s+-\s+(\d+)", time_range)
+    return f"{match.group(1)}-{match.group(2)}" if match else time_range
+
+
+def section_code(name, semester):
+    """Converts "CSE (AI/ML)" to "CSE-AI-ML-5" (like dataGeneration.js)."""
+    code = re.sub(r"[()\s/]", "-", name) + f"-{semester}"
+    return code.replace("--", "-").rstrip("-")
+
+
+def convert_tt(tt_data, semester, days):
+    """Converts a data/*-tt.json timetable (section -> day -> periods) into data.json format."""
+    data = {day: [] for day in days}
+    for name, section_data in tt_data.items():
+        section = section_code(name, semester)
+        for day in days:
+            row = {'section': section}
+            for period in section_data.get(day, []):
+                details = {'status': period['status']}
+                if period.get('room') and period['status'] != "Free":
+                    details['room'] = period['room']
+                if period['status'] == "Assigned":
+                    details['subject'] = period.get('subject')
+                    details['teacher'] = period.get('teacher')
+                row.setdefault(format_time_key(period['time']), []).append(details)
+            data[day].append(row)
+    return data
+
+
+def normalize_config(config_data):
+    """Accepts the older config layout that lists lab_slot_starts instead of lab_slot."""
+    settings = config_data['settings']
+    if 'lab_slot' not in settings and 'lab_slot_starts' in settings:
+        starts = settings['lab_slot_starts']
+        settings['lab_slot'] = [w for w, (first, _) in LAB_SLOT_MAP.items() if first in starts]
+    return config_data
+
+
+def skip_reason(config_data, timetable_data, section, blocks=False):
+    """
+    Returns why a section of a converted timetable cannot be recorded, or
+    None if its "To Be Assigned" slots match the classes it still needs.
+    With blocks, its "Free" cells count as open theory cells too (as in
+    engine.py --blocks), so there only must be enough of them.
+    """
+    if section not in config_data['sections']:
+        return "not in config.json"
+    slots = config_data['settings']['all_slots']
+    cells = [row[slot][0] for day in timetable_data for row in timetable_data[day]
+             if row['section'] == section for slot in slots if slot in row]
+    if len(cells) != len(slots) * len(timetable_data):
+        return "its rows do not have exactly the slots of config.json"
+    pre = {s: 0 for s in config_data['core_subjects'][section]}
+    for cell in cells:
+        if cell['status'] == "Assigned" and cell.get('subject') in pre:
+            pre[cell['subject']] += 1
+    needed = sum(max(0, 3 - c) for c in pre.values())
+    if not needed:
+        return "every core subject is already assigned"
+    open_statuses = ("To Be Assigned", "Free") if blocks else ("To Be Assigned",)
+    open_cells = sum(1 for cell in cells if cell['status'] in open_statuses)
+    if blocks and open_cells < needed:
+        return f"{open_cells} open cells, but {needed} classes still needed"
+    if not blocks and open_cells != needed:
+        return f"{open_cells} 'To Be Assigned' slots, but {needed} classes still needed"
+    return None
+
+
+def record_variants(corpus_dir, config_data, timetable_data, sections, formulations, resources, source):
+    """Records one input under every formulation/resource mode. Returns the number recorded."""
+    for formulation in formulations:
+        for resource_mode in resources:
+            model = build_corpus_model(config_data, timetable_data, sections, formulation, resource_mode)
+            record_instance(corpus_dir, model, config_data, timetable_data, sections, formulation, resource_mode,
+                            source=source)
+    return len(formulations) * len(resources)
+
+
+def seed(corpus_dir, config_path, paths, formulations, resources, data_pair=None):
+    """
+    Records every solvable shipped timetable into the corpus, plus the
+    merged data_pair = (config path, data path) that engine.py runs on.
+
+    A timetable without "To Be Assigned" slots is recorded with theory
+    blocks instead (its "Free" cells are the open theory cells). Every
+    section left out is printed with the reason.
+    """
+    recorded = 0
+    if data_pair:
+        with open(data_pair[0], 'r') as f:
+            config_data = json.load(f)
+        with open(data_pair[1], 'r') as f:
+            timetable_data = json.load(f)
+        recorded += record_variants(corpus_dir, config_data, timetable_data, config_data['sections'],
+                                    formulations, resources, os.path.basename(data_pair[1]))
+
+    with open(config_path, 'r') as f:
+        config_data = normalize_config(json.load(f))
+    config_data.setdefault('core_subjects', {s: [subj for subj, _ in config_data['subjects'][s]]
+                                             for s in config_data['sections']})
+    for path in paths:
+        prefix = os.path.basename(path).split('-')[0]
+        if prefix not in SEMESTER_BY_PREFIX:
+            print(f"Skipping {path}: no semester in the file name")
+            continue
+        with open(path, 'r') as f:
+            tt_data = json.load(f)
+        timetable_data = convert_tt(tt_data, SEMESTER_BY_PREFIX[prefix], config_data['settings']['days'])
+        file_config = config_data
+        reasons = {row['section']: skip_reason(config_data, timetable_data, row['section'])
+                   for row in timetable_data[config_data['settings']['days'][0]]}
+        if all(reasons.values()):
+            file_config = copy.deepcopy(config_data)
+            file_config['settings']['theory_blocks'] = list(THEORY_BLOCKS)
+            blocks_reasons = {section: skip_reason(file_config, timetable_data, section, blocks=True)
+                              for section in reasons}
+            if not all(blocks_reasons.values()):
+                print(f"Recording {path} with theory blocks: no section has matching 'To Be Assigned' slots")
+                reasons = blocks_reasons
+        for section, reason in reasons.items():
+            if reason:
+                print(f"Skipping {section} of {path}: {reason}")
+        sections = [section for section, reason in reasons.items() if not reason]
+        if not sections:
+            continue
+        # Keep only the solvable sections, so unknown layouts (e.g. Saturday, 2-hour rows) are left out
+        timetable_data = {day: [row for row in rows if row['section'] in sections] for day, rows in timetable_data.items()
+                          if day in config_data['settings']['days']}
+        recorded += record_variants(corpus_dir, file_config, timetable_data, sections, formulations, resources,
+                                    os.path.basename(path))
+    print(f"✅ Seeded {recorded} instance(s) into {corpus_dir}")
+
+
+def load_corpus(corpus_dir):
+    """Returns the metadata of every recorded instance, oldest first."""
+    metas = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.json"))):
+        with open(path, 'r') as f:
+            metas.append(json.load(f))
+    return sorted(metas, key=lambda m: m['recorded'])
+
+
+def load_model(corpus_dir, meta, formulation=None):
+    """Returns the recorded model, or rebuilds it from the input for another formulation."""
+    if formulation is None or formulation == meta['formulation']:
+        model = cp_model.CpModel()
+        with open(os.path.join(corpus_dir, f"{meta['hash']}.pb.txt"), 'r') as f:
+            model.Proto().parse_text_format(f.read())
+        return model
+    with contextlib.redirect_stdout(io.StringIO()):
+        return build_corpus_model(meta['config'], meta['timetable'], meta['sections'], formulation,
+                                  meta['resources'])
+
+
+def solve_with_params(model, params, time_limit):
+    """Solves a model under a text-format SatParameters string. Returns (status name, wall time)."""
+    solver = cp_model.CpSolver()
+    if params and not solver.parameters.parse_text_format(params):
+        raise ValueError(f"Invalid solver parameters: {params!r}")
+    solver.parameters.max_time_in_seconds = time_limit
+    status = solver.Solve(model)
+    return solver.StatusName(status), solver.WallTime()
+
+
+def replay(corpus_dir, param_sets, formulations, time_limit, results_path=None):
+    """Re-solves every instance under each parameter set and formulation and prints a table."""
+    metas = load_corpus(corpus_dir)
+    if not metas:
+        print(f"Error: No recorded instances in {corpus_dir}", file=sys.stderr)
+        return False
+
+    print(f"{'instance':>16} {'source':>22} {'form':>5} {'params':>30} {'status':>10} {'wall s':>8}")
+    for meta in metas:
+        for formulation in formulations or [None]:
+            model = load_model(corpus_dir, meta, formulation)
+            for params in param_sets:
+                status, wall = solve_with_params(model, params, time_limit)
+                row = {'hash': meta['hash'], 'source': meta['source'], 'formulation': formulation or meta['formulation'],
+                       'params': params, 'status': status, 'wall_seconds': wall}
+                print(f"{row['hash']:>16} {row['source'][:22]:>22} {row['formulation']:>5} "
+                      f"{(params or 'defaults')[:30]:>30} {status:>10} {wall:>8.3f}")
+                if results_path:
+                    with open(results_path, 'a') as f:
+                        f.write(json.dumps(row) + "\n")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record and replay real timetable instances.")
+    parser.add_argument('--corpus', default='corpus', help="Corpus directory")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser(
+        'seed', help="Record the shipped data/*-tt.json timetables (sections not in --config are skipped, "
+                     "which leaves out first-year and first-mtech)")
+    seed_parser.add_argument('--config', default=os.path.join('..', 'data', 'config.json'))
+    seed_parser.add_argument('files', nargs='*', help="Timetables to record (default: ../data/*-tt.json)")
+    seed_parser.add_argument('--formulation', nargs='+', choices=["int", "bool"], default=["int"])
+    seed_parser.add_argument('--resources', nargs='+', choices=["slot", "interval"], default=["slot"])
+    seed_parser.add_argument('--data-pair', nargs=2, metavar=('CONFIG', 'DATA'), default=['config.json', 'data.json'],
+                             help="Merged timetable to record as well (default: config.json data.json)")
+    seed_parser.add_argument('--no-data-pair', dest='data_pair', action='store_const', const=None,
+                             help="Only record the data/*-tt.json timetables")
+
+    replay_parser = commands.add_parser('replay', help="Re-solve the corpus and report wall time and status")
+    replay_parser.add_argument('--params', nargs='+', default=[""],
+                               help='SatParameters in text format, e.g. "num_workers: 8 linearization_level: 2"')
+    replay_parser.add_argument('--formulation', nargs='+', choices=["int", "bool"],
+                               help="Rebuild each instance with these formulations (default: as recorded)")
+    replay_parser.add_argument('--time-limit', type=float, default=60)
+    replay_parser.add_argument('--results', help="Also append one JSON record per run to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'seed':
+            files = args.files or sorted(glob.glob(os.path.join('..', 'data', '*-tt.json')))
+            seed(args.corpus, args.config, files, args.formulation, args.resources, args.data_pair)
+        elif not replay(args.corpus, args.params, args.formulation, args.time_limit, args.results):
+            sys.exit(1)
+    except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,30 @@
 """
 Detailed conflict analyzer for 7th semester timetable
 This will show EXACTLY why the solver fails
+
+Other sections can be analyzed with --sections, e.g.
+    python3 dd.py --sections CSE-5 CSE-AI-ML-5 --data data.json
 """
 
+import argparse
 import json
+import sys
 from collections import defaultdict
+from grid import TimetableGrid
+from occupancy import build_occupancy
+
+DEFAULT_SECTIONS = ["CSE-7", "IT-7"]
 
-def load_data():
-    with open('config.json', 'r') as f:
+def load_data(config_path='config.json', data_path=None):
+    with open(config_path, 'r') as f:
         config = json.load(f)
     
+    if data_path:
+        with open(data_path, 'r') as f:
+            data = json.load(f)
+        print(f"Analyzing {data_path}")
+        return config, data
+    
     # Try to load updated_timetable.json first (after 5th sem solver)
     try:
         with open('updated_timetable.json', 'r') as f:
@@ -23,61 +38,39 @@ def load_data():
     
     return config, data
 
-def main():
-    config, data = load_data()
-    
-    sections_7th = ["CSE-7", "IT-7"]
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show why the solver fails for some sections.")
+    parser.add_argument('--sections', nargs='+', default=DEFAULT_SECTIONS, help="Sections to analyze (default: CSE-7 IT-7)")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', help="Timetable to analyze (default: updated_timetable.json, else data.json)")
+    args = parser.parse_args(argv)
+    
+    config, data = load_data(args.config, args.data)
+    
+    sections = args.sections
+    unknown = [s for s in sections if s not in config['sections']]
+    if unknown:
+        print(f"Error: Unknown section(s): {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
     all_sections = config['sections']
     days = config['settings']['days']
     slots = config['settings']['all_slots']
     
-    # Build mappings
-    section_index_map = {d: {} for d in days}
-    for day in days:
-        for i, section_obj in enumerate(data[day]):
-            section_index_map[day][section_obj['section']] = i
+    grid = TimetableGrid.from_json(data, days, slots)
     
     print("\n" + "="*80)
-    print("CONFLICT ANALYSIS FOR 7TH SEMESTER")
+    print("CONFLICT ANALYSIS FOR " + ("7TH SEMESTER" if sections == DEFAULT_SECTIONS else ", ".join(sections)))
     print("="*80)
     
     # Build teacher and room schedules from ASSIGNED slots
-    teacher_busy = defaultdict(lambda: defaultdict(list))  # teacher -> day -> [(slot, section)]
-    room_busy = defaultdict(lambda: defaultdict(list))      # room -> day -> [(slot, section)]
-    lab_room_busy = defaultdict(lambda: defaultdict(list))  # lab_room -> day -> [(slot, section)]
-    
-    for day in days:
-        for section_obj in data[day]:
-            section = section_obj['section']
-            for slot in slots:
-                slot_info = section_obj[slot][0]
-                if slot_info['status'] == "Assigned":
-                    teacher = slot_info.get('teacher', '')
-                    room = slot_info.get('room', '')
-                    
-                    # Handle teachers
-                    if teacher and "/" not in str(teacher):
-                        if "TBD" not in str(teacher):
-                            teacher_busy[teacher][day].append((slot, section))
-                    elif teacher and "/" in str(teacher):
-                        for t in teacher.split('/'):
-                            t = t.strip()
-                            if "TBD" not in t:
-                                teacher_busy[t][day].append((slot, section))
-                    
-                    # Handle rooms
-                    if room and "/" not in str(room):
-                        room_busy[room][day].append((slot, section))
-                    elif room and "/" in str(room):
-                        for r in room.split('/'):
-                            r = r.strip()
-                            lab_room_busy[r][day].append((slot, section))
+    # (one bitmask of busy slots per teacher/room and day)
+    occupancy = build_occupancy(config, grid)
     
     # Check 1: Theory class conflicts
     print("\n1. CHECKING THEORY CLASS SCHEDULING:")
     print("-" * 80)
     
-    for section in sections_7th:
+    for section in sections:
         print(f"\n{section}:")
         core_subjects = config['core_subjects'][section]
         print(f"  Core subjects: {', '.join(core_subjects)}")
@@ -88,10 +81,7 @@ def main():
         # Check each day's TBA slots
         conflicts_found = False
         for day in days:
-            idx = section_index_map[day][section]
-            section_obj = data[day][idx]
-            
-            tba_slots = [slot for slot in slots if section_obj[slot][0]['status'] == "To Be Assigned"]
+            tba_slots = [slot for slot in slots if grid.status(day, slot, section) == "To Be Assigned"]
             
             if tba_slots:
                 print(f"\n  {day} - TBA slots: {', '.join(tba_slots)}")
@@ -101,11 +91,10 @@ def main():
                     busy_teachers = []
                     for subj in core_subjects:
                         teacher = teacher_map.get(subj, '')
-                        if teacher in teacher_busy and day in teacher_busy[teacher]:
-                            for busy_slot, busy_sec in teacher_busy[teacher][day]:
-                                if busy_slot == slot:
-                                    busy_teachers.append(f"{teacher}({subj}) teaching {busy_sec}")
-                                    conflicts_found = True
+                        if not occupancy.is_free('teacher', teacher, day, (slot,)):
+                            for busy_sec in occupancy.sections_using('teacher', teacher, day, slot):
+                                busy_teachers.append(f"{teacher}({subj}) teaching {busy_sec}")
+                                conflicts_found = True
                     
                     if busy_teachers:
                         print(f"    ✗ {slot}: CONFLICT - {'; '.join(busy_teachers)}")
@@ -117,12 +106,10 @@ def main():
         print(f"\n  Assigned room: {assigned_room}")
         room_conflicts = False
         for day in days:
-            if day in room_busy[assigned_room]:
-                idx = section_index_map[day][section]
-                section_obj = data[day][idx]
-                tba_slots = [slot for slot in slots if section_obj[slot][0]['status'] == "To Be Assigned"]
+            if not occupancy.is_free('room', assigned_room, day, slots):
+                tba_slots = [slot for slot in slots if grid.status(day, slot, section) == "To Be Assigned"]
                 
-                for slot, other_sec in room_busy[assigned_room][day]:
+                for slot, other_sec in occupancy.users[('room', assigned_room, day)]:
                     if slot in tba_slots:
                         print(f"    ✗ {day} {slot}: Room occupied by {other_sec}")
                         room_conflicts = True
@@ -142,7 +129,7 @@ def main():
     
     all_lab_rooms = config['lab_rooms']
     
-    for section in sections_7th:
+    for section in sections:
         print(f"\n{section}:")
         labs = config['labs'][section]
         print(f"  Labs: {', '.join(labs)}")
@@ -154,13 +141,9 @@ def main():
         conflicts_by_day = defaultdict(list)
         
         for day in days:
-            idx = section_index_map[day][section]
-            section_obj = data[day][idx]
-            
             for lab_slot_name, (slot1, slot2) in lab_slot_map.items():
-                is_free = (slot1 in section_obj and slot2 in section_obj and
-                          section_obj[slot1][0]['status'] == "Free" and
-                          section_obj[slot2][0]['status'] == "Free")
+                is_free = (grid.status(day, slot1, section) == "Free" and
+                          grid.status(day, slot2, section) == "Free")
                 
                 if is_free:
                     available_count += 1
@@ -170,12 +153,7 @@ def main():
                     rooms_busy = []
                     
                     for room in all_lab_rooms:
-                        room_free = True
-                        for check_slot in [slot1, slot2]:
-                            if check_slot in [s for s, _ in lab_room_busy[room][day]]:
-                                room_free = False
-                                break
-                        if room_free:
+                        if occupancy.is_free('lab_room', room, day, (slot1, slot2)):
                             rooms_available.append(room)
                         else:
                             rooms_busy.append(room)
@@ -189,15 +167,10 @@ def main():
                         theory_subj = lab.split(" ")[0]
                         teacher = teacher_map.get(theory_subj, teacher_map.get(lab, ''))
                         
-                        teacher_free = True
-                        if teacher and teacher in teacher_busy:
-                            for check_slot in [slot1, slot2]:
-                                if check_slot in [s for s, _ in teacher_busy[teacher][day]]:
-                                    teachers_busy.append(f"{teacher}({lab})")
-                                    teacher_free = False
-                                    break
-                        
-                        if teacher_free:
+                        teacher_free = not teacher or occupancy.is_free('teacher', teacher, day, (slot1, slot2))
+                        if not teacher_free:
+                            teachers_busy.append(f"{teacher}({lab})")
+                        else:
                             teachers_available.append(f"{teacher}({lab})")
                     
                     # We need 2 rooms and 2 teachers (for parallel groups)
@@ -224,16 +197,14 @@ def main():
     
     issues = []
     
-    for section in sections_7th:
+    for section in sections:
         # Count constraints
         core_subjects = config['core_subjects'][section]
         labs = config['labs'][section]
         
         tba_total = 0
         for day in days:
-            idx = section_index_map[day][section]
-            section_obj = data[day][idx]
-            tba_total += sum(1 for slot in slots if section_obj[slot][0]['status'] == "To Be Assigned")
+            tba_total += sum(1 for slot in slots if grid.status(day, slot, section) == "To Be Assigned")
         
         needed = len(core_subjects) * 3
         if tba_total != needed:
@@ -242,12 +213,9 @@ def main():
         # Count free lab slots
         free_lab_slots = 0
         for day in days:
-            idx = section_index_map[day][section]
-            section_obj = data[day][idx]
             for lab_slot_name, (s1, s2) in lab_slot_map.items():
-                if (s1 in section_obj and s2 in section_obj and
-                    section_obj[s1][0]['status'] == "Free" and
-                    section_obj[s2][0]['status'] == "Free"):
+                if (grid.status(day, s1, section) == "Free" and
+                    grid.status(day, s2, section) == "Free"):
                     free_lab_slots += 1
         
         needed_labs = len(labs)
@@ -1,109 +1,153 @@
+#!/usr/bin/env python
+# diagnose.py
+"""
+Comprehensive conflict check of a timetable before solving:
+
+1. "To Be Assigned" slots competing for the same room.
+2. "Assigned" classes with teacher or room double-bookings.
+3. Conflicts between "Assigned" classes and "To Be Assigned" slots
+   (every teacher of a section may be needed in its open slots).
+
+Each section's teachers are listed once, "Assigned" classes come from the
+shared slot occupancy (occupancy.py) and "To Be Assigned" cells from one
+pass over a TimetableGrid, so the scan is linear in the size of the
+timetable. As in the solver, combined lab cells count once per group
+teacher and lab room, and "TBD" teachers are not double-booked. Besides the human-readable report, every
+conflict is written as one JSON line for other tools.
+
+Reads from:
+- config.json
+- data.json
+
+Writes to:
+- diagnose_report.jsonl (one record per conflict)
+
+Usage:
+    python3 diagnose.py
+    python3 diagnose.py --data updated_timetable.json --report conflicts.jsonl
+"""
+
+import argparse
 import json
+import sys
+from grid import TimetableGrid
+from occupancy import build_occupancy
+
+CONFLICT_TEMPLATE = """
+    🔴 {kind} Conflict!
+    ---------------------
+    {label:<10} {name}
+    When:      {day} at {slot}
+    Problem:   Is double-booked. Required for: {uses}
+    ---------------------"""
+
 
-def diagnose_all_conflicts():
+def section_teacher_lists(config):
+    """Returns {section: [(subject, teacher)]} in config order."""
+    return {section: [(info[0], info[1]) for info in subjects] for section, subjects in config['subjects'].items()}
+
+
+def slot_occupancy(grid, occupancy, open_sections, day, slot, section_rooms, section_teachers):
     """
-    Loads data and runs a comprehensive check for all types of conflicts:
-    1. "To Be Assigned" slots competing for the same room.
-    2. "Assigned" classes with teacher or room double-bookings.
-    3. "Assigned" classes violating the recess rule.
-    4. Conflicts between "Assigned" classes and "To Be Assigned" slots.
+    Returns (teachers, rooms) for one (day, slot): name -> [use], where a use
+    is {'section', 'status', 'subject'} of an "Assigned" cell, or of a
+    "To Be Assigned" cell (of open_sections) that needs the section's room
+    and may need any of its teachers.
     """
-    print("🩺 Running Comprehensive Timetable Diagnostics...")
+    teachers, rooms = {}, {}
+    for kind, name, section in occupancy.at_slot.get((day, slot), []):
+        use = {'section': section, 'status': 'Assigned', 'subject': grid.get('subject', day, slot, section)}
+        (teachers if kind == 'teacher' else rooms).setdefault(name, []).append(use)
+    for section in open_sections:
+        room = section_rooms.get(section)
+        if room:
+            rooms.setdefault(room, []).append({'section': section, 'status': 'To Be Assigned', 'subject': None})
+        for subject, teacher in section_teachers.get(section, []):
+            teachers.setdefault(teacher, []).append({'section': section, 'status': 'To Be Assigned', 'subject': subject})
+    return teachers, rooms
 
-    # --- 1. Load Data ---
-    try:
-        with open('config.json', 'r') as f:
-            config = json.load(f)
-        with open('data.json', 'r') as f:
-            timetable = json.load(f)
-    except FileNotFoundError as e:
-        print(f"❌ Error: {e}. Make sure 'config.json' and 'data.json' are present.")
-        return
 
+def describe_use(use):
+    if use['status'] == 'Assigned':
+        return f"{use['section']} (Assigned)"
+    if use['subject'] is None:
+        return f"{use['section']} (To Be Assigned)"
+    return f"{use['section']} (Potential for {use['subject']})"
+
+
+def find_conflicts(config, timetable):
+    """Returns every conflict as {'kind': "teacher" | "room", 'name', 'day', 'slot', 'uses'}."""
     days = config['settings']['days']
     slots = config['settings']['all_slots']
+    grid = TimetableGrid.from_json(timetable, days, slots)
+    occupancy = build_occupancy(config, grid)
+    open_cells = {}
+    for day, slot, section in grid.cells_with_status('To Be Assigned'):
+        open_cells.setdefault((day, slot), []).append(section)
     section_rooms = config['section_theory_rooms']
-    subjects_map = config['subjects']
-    teacher_map = {
-        (sec, sub_info[0]): sub_info[1]
-        for sec, subs in subjects_map.items()
-        for sub_info in subs
-    }
-
-    conflict_count = 0
-    
-    # --- 2. Iterate Through Every Time Slot ---
+    section_teachers = section_teacher_lists(config)
+
+    conflicts = []
     for day in days:
         for slot in slots:
-            slot_teachers = {} # teacher -> [sections]
-            slot_rooms = {}    # room -> [sections]
-
-            # Collect data for the current slot
-            for section_schedule in timetable.get(day, []):
-                section = section_schedule['section']
-                if slot not in section_schedule:
-                    continue
-
-                slot_info = section_schedule[slot][0]
-                status = slot_info.get('status')
-                room = section_rooms.get(section) # The required room for this section
-
-                # A. Handle Pre-Assigned Classes
-                if status == 'Assigned':
-                    teacher = slot_info.get('teacher')
-                    assigned_room = slot_info.get('room')
-                    
-                    if teacher:
-                        if teacher not in slot_teachers: slot_teachers[teacher] = []
-                        slot_teachers[teacher].append(f"{section} (Assigned)")
-                    
-                    if assigned_room:
-                        if assigned_room not in slot_rooms: slot_rooms[assigned_room] = []
-                        slot_rooms[assigned_room].append(f"{section} (Assigned)")
-
-                # B. Handle Slots to be Filled
-                elif status == 'To Be Assigned':
-                    if room:
-                        if room not in slot_rooms: slot_rooms[room] = []
-                        slot_rooms[room].append(f"{section} (To Be Assigned)")
-                    
-                    # Check potential teacher conflicts for this slot
-                    for subject, teacher in teacher_map.items():
-                        if subject[0] == section: # If this teacher teaches this section
-                           if teacher not in slot_teachers: slot_teachers[teacher] = []
-                           slot_teachers[teacher].append(f"{section} (Potential for {subject[1]})")
-
-
-            # --- 3. Report Conflicts for the Current Slot ---
-            for teacher, assignments in slot_teachers.items():
-                if len(assignments) > 1:
-                    conflict_count += 1
-                    print(f"""
-    🔴 Teacher Conflict!
-    ---------------------
-    Who:       Teacher {teacher}
-    When:      {day} at {slot}
-    Problem:   Is double-booked. Required for: {', '.join(assignments)}
-    ---------------------""")
-
-            for room, assignments in slot_rooms.items():
-                if len(assignments) > 1:
-                    conflict_count += 1
-                    print(f"""
-    🔴 Room Conflict!
-    ---------------------
-    Where:     Room {room}
-    When:      {day} at {slot}
-    Problem:   Is double-booked. Required for: {', '.join(assignments)}
-    ---------------------""")
+            teachers, rooms = slot_occupancy(grid, occupancy, open_cells.get((day, slot), []), day, slot,
+                                             section_rooms, section_teachers)
+            for kind, uses_by_name in (("teacher", teachers), ("room", rooms)):
+                for name, uses in uses_by_name.items():
+                    if len(uses) > 1:
+                        conflicts.append({'kind': kind, 'name': name, 'day': day, 'slot': slot, 'uses': uses})
+    return conflicts
+
+
+def format_conflict(conflict):
+    teacher = conflict['kind'] == "teacher"
+    return CONFLICT_TEMPLATE.format(
+        kind="Teacher" if teacher else "Room", label="Who:" if teacher else "Where:",
+        name=f"Teacher {conflict['name']}" if teacher else f"Room {conflict['name']}",
+        day=conflict['day'], slot=conflict['slot'], uses=', '.join(describe_use(u) for u in conflict['uses']))
+
+
+def diagnose_all_conflicts(config_path='config.json', data_path='data.json', report_path='diagnose_report.jsonl'):
+    """
+    Loads data, prints every conflict and writes them to report_path as
+    JSON Lines. Returns the conflicts, or None if the input could not be read.
+    """
+    print("🩺 Running Comprehensive Timetable Diagnostics...")
+
+    try:
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+        with open(data_path, 'r') as f:
+            timetable = json.load(f)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}. Make sure '{config_path}' and '{data_path}' are present.")
+        return None
+
+    conflicts = find_conflicts(config, timetable)
 
-    # --- 4. Final Report ---
-    if conflict_count == 0:
-        print("\n✅ No fundamental teacher or room conflicts found. The issue might be with other constraints like daily class limits or recess rules.")
+    # Build the whole report first and write it in one go
+    lines = [format_conflict(c) for c in conflicts]
+    if not conflicts:
+        lines.append("\n✅ No fundamental teacher or room conflicts found. The issue might be with other constraints like daily class limits or recess rules.")
     else:
-        print(f"\nFound a total of {conflict_count} conflicts. Please fix these in 'data.json' and re-run the solver.")
+        lines.append(f"\nFound a total of {len(conflicts)} conflicts. Please fix these in '{data_path}' and re-run the solver.")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    if report_path:
+        with open(report_path, 'w') as f:
+            f.write("".join(json.dumps(c) + "\n" for c in conflicts))
+    return conflicts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find teacher and room double-bookings before solving.")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json')
+    parser.add_argument('--report', default='diagnose_report.jsonl', help="JSON Lines conflict report ('' to skip)")
+    args = parser.parse_args(argv)
+    diagnose_all_conflicts(args.config, args.data, args.report)
 
 
 # --- Run the diagnostic tool ---
 if __name__ == '__main__':
-    diagnose_all_conflicts()
\ No newline at end of file
+    main()
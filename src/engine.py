@@ -0,0 +1,2086 @@
+#!/usr/bin/env python
+# engine.py
+"""
+Solves the university timetable problem for any subset of the sections in
+config.json using Google OR-Tools CP-SAT solver.
+
+Schedules both theory (in "To Be Assigned" slots) and
+labs (in "Free" slots). With --blocks (or settings.theory_blocks in
+config.json) the model also chooses where theory goes: any "To Be
+Assigned" or "Free" cell may take a class, as long as each day's theory
+classes form one of the allowed continuous blocks (see verify.py).
+
+Two modes are supported:
+- joint:   one CP-SAT model over every requested section (default)
+- chained: one model per semester (3rd -> 5th -> 7th), each stage treating
+           the earlier stages' results as fixed, like the old
+           solver.py -> 5solver.py -> 7solver.py pipeline.
+           The input is only loaded and parsed once.
+
+Reads from:
+- config.json (rules, subjects, rooms, labs)
+- data.json (current timetable)
+- solver_profile.json next to engine.py, if tune.py wrote one (see --profile)
+
+Writes to:
+- updated_timetable.json (solved timetable)
+
+Usage:
+    python3 engine.py
+    python3 engine.py --sections CSE-7 IT-7
+    python3 engine.py --mode chained
+    python3 engine.py --formulation bool
+    python3 engine.py --resources interval
+    python3 engine.py --explain
+    python3 engine.py --hint-from updated_timetable.json
+    python3 engine.py --decompose --workers 4
+    python3 engine.py --record corpus
+    python3 engine.py --stats runs.jsonl --prometheus timetable.prom
+    python3 engine.py --stream --stall 10
+    python3 engine.py --cache .timetable_cache
+    python3 engine.py --patch solved.patch.json
+    python3 engine.py --two-phase --cache .timetable_cache
+    python3 engine.py --blocks
+    python3 engine.py --no-profile
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from ortools.sat.python import cp_model
+from cache import DEFAULT_MAX_MB, cache_key, load_model as load_cached_model, load_pickle, store_model, store_pickle
+from grid import TimetableGrid
+from occupancy import LAB_SLOT_MAP, build_occupancy
+from precheck import lab_teacher, report as report_precheck, run_precheck
+from telemetry import append_run_record, solver_stats, write_prometheus
+from verify import THEORY_BLOCKS, theory_blocks
+from writer import overlay_of, write_patch, write_timetable
+
+THEORY_SLOT_TO_LAB_SLOT_MAP = {s: ls for ls, s_tuple in LAB_SLOT_MAP.items() for s in s_tuple}
+# Tuned solver parameters written by tune.py, loaded if present (see --profile)
+SOLVER_PROFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solver_profile.json')
+# One group's part of a combined lab cell, e.g. "DS Lab (G-A)"
+LAB_GROUP_PATTERN = re.compile(r"^(.*) \(G-(.+)\)$")
+
+
+def load_data(config_path, data_path, output_path=None):
+    """
+    Loads config and timetable data from JSON files.
+
+    If output_path is given and exists, the timetable is read from it instead
+    of data_path, so that a run can continue from an earlier one.
+    """
+    try:
+        with open(config_path, 'r') as f:
+            config_data = json.load(f)
+        if output_path and os.path.exists(output_path):
+            with open(output_path, 'r') as f:
+                timetable_data = json.load(f)
+            print(f"Reading from existing {output_path}...")
+        else:
+            with open(data_path, 'r') as f:
+                timetable_data = json.load(f)
+            print(f"Reading from original {data_path}...")
+        return config_data, timetable_data
+    except FileNotFoundError as e:
+        print(f"Error: A required file was not found. {e}", file=sys.stderr)
+        sys.exit(1)
+    except json.JSONDecodeError as e:
+        print(f"Error: Failed to decode JSON. {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def split_cell(value):
+    """Splits a combined lab cell value ("X / Y") into its parts."""
+    if not value:
+        return []
+    return [part.strip() for part in str(value).split('/') if part.strip()]
+
+
+def get_semester(section):
+    """Returns the semester number encoded at the end of a section name."""
+    try:
+        return int(section.split('-')[-1])
+    except ValueError:
+        return 0
+
+
+def group_sections_by_semester(sections):
+    """Groups sections into chained stages, lowest semester first."""
+    stages = {}
+    for section in sections:
+        stages.setdefault(get_semester(section), []).append(section)
+    return [stages[sem] for sem in sorted(stages)]
+
+
+def build_instance(config_data, timetable_data, sections_to_solve, phase=None):
+    """
+    Builds every mapping the model needs for the given sections.
+
+    Returns a dict with the name <-> id maps, the "To Be Assigned" slots,
+    the "Assigned" cells of each section, the available 2-hour lab windows
+    and the resource ids. For the phases
+    of solve_two_phase(), phase="labs" leaves out the "To Be Assigned"
+    slots and phase="theory" closes every lab window.
+
+    If config_data sets settings.theory_blocks, every "Free" cell is a
+    theory cell too and all theory cells are optional: their domains end
+    with the "no class" value len(core subjects), and 'theory_blocks'
+    holds the allowed daily layouts as slot tuples.
+    """
+    all_sections = config_data['sections']
+    days = config_data['settings']['days']
+    slots = config_data['settings']['all_slots']
+    lab_slot_names = config_data['settings']['lab_slot']
+    groups = config_data['settings']['groups']
+
+    unknown = [s for s in sections_to_solve if s not in all_sections]
+    if unknown:
+        print(f"Error: Unknown section(s) {', '.join(unknown)}. "
+              f"Known sections: {', '.join(all_sections)}", file=sys.stderr)
+        sys.exit(1)
+
+    core_subject_map, inv_core_subject_map, teacher_subject_map = {}, {}, {}
+    tba_slots_by_section = {s: [] for s in sections_to_solve}
+    section_index_map = {d: {} for d in days}
+    all_teachers, all_theory_rooms = set(), set()
+    all_lab_rooms = set(config_data['lab_rooms'])
+
+    for day in days:
+        for i, section_obj in enumerate(timetable_data[day]):
+            section_index_map[day][section_obj['section']] = i
+    grid = TimetableGrid.from_json(timetable_data, days, slots)
+    assigned_by_section = {s: [] for s in grid.sections}
+
+    for day, slot, section in grid.cells_with_status("Assigned"):
+        assigned_by_section[section].append((day, slot))
+        teacher, room = grid.get('teacher', day, slot, section), grid.get('room', day, slot, section)
+        for t in split_cell(teacher):
+            if "TBD" not in t:
+                all_teachers.add(t)
+        if room and "/" not in str(room) and room not in all_lab_rooms:
+            all_theory_rooms.add(room)
+
+    for section in all_sections:
+        teacher_subject_map[section] = {s: t for s, t in config_data['subjects'][section]}
+        all_theory_rooms.add(config_data['section_theory_rooms'][section])
+
+    for section in sections_to_solve:
+        core_subjects = config_data['core_subjects'][section]
+        core_subject_map[section] = {s: i for i, s in enumerate(core_subjects)}
+        inv_core_subject_map[section] = {i: s for s, i in core_subject_map[section].items()}
+        for subject in core_subjects:
+            if subject in teacher_subject_map[section]:
+                all_teachers.add(teacher_subject_map[section][subject])
+
+    blocks = None
+    if phase != "labs":
+        for day, slot, section in grid.cells_with_status("To Be Assigned", sections_to_solve):
+            tba_slots_by_section[section].append((day, slot))
+        if config_data['settings'].get('theory_blocks'):
+            blocks = list(theory_blocks(config_data).values())
+            for day, slot, section in grid.cells_with_status("Free", sections_to_solve):
+                tba_slots_by_section[section].append((day, slot))
+
+    lab_slot_name_to_id = {name: i for i, name in enumerate(lab_slot_names)}
+    inv_lab_slot_id_to_name = {i: name for name, i in lab_slot_name_to_id.items()}
+
+    lab_name_map, inv_lab_name_map, lab_teacher_map, lab_teacher_id_list_map = {}, {}, {}, {}
+    section_teacher_id_list_map = {}
+    available_lab_slots = {s: {d: {} for d in days} for s in sections_to_solve}
+    section_lab_count = {}
+
+    for section in all_sections:
+        labs = config_data['labs'].get(section, [])
+        lab_teacher_map[section] = {}
+        for lab_name in labs:
+            teacher_name = None
+            if lab_name in teacher_subject_map[section]:
+                teacher_name = teacher_subject_map[section][lab_name]
+            else:
+                # Assumption: Lab name "DS Lab" maps to theory subject "DS"
+                theory_subject = lab_name.split(" ")[0]
+                if theory_subject in teacher_subject_map[section]:
+                    teacher_name = teacher_subject_map[section][theory_subject]
+            if teacher_name:
+                lab_teacher_map[section][lab_name] = teacher_name
+                all_teachers.add(teacher_name)
+            else:
+                print(f"Warning: No teacher could be mapped for lab '{lab_name}' in section {section}", file=sys.stderr)
+
+    for section in sections_to_solve:
+        labs = config_data['labs'].get(section, [])
+        section_lab_count[section] = len(labs)
+        lab_name_map[section] = {name: i for i, name in enumerate(labs)}
+        inv_lab_name_map[section] = {i: name for name, i in lab_name_map[section].items()}
+        for day in days:
+            for lab_slot_name, (s1, s2) in LAB_SLOT_MAP.items():
+                if lab_slot_name not in lab_slot_name_to_id:
+                    continue
+                available_lab_slots[section][day][lab_slot_name_to_id[lab_slot_name]] = (
+                    phase != "theory" and
+                    grid.status(day, s1, section) == "Free" and grid.status(day, s2, section) == "Free")
+
+    # Create unique dummy IDs for each potential lab assignment
+    # This is to make the AddAllDifferent constraint work
+    dummy_teacher_id_map, dummy_lab_room_id_map, dummy_theory_room_id_map = {}, {}, {}
+    for section in sections_to_solve:
+        for group in groups:
+            dummy_teacher_id_map[section, group] = f"DUMMY_TEACHER_{section}_{group}"
+            all_teachers.add(dummy_teacher_id_map[section, group])
+            dummy_lab_room_id_map[section, group] = f"DUMMY_LAB_ROOM_{section}_{group}"
+            all_lab_rooms.add(dummy_lab_room_id_map[section, group])
+        if blocks:
+            # Stand-ins for the teacher and room of an empty optional theory cell
+            dummy_teacher_id_map[section, None] = f"DUMMY_TEACHER_{section}_THEORY"
+            all_teachers.add(dummy_teacher_id_map[section, None])
+            dummy_theory_room_id_map[section] = f"DUMMY_ROOM_{section}_THEORY"
+            all_theory_rooms.add(dummy_theory_room_id_map[section])
+
+    teacher_name_to_id = {name: i for i, name in enumerate(sorted(all_teachers))}
+    theory_room_name_to_id = {name: i for i, name in enumerate(sorted(all_theory_rooms))}
+    lab_room_name_to_id = {name: i for i, name in enumerate(sorted(all_lab_rooms))}
+    inv_lab_room_id_to_name = {i: name for name, i in lab_room_name_to_id.items()}
+    real_lab_room_ids = [i for i, name in inv_lab_room_id_to_name.items() if not name.startswith("DUMMY")]
+
+    # Value domains of every cell; prune_domains() narrows them before the model is built
+    theory_domains = {}
+    for section in sections_to_solve:
+        for (day, slot) in tba_slots_by_section[section]:
+            theory_domains[section, day, slot] = list(range(len(core_subject_map[section]) + (1 if blocks else 0)))
+    lab_subject_domains, lab_room_domains = {}, {}
+    for section in sections_to_solve:
+        for day in days:
+            for lab_slot_idx in lab_slot_name_to_id.values():
+                available = available_lab_slots[section][day].get(lab_slot_idx, False)
+                lab_subject_domains[section, day, lab_slot_idx] = list(range(section_lab_count[section])) if available else []
+                lab_room_domains[section, day, lab_slot_idx] = list(real_lab_room_ids) if available else []
+
+    for section in sections_to_solve:
+        core_subjects = config_data['core_subjects'][section]
+        section_teacher_id_list_map[section] = [
+            teacher_name_to_id.get(teacher_subject_map[section].get(s, ''), -1) for s in core_subjects]
+        labs = config_data['labs'].get(section, [])
+        lab_teacher_id_list_map[section] = [
+            teacher_name_to_id.get(lab_teacher_map[section].get(ln, ''), -1) for ln in labs]
+
+    return {
+        'config': config_data,
+        'timetable': timetable_data,
+        'grid': grid,
+        'assigned_by_section': assigned_by_section,
+        'sections_to_solve': list(sections_to_solve),
+        'phase': phase,
+        'all_sections': all_sections,
+        'days': days,
+        'slots': slots,
+        'groups': groups,
+        'section_index_map': section_index_map,
+        'core_subject_map': core_subject_map,
+        'inv_core_subject_map': inv_core_subject_map,
+        'teacher_subject_map': teacher_subject_map,
+        'tba_slots_by_section': tba_slots_by_section,
+        'lab_slot_name_to_id': lab_slot_name_to_id,
+        'inv_lab_slot_id_to_name': inv_lab_slot_id_to_name,
+        'lab_name_map': lab_name_map,
+        'inv_lab_name_map': inv_lab_name_map,
+        'lab_teacher_map': lab_teacher_map,
+        'lab_teacher_id_list_map': lab_teacher_id_list_map,
+        'section_teacher_id_list_map': section_teacher_id_list_map,
+        'available_lab_slots': available_lab_slots,
+        'section_lab_count': section_lab_count,
+        'dummy_teacher_id_map': dummy_teacher_id_map,
+        'dummy_lab_room_id_map': dummy_lab_room_id_map,
+        'dummy_theory_room_id_map': dummy_theory_room_id_map,
+        'teacher_name_to_id': teacher_name_to_id,
+        'theory_room_name_to_id': theory_room_name_to_id,
+        'lab_room_name_to_id': lab_room_name_to_id,
+        'inv_lab_room_id_to_name': inv_lab_room_id_to_name,
+        'real_lab_room_ids': real_lab_room_ids,
+        'theory_domains': theory_domains,
+        'theory_blocks': blocks,
+        'lab_subject_domains': lab_subject_domains,
+        'lab_room_domains': lab_room_domains,
+    }
+
+
+def count_pre_assigned(inst, section):
+    """Counts the pre-assigned ("Assigned") classes of each core subject."""
+    grid = inst['grid']
+    pre_assigned_counts = {subj: 0 for subj in inst['core_subject_map'][section]}
+    for day, slot in inst['assigned_by_section'].get(section, []):
+        subject = grid.get('subject', day, slot, section)
+        if subject in pre_assigned_counts:
+            pre_assigned_counts[subject] += 1
+    return pre_assigned_counts
+
+
+def required_theory_counts(inst, section, num_tba_slots):
+    """
+    Returns {subject: classes still needed} for a section, exiting if the
+    "To Be Assigned" slots cannot satisfy the 3-per-week rule. With theory
+    blocks the cells are optional, so there only must be enough of them.
+    """
+    pre_assigned_counts = count_pre_assigned(inst, section)
+    needed = {subj: max(0, 3 - count) for subj, count in pre_assigned_counts.items()}
+    total_needed = sum(needed.values())
+    if inst['theory_blocks'] and num_tba_slots < total_needed:
+        print(f"FATAL ERROR: Section {section} has {num_tba_slots} open cells for theory,"
+              f" but needs {total_needed} to satisfy the '3-per-week' rule after accounting for pre-assigned classes.",
+              file=sys.stderr)
+        sys.exit(1)
+    if not inst['theory_blocks'] and num_tba_slots != total_needed:
+        print(f"FATAL ERROR: Section {section} has {num_tba_slots} 'To Be Assigned' slots,"
+              f" but needs {total_needed} to satisfy the '3-per-week' rule after accounting for pre-assigned classes.",
+              file=sys.stderr)
+        print(f"Pre-assigned counts: {pre_assigned_counts}", file=sys.stderr)
+        print("Please correct data.json and try again.", file=sys.stderr)
+        sys.exit(1)
+    return needed
+
+
+def pre_assigned_subjects_on_day(inst, section, day):
+    """Returns the core subjects already "Assigned" to a section on a day."""
+    grid = inst['grid']
+    subjects = set()
+    for slot in inst['slots']:
+        if grid.status(day, slot, section) == "Assigned":
+            subject = grid.get('subject', day, slot, section)
+            if subject in inst['core_subject_map'][section]:
+                subjects.add(subject)
+    return subjects
+
+
+def pre_assigned_labs(inst, section):
+    """
+    Returns (lab_counts, daily_counts) for the lab sessions a section already
+    has: lab_counts[group, lab_name] and daily_counts[day] count "Assigned"
+    2-hour lab windows. Both are empty for timetables that were never solved.
+    """
+    section_lab_names = set(inst['config']['labs'].get(section, []))
+    grid = inst['grid']
+    lab_counts, daily_counts = {}, {}
+    for day in inst['days']:
+        for lab_slot_name in inst['lab_slot_name_to_id']:
+            first_slot = LAB_SLOT_MAP.get(lab_slot_name, (None,))[0]
+            if grid.status(day, first_slot, section) != "Assigned":
+                continue
+            subject = str(grid.get('subject', day, first_slot, section) or '')
+            parts = [LAB_GROUP_PATTERN.match(p.strip()) for p in subject.split(' / ')]
+            if not all(parts) or not {m.group(1) for m in parts} <= section_lab_names:
+                continue
+            for m in parts:
+                lab_counts[m.group(2), m.group(1)] = lab_counts.get((m.group(2), m.group(1)), 0) + 1
+            daily_counts[day] = daily_counts.get(day, 0) + 1
+    return lab_counts, daily_counts
+
+
+def pre_assigned_resources(inst, day, slot):
+    """
+    Returns the (teacher ids, theory room ids, lab room ids) used by
+    "Assigned" cells of every section at one 1-hour slot.
+    """
+    teacher_name_to_id = inst['teacher_name_to_id']
+    theory_room_name_to_id = inst['theory_room_name_to_id']
+    lab_room_name_to_id = inst['lab_room_name_to_id']
+    teachers, theory_rooms, lab_rooms = [], [], []
+    grid = inst['grid']
+    for section in inst['section_index_map'][day]:
+        if grid.status(day, slot, section) != "Assigned":
+            continue
+        for t in split_cell(grid.get('teacher', day, slot, section)):
+            if t in teacher_name_to_id:
+                teachers.append(teacher_name_to_id[t])
+        room = grid.get('room', day, slot, section)
+        if room and "/" not in str(room):
+            if room in theory_room_name_to_id:
+                theory_rooms.append(theory_room_name_to_id[room])
+        else:
+            for r in split_cell(room):
+                if r in lab_room_name_to_id:
+                    lab_rooms.append(lab_room_name_to_id[r])
+    return teachers, theory_rooms, lab_rooms
+
+
+def prune_domains(inst, verbose=True):
+    """
+    Removes values that "Assigned" occupancy already rules out, before the
+    model is built (the same analysis dd.py prints):
+    - theory subjects whose teacher is busy in that slot, that are already
+      taught that day, or that need no more classes this week
+    - lab subjects whose teacher is busy in either hour of the window, or
+      that every group already has this week
+    - lab rooms that are busy in either hour of the window
+    A lab window left with fewer labs or rooms than groups is closed.
+    Optional theory cells (see build_instance()) always keep "no class".
+
+    Returns (removed, impossible_cells): counts per kind and the theory
+    cells left with no possible subject. verbose prints the counts.
+    """
+    occupancy = build_occupancy(inst['config'], inst['grid'], inst['all_sections'])
+    removed = {'theory': 0, 'lab_subject': 0, 'lab_room': 0, 'lab_windows': 0}
+    impossible_cells = []
+    groups = inst['groups']
+
+    needed_by_section = {}
+    already_by_section_day = {}
+    for (section, day, slot), domain in inst['theory_domains'].items():
+        if section not in needed_by_section:
+            needed_by_section[section] = {s: max(0, 3 - c) for s, c in count_pre_assigned(inst, section).items()}
+        if (section, day) not in already_by_section_day:
+            already_by_section_day[section, day] = pre_assigned_subjects_on_day(inst, section, day)
+        room = inst['config']['section_theory_rooms'][section]
+        no_class = len(inst['core_subject_map'][section])
+        keep = []
+        if occupancy.is_free('room', room, day, (slot,)):
+            for j in domain:
+                if j == no_class:
+                    continue
+                subject = inst['inv_core_subject_map'][section][j]
+                teacher = inst['teacher_subject_map'][section].get(subject)
+                if needed_by_section[section][subject] == 0 or subject in already_by_section_day[section, day]:
+                    continue
+                if teacher and not occupancy.is_free('teacher', teacher, day, (slot,)):
+                    continue
+                keep.append(j)
+        if no_class in domain:
+            keep.append(no_class)
+        removed['theory'] += len(domain) - len(keep)
+        inst['theory_domains'][section, day, slot] = keep
+        if not keep:
+            impossible_cells.append((section, day, slot))
+
+    labs_done_by_section = {}
+    for (section, day, lab_slot_idx), domain in inst['lab_subject_domains'].items():
+        if not domain:
+            continue
+        if section not in labs_done_by_section:
+            lab_counts, _ = pre_assigned_labs(inst, section)
+            labs_done_by_section[section] = {lab for lab in inst['lab_name_map'][section]
+                                             if all(lab_counts.get((g, lab), 0) for g in groups)}
+        window = LAB_SLOT_MAP[inst['inv_lab_slot_id_to_name'][lab_slot_idx]]
+        keep_labs = []
+        for l in domain:
+            lab_name = inst['inv_lab_name_map'][section][l]
+            teacher = inst['lab_teacher_map'][section].get(lab_name)
+            if lab_name in labs_done_by_section[section]:
+                continue
+            if teacher and not occupancy.is_free('teacher', teacher, day, window):
+                continue
+            keep_labs.append(l)
+        room_domain = inst['lab_room_domains'][section, day, lab_slot_idx]
+        keep_rooms = []
+        for r in room_domain:
+            name = inst['inv_lab_room_id_to_name'][r]
+            if not occupancy.room_free(name, day, window):
+                continue
+            keep_rooms.append(r)
+        if len(keep_labs) < len(groups) or len(keep_rooms) < len(groups):
+            keep_labs, keep_rooms = [], []
+            removed['lab_windows'] += 1
+            inst['available_lab_slots'][section][day][lab_slot_idx] = False
+        removed['lab_subject'] += len(domain) - len(keep_labs)
+        removed['lab_room'] += len(room_domain) - len(keep_rooms)
+        inst['lab_subject_domains'][section, day, lab_slot_idx] = keep_labs
+        inst['lab_room_domains'][section, day, lab_slot_idx] = keep_rooms
+
+    total = removed['theory'] + removed['lab_subject'] + removed['lab_room']
+    if verbose:
+        print(f"Pruning removed {total} values: {removed['theory']} theory subjects, "
+              f"{removed['lab_subject']} lab subjects, {removed['lab_room']} lab rooms "
+              f"({removed['lab_windows']} lab windows closed)")
+    return removed, impossible_cells
+
+
+def build_cell_index(cells):
+    """
+    Indexes theory cell keys (section, day, slot) by section, by
+    (section, day) and by (day, slot) in one pass, so constraint blocks
+    never rescan every cell.
+    """
+    index = {'by_section': {}, 'by_section_day': {}, 'by_day_slot': {}}
+    for key in cells:
+        section, day, slot = key
+        index['by_section'].setdefault(section, []).append(key)
+        index['by_section_day'].setdefault((section, day), []).append(key)
+        index['by_day_slot'].setdefault((day, slot), []).append(key)
+    return index
+
+
+def build_lab_index(lab_keys):
+    """
+    Indexes lab keys (section, day, lab_slot_idx, group) by
+    (section, group), by (section, day) and by (day, lab_slot_idx).
+    """
+    index = {'by_section_group': {}, 'by_section_day': {}, 'by_day_window': {}}
+    for key in lab_keys:
+        section, day, lab_slot_idx, group = key
+        index['by_section_group'].setdefault((section, group), []).append(key)
+        index['by_section_day'].setdefault((section, day), []).append(key)
+        index['by_day_window'].setdefault((day, lab_slot_idx), []).append(key)
+    return index
+
+
+def reify_value(model, derived, literal, var, value, equal=True):
+    """
+    Makes literal true iff var == value (var != value with equal=False).
+    The link is recorded in derived as ("eq" or "ne", literal, var, value)
+    by proto index, so add_hints() can hint the literal from var's hint.
+    """
+    if equal:
+        model.Add(var == value).OnlyEnforceIf(literal)
+        model.Add(var != value).OnlyEnforceIf(literal.Not())
+    else:
+        model.Add(var != value).OnlyEnforceIf(literal)
+        model.Add(var == value).OnlyEnforceIf(literal.Not())
+    derived.append(("eq" if equal else "ne", literal.Index(), var.Index(), value))
+
+
+def add_element(model, derived, index, options, target):
+    """AddElement(index, options, target), recorded in derived like reify_value()."""
+    model.AddElement(index, options, target)
+    derived.append(("element", target.Index(), index.Index(), list(options)))
+
+
+def value_literal(model, cache, var, value, derived):
+    """Returns a literal for var == value, created once per (var, value)."""
+    key = (var.Index(), value)
+    if key not in cache:
+        b = model.NewBoolVar(f"{var.Name()}_is_{value}")
+        reify_value(model, derived, b, var, value)
+        cache[key] = b
+    return cache[key]
+
+
+def add_interval_resources(model, inst, theory_teacher_lits, lab_teacher_lits, lab_room_lits, theory_present=None):
+    """
+    Adds one AddNoOverlap per teacher, theory room and lab room.
+
+    Every (cell, value) that would use a resource becomes an optional
+    interval whose presence literal is "the cell takes that value"; labs are
+    a single 2-hour interval. Pre-assigned classes and the fixed theory room
+    of each "To Be Assigned" cell are fixed intervals. Time is laid out as
+    day_index * (len(slots) + 1) + slot_index.
+
+    theory_teacher_lits: {(section, day, slot): [(teacher_id, literal)]}
+    lab_teacher_lits:    {(section, day, lab_slot_idx, group): [(teacher_id, literal)]}
+    lab_room_lits:       {(section, day, lab_slot_idx, group): [(room_id, literal)]}
+    theory_present:      {(section, day, slot): literal} of optional theory cells,
+                         whose room interval is optional too
+    """
+    theory_present = theory_present or {}
+    slots = inst['slots']
+    slot_pos = {slot: i for i, slot in enumerate(slots)}
+    day_offset = {day: i * (len(slots) + 1) for i, day in enumerate(inst['days'])}
+    intervals = {'teacher': {}, 'theory_room': {}, 'lab_room': {}}
+
+    def add_fixed(kind, resource_id, start, size, name):
+        intervals[kind].setdefault(resource_id, []).append(model.NewFixedSizeIntervalVar(start, size, name))
+
+    def add_optional(kind, resource_id, start, size, literal, name):
+        intervals[kind].setdefault(resource_id, []).append(
+            model.NewOptionalFixedSizeIntervalVar(start, size, literal, name))
+
+    # 1. Pre-assigned classes of every section
+    for day in inst['days']:
+        for slot in slots:
+            start = day_offset[day] + slot_pos[slot]
+            fixed_teachers, fixed_theory_rooms, fixed_lab_rooms = pre_assigned_resources(inst, day, slot)
+            for t in fixed_teachers:
+                add_fixed('teacher', t, start, 1, f"fixed_t{t}_{day}_{slot}")
+            for r in fixed_theory_rooms:
+                add_fixed('theory_room', r, start, 1, f"fixed_room{r}_{day}_{slot}")
+            for r in fixed_lab_rooms:
+                add_fixed('lab_room', r, start, 1, f"fixed_lab_room{r}_{day}_{slot}")
+
+    # 2. Theory sessions
+    for (section, day, slot), options in theory_teacher_lits.items():
+        start = day_offset[day] + slot_pos[slot]
+        room_id = inst['theory_room_name_to_id'][inst['config']['section_theory_rooms'][section]]
+        if (section, day, slot) in theory_present:
+            add_optional('theory_room', room_id, start, 1, theory_present[section, day, slot],
+                         f"theory_room_{section}_{day}_{slot}")
+        else:
+            add_fixed('theory_room', room_id, start, 1, f"theory_room_{section}_{day}_{slot}")
+        for teacher_id, literal in options:
+            add_optional('teacher', teacher_id, start, 1, literal, f"theory_{section}_{day}_{slot}_t{teacher_id}")
+
+    # 3. Lab sessions: one 2-hour interval per (session, value)
+    for key in lab_teacher_lits.keys() | lab_room_lits.keys():
+        section, day, lab_slot_idx, group = key
+        first, second = LAB_SLOT_MAP[inst['inv_lab_slot_id_to_name'][lab_slot_idx]]
+        start = day_offset[day] + slot_pos[first]
+        size = 2 if slot_pos[second] == slot_pos[first] + 1 else 1
+        starts = [start] if size == 2 else [start, day_offset[day] + slot_pos[second]]
+        for teacher_id, literal in lab_teacher_lits.get(key, []):
+            for st in starts:
+                add_optional('teacher', teacher_id, st, size, literal, f"lab_{group}_{section}_{day}_{lab_slot_idx}_t{teacher_id}")
+        for room_id, literal in lab_room_lits.get(key, []):
+            for st in starts:
+                add_optional('lab_room', room_id, st, size, literal, f"lab_{group}_{section}_{day}_{lab_slot_idx}_r{room_id}")
+
+    for per_resource in intervals.values():
+        for resource_intervals in per_resource.values():
+            if len(resource_intervals) > 1:
+                model.AddNoOverlap(resource_intervals)
+
+
+def add_theory_blocks(model, inst, present, lab_present, guards=None):
+    """
+    Lets the model choose each day's theory layout (settings.theory_blocks).
+
+    present[section, day, slot] is true when an optional theory cell takes a
+    class and lab_present[section, day, lab_slot_idx] when a lab window is
+    used. The block list is compiled once into 0/1 day patterns (plus the
+    empty day); each (section, day) gets one AddAllowedAssignments over its
+    open cells, with the patterns narrowed to those that match its
+    pre-assigned cells. A theory class and a lab cannot share a cell.
+
+    Returns the (section, day) pairs whose pre-assigned classes already fit
+    no block; their layout is left unconstrained.
+    """
+    slots, grid = inst['slots'], inst['grid']
+    patterns = [(0,) * len(slots)] + [tuple(int(slot in block) for slot in slots) for block in inst['theory_blocks']]
+    unfit = []
+    for section in inst['sections_to_solve']:
+        for day in inst['days']:
+            open_slots, fixed = [], {}
+            for i, slot in enumerate(slots):
+                if (section, day, slot) in present:
+                    open_slots.append(i)
+                else:
+                    subject = grid.get('subject', day, slot, section) or ''
+                    fixed[i] = int(grid.status(day, slot, section) == "Assigned" and "(G-" not in subject)
+            if not open_slots:
+                continue
+            allowed = {tuple(p[i] for i in open_slots) for p in patterns if all(p[i] == v for i, v in fixed.items())}
+            if not allowed:
+                unfit.append((section, day))
+                continue
+            enforce(model.AddAllowedAssignments([present[section, day, slots[i]] for i in open_slots], sorted(allowed)),
+                    guard_literal(model, guards, ("blocks", section, day)))
+
+    for (section, day, slot), literal in present.items():
+        lab_slot_idx = inst['lab_slot_name_to_id'].get(THEORY_SLOT_TO_LAB_SLOT_MAP.get(slot))
+        if (section, day, lab_slot_idx) in lab_present:
+            model.AddBoolOr([literal.Not(), lab_present[section, day, lab_slot_idx].Not()])
+
+    if unfit:
+        print(f"Warning: the pre-assigned classes of {len(unfit)} section-day(s) fit no theory block; "
+              f"their layout is left unconstrained", file=sys.stderr)
+    return unfit
+
+
+class BuildTimer:
+    """
+    Times each block of a model build and counts the variables and
+    constraints it adds. finish() returns
+    [{'name', 'seconds', 'variables', 'constraints'}] in build order.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.stages = []
+        self.current = None
+
+    def stage(self, name, banner=None):
+        """Closes the running block and starts `name`, printing its banner if given."""
+        self.finish()
+        if banner:
+            print(banner)
+        proto = self.model.Proto()
+        self.current = (name, time.perf_counter(), len(proto.variables), len(proto.constraints))
+
+    def finish(self):
+        if self.current is not None:
+            name, start, num_vars, num_cons = self.current
+            proto = self.model.Proto()
+            self.stages.append({
+                'name': name,
+                'seconds': time.perf_counter() - start,
+                'variables': len(proto.variables) - num_vars,
+                'constraints': len(proto.constraints) - num_cons,
+            })
+            self.current = None
+        return self.stages
+
+
+def build_model(inst, formulation="int", resources="slot"):
+    """
+    Creates the CP-SAT model for an instance.
+
+    formulation selects how assignments are encoded:
+    - "int":  one IntVar per cell plus reified ==/!= literals for counting
+    - "bool": one presence literal per (cell, value) with AddExactlyOne and
+              linear sums; the int values are derived from the literals
+
+    resources selects how teacher/room clashes are prevented:
+    - "slot":     one AllDifferent (or at-most-one sum) per 1-hour slot
+    - "interval": optional intervals with one AddNoOverlap per resource
+
+    Returns (model, variables) where variables holds the theory values
+    ('new_classes') and the per-group lab subject/room values, keyed the same
+    way for both formulations, so solver.Value() reads either.
+    """
+    if formulation == "bool":
+        return build_bool_model(inst, resources)
+    return build_int_model(inst, resources)
+
+
+def build_int_model(inst, resources="slot"):
+    """Builds the model with IntVar cells and reified counting literals."""
+    config_data = inst['config']
+    sections_to_solve = inst['sections_to_solve']
+    days, slots, groups = inst['days'], inst['slots'], inst['groups']
+    core_subject_map = inst['core_subject_map']
+    lab_slot_name_to_id = inst['lab_slot_name_to_id']
+    section_lab_count = inst['section_lab_count']
+    teacher_name_to_id = inst['teacher_name_to_id']
+    theory_room_name_to_id = inst['theory_room_name_to_id']
+    lab_room_name_to_id = inst['lab_room_name_to_id']
+
+    model = cp_model.CpModel()
+    timer = BuildTimer(model)
+    # Auxiliary variables whose value follows from the decision variables (see add_hints())
+    derived = []
+
+    # --- Theory Variables ---
+    timer.stage("theory_variables")
+    new_classes = {}
+    for section in sections_to_solve:
+        for (day, slot) in inst['tba_slots_by_section'][section]:
+            new_classes[section, day, slot] = model.NewIntVarFromDomain(
+                cp_model.Domain.FromValues(inst['theory_domains'][section, day, slot]), f"theory_{section}_{day}_{slot}")
+    # With theory blocks every cell is optional: the value len(core subjects) means "no class"
+    theory_present = {}
+    if inst['theory_blocks']:
+        for key, var in new_classes.items():
+            no_class = len(core_subject_map[key[0]])
+            theory_present[key] = model.NewBoolVar(f"has_theory_{key[0]}_{key[1]}_{key[2]}")
+            reify_value(model, derived, theory_present[key], var, no_class, equal=False)
+
+    # --- Lab Variables ---
+    timer.stage("lab_variables")
+    lab_subject = {}  # [section, day, lab_slot_idx, group] -> subject_idx or NO_LAB (= lab count)
+    lab_room = {}     # [section, day, lab_slot_idx, group] -> room_idx or the group's dummy room
+    for section in sections_to_solve:
+        no_lab_idx = section_lab_count[section]
+        for day in days:
+            for lab_slot_idx in lab_slot_name_to_id.values():
+                subject_domain = [no_lab_idx] + inst['lab_subject_domains'][section, day, lab_slot_idx]
+                for group in groups:
+                    dummy_room_id = lab_room_name_to_id[inst['dummy_lab_room_id_map'][section, group]]
+                    room_domain = [dummy_room_id] + inst['lab_room_domains'][section, day, lab_slot_idx]
+                    lab_subject[section, day, lab_slot_idx, group] = model.NewIntVarFromDomain(
+                        cp_model.Domain.FromValues(subject_domain), f"lab_{group}_subj_{section}_{day}_{lab_slot_idx}")
+                    lab_room[section, day, lab_slot_idx, group] = model.NewIntVarFromDomain(
+                        cp_model.Domain.FromValues(room_domain), f"lab_{group}_room_{section}_{day}_{lab_slot_idx}")
+
+    cell_index = build_cell_index(new_classes)
+
+    # --- Constraint 1: Subject Frequency (Theory) ---
+    timer.stage("subject_frequency", "Adding subject frequency constraints (Theory)...")
+    for section in ([] if inst['phase'] == "labs" else sections_to_solve):
+        section_vars = [new_classes[key] for key in cell_index['by_section'].get(section, [])]
+        needed = required_theory_counts(inst, section, len(section_vars))
+        for subject_name, subject_index in core_subject_map[section].items():
+            bool_list = [model.NewBoolVar(f"sec_{section}_subj_{subject_index}_var_{i}") for i in range(len(section_vars))]
+            for i, var in enumerate(section_vars):
+                reify_value(model, derived, bool_list[i], var, subject_index)
+            model.Add(sum(bool_list) == needed[subject_name])
+
+    # --- Constraint 2: Daily Subject Uniqueness (Theory) ---
+    timer.stage("daily_uniqueness", "Adding daily subject uniqueness constraints (Theory)...")
+    for section in sections_to_solve:
+        for day in days:
+            daily_vars = [new_classes[key] for key in cell_index['by_section_day'].get((section, day), [])]
+            if not daily_vars:
+                continue
+            already_today = pre_assigned_subjects_on_day(inst, section, day)
+            for subject_name, subject_index in core_subject_map[section].items():
+                bool_list = [model.NewBoolVar(f"day_{day}_sec_{section}_subj_{subject_index}_var_{i}") for i in range(len(daily_vars))]
+                for i, var in enumerate(daily_vars):
+                    reify_value(model, derived, bool_list[i], var, subject_index)
+                if subject_name in already_today:
+                    model.Add(sum(bool_list) == 0)
+                else:
+                    model.Add(sum(bool_list) <= 1)
+
+    # --- Constraint 3: Lab Parallelism & Properties ---
+    timer.stage("lab_parallelism", "Adding lab parallelism constraints...")
+    lab_present = {}
+    for section in sections_to_solve:
+        no_lab_idx = section_lab_count[section]
+        if no_lab_idx == 0:
+            continue
+        for day in days:
+            for lab_slot_idx in lab_slot_name_to_id.values():
+                has_lab = {}
+                for group in groups:
+                    subj = lab_subject[section, day, lab_slot_idx, group]
+                    room = lab_room[section, day, lab_slot_idx, group]
+                    dummy_room_id = lab_room_name_to_id[inst['dummy_lab_room_id_map'][section, group]]
+                    b = model.NewBoolVar(f"b_{group}_has_lab_{section}_{day}_{lab_slot_idx}")
+                    reify_value(model, derived, b, subj, no_lab_idx, equal=False)
+                    # Link subject to room (if no subject, no room)
+                    model.Add(room != dummy_room_id).OnlyEnforceIf(b)
+                    model.Add(room == dummy_room_id).OnlyEnforceIf(b.Not())
+                    has_lab[group] = b
+
+                first = groups[0]
+                lab_present[section, day, lab_slot_idx] = has_lab[first]
+                for i, g1 in enumerate(groups):
+                    # All groups must have parallel labs
+                    if g1 != first:
+                        model.Add(has_lab[first] == has_lab[g1])
+                    # If they have labs, subjects and rooms must be different
+                    for g2 in groups[i + 1:]:
+                        model.Add(lab_subject[section, day, lab_slot_idx, g1] !=
+                                  lab_subject[section, day, lab_slot_idx, g2]).OnlyEnforceIf(has_lab[first])
+                        model.Add(lab_room[section, day, lab_slot_idx, g1] !=
+                                  lab_room[section, day, lab_slot_idx, g2]).OnlyEnforceIf(has_lab[first])
+
+    # --- Constraint 4: Lab Session Frequency ---
+    timer.stage("lab_frequency", "Adding lab frequency constraints...")
+    for section in sections_to_solve:
+        lab_counts, _ = pre_assigned_labs(inst, section)
+        for group in groups:
+            all_subj_vars = [lab_subject[section, d, s, group] for d in days for s in lab_slot_name_to_id.values()]
+            for lab_idx in range(section_lab_count[section]):
+                bool_list = [model.NewBoolVar(f"b_freq_{group}_{section}_lab{lab_idx}_var{i}") for i in range(len(all_subj_vars))]
+                for i, var in enumerate(all_subj_vars):
+                    reify_value(model, derived, bool_list[i], var, lab_idx)
+                # Each lab exactly once per week, counting sessions already assigned
+                already = lab_counts.get((group, inst['inv_lab_name_map'][section][lab_idx]), 0)
+                model.Add(sum(bool_list) == max(0, 1 - already))
+
+    # --- Constraint 5: Daily Lab Limit ---
+    timer.stage("daily_lab_limit", "Adding daily lab limit constraints...")
+    for section in sections_to_solve:
+        no_lab_idx = section_lab_count[section]
+        if no_lab_idx == 0:
+            continue
+        _, daily_counts = pre_assigned_labs(inst, section)
+        for day in days:
+            for group in groups:
+                daily_subj_vars = [lab_subject[section, day, s, group] for s in lab_slot_name_to_id.values()]
+                bool_list = [model.NewBoolVar(f"b_daily_{group}_{section}_{day}_var{i}") for i in range(len(daily_subj_vars))]
+                for i, var in enumerate(daily_subj_vars):
+                    reify_value(model, derived, bool_list[i], var, no_lab_idx, equal=False)
+                model.Add(sum(bool_list) <= max(0, 2 - daily_counts.get(day, 0)))  # At most 2 lab sessions per day
+
+    # --- Constraint 6: Resource Uniqueness (Combined Theory + Lab) ---
+    timer.stage("resource_uniqueness", "Adding combined resource uniqueness constraints...")
+    if resources == "interval":
+        theory_teacher_lits, lab_teacher_lits, lab_room_lits = {}, {}, {}
+        literal_cache = {}
+        for key, var in new_classes.items():
+            theory_teacher_lits[key] = []
+            teacher_opts = inst['section_teacher_id_list_map'][key[0]]
+            for j in inst['theory_domains'][key]:
+                if j == len(teacher_opts):
+                    continue  # no class
+                if teacher_opts[j] == -1:
+                    model.Add(var != j)
+                else:
+                    theory_teacher_lits[key].append((teacher_opts[j], value_literal(model, literal_cache, var, j, derived)))
+        for key, subj in lab_subject.items():
+            if inst['section_lab_count'][key[0]] == 0 or not inst['lab_subject_domains'][key[:3]]:
+                continue
+            lab_teacher_lits[key] = []
+            teacher_opts = inst['lab_teacher_id_list_map'][key[0]]
+            for l in inst['lab_subject_domains'][key[:3]]:
+                if teacher_opts[l] == -1:
+                    model.Add(subj != l)
+                else:
+                    lab_teacher_lits[key].append((teacher_opts[l], value_literal(model, literal_cache, subj, l, derived)))
+            lab_room_lits[key] = [(r, value_literal(model, literal_cache, lab_room[key], r, derived))
+                                  for r in inst['lab_room_domains'][key[:3]]]
+        add_interval_resources(model, inst, theory_teacher_lits, lab_teacher_lits, lab_room_lits, theory_present)
+    else:
+        for day in days:
+            for slot in slots:
+                # 1. Pre-assigned classes of every section
+                fixed_teachers, fixed_theory_rooms, fixed_lab_rooms = pre_assigned_resources(inst, day, slot)
+                teacher_vars = [model.NewConstant(t) for t in fixed_teachers]
+                theory_room_vars = [model.NewConstant(r) for r in fixed_theory_rooms]
+                lab_room_vars = [model.NewConstant(r) for r in fixed_lab_rooms]
+
+                # 2. Variable theory classes
+                for key in cell_index['by_day_slot'].get((day, slot), []):
+                    section = key[0]
+                    room_id = theory_room_name_to_id[config_data['section_theory_rooms'][section]]
+                    teacher_opts = inst['section_teacher_id_list_map'][section]
+                    if key in theory_present:
+                        # An empty cell uses the section's dummy teacher and room
+                        dummy_room_id = theory_room_name_to_id[inst['dummy_theory_room_id_map'][section]]
+                        room_var = model.NewIntVarFromDomain(cp_model.Domain.FromValues([room_id, dummy_room_id]),
+                                                             f"room_{section}_{day}_{slot}")
+                        add_element(model, derived, theory_present[key], [dummy_room_id, room_id], room_var)
+                        theory_room_vars.append(room_var)
+                        teacher_opts = teacher_opts + [teacher_name_to_id[inst['dummy_teacher_id_map'][section, None]]]
+                    else:
+                        theory_room_vars.append(model.NewConstant(room_id))
+                    teacher_var = model.NewIntVarFromDomain(
+                        cp_model.Domain.FromValues([o for o in teacher_opts if o != -1]), f"teacher_{section}_{day}_{slot}")
+                    add_element(model, derived, new_classes[key], teacher_opts, teacher_var)
+                    teacher_vars.append(teacher_var)
+
+                # 3. Variable lab classes that cover this slot
+                lab_slot_name = THEORY_SLOT_TO_LAB_SLOT_MAP.get(slot)
+                if lab_slot_name in lab_slot_name_to_id:
+                    lab_slot_idx = lab_slot_name_to_id[lab_slot_name]
+                    for section in sections_to_solve:
+                        if section_lab_count[section] == 0:
+                            continue
+                        for group in groups:
+                            dummy_teacher_id = teacher_name_to_id[inst['dummy_teacher_id_map'][section, group]]
+                            subj = lab_subject[section, day, lab_slot_idx, group]
+                            teacher_var = model.NewIntVar(0, len(teacher_name_to_id) - 1, f"lab_{group}_teach_{section}_{day}_{slot}")
+                            # Teacher list includes real teachers + unique dummy
+                            add_element(model, derived, subj, inst['lab_teacher_id_list_map'][section] + [dummy_teacher_id],
+                                        teacher_var)
+                            teacher_vars.append(teacher_var)
+                            lab_room_vars.append(lab_room[section, day, lab_slot_idx, group])
+
+                # Add the "all different" constraint for this specific 1-hour slot
+                if teacher_vars:
+                    model.AddAllDifferent(teacher_vars)
+                if theory_room_vars:
+                    model.AddAllDifferent(theory_room_vars)
+                if lab_room_vars:
+                    model.AddAllDifferent(lab_room_vars)
+
+    # --- Constraint 7: Continuous Theory Blocks ---
+    if inst['theory_blocks']:
+        timer.stage("theory_blocks", "Adding theory block constraints...")
+        add_theory_blocks(model, inst, theory_present, lab_present)
+
+    variables = {'formulation': "int", 'new_classes': new_classes, 'lab_subject': lab_subject, 'lab_room': lab_room,
+                 'theory_present': theory_present, 'derived': derived, 'build_stages': timer.finish()}
+    return model, variables
+
+
+def guard_literal(model, guards, key):
+    """
+    Returns the assumption literal guarding the constraint group `key`,
+    creating it on first use, or None when the model is not guarded.
+    """
+    if guards is None:
+        return None
+    if key not in guards:
+        guards[key] = model.NewBoolVar("assume_" + "_".join(str(k) for k in key))
+    return guards[key]
+
+
+def enforce(constraint, literal):
+    """Makes a constraint conditional on a guard literal (if any)."""
+    if literal is not None:
+        constraint.OnlyEnforceIf(literal)
+
+
+def add_at_most_one(model, literals, guard=None):
+    """AddAtMostOne, falling back to a linear sum when it must be guarded."""
+    if guard is None:
+        model.AddAtMostOne(literals)
+    else:
+        model.Add(sum(literals) <= 1).OnlyEnforceIf(guard)
+
+
+def add_at_most_one_use(model, literals, fixed_uses, guard=None):
+    """Allows a resource at most once in a slot, counting fixed uses."""
+    if fixed_uses + len(literals) <= 1:
+        return
+    enforce(model.Add(sum(literals) <= 1 - fixed_uses), guard)
+
+
+def build_bool_model(inst, resources="slot", guards=None):
+    """
+    Builds the model on presence literals.
+
+    theory_lits[section, day, slot][j] is true when core subject j is taught
+    in that cell; lab_lits[section, day, lab_slot_idx, group][l] and
+    room_lits[section, day, lab_slot_idx, group][room_id] do the same for
+    labs, with has_lab[section, day, lab_slot_idx] shared by all groups.
+    No reified ==/!= pairs, AddElement or dummy resources are needed.
+
+    If guards is a dict, every constraint group (per section, section/day,
+    section/group, teacher/day and room/day) is made conditional on an
+    assumption literal stored in it, for infeasibility explanations.
+    Guarding needs resources="slot", since AddNoOverlap cannot be enforced.
+    """
+    config_data = inst['config']
+    sections_to_solve = inst['sections_to_solve']
+    days, slots, groups = inst['days'], inst['slots'], inst['groups']
+    core_subject_map = inst['core_subject_map']
+    lab_slot_name_to_id = inst['lab_slot_name_to_id']
+    section_lab_count = inst['section_lab_count']
+    theory_room_name_to_id = inst['theory_room_name_to_id']
+    lab_room_name_to_id = inst['lab_room_name_to_id']
+
+    model = cp_model.CpModel()
+    timer = BuildTimer(model)
+    # Stands in for the literal of every value removed from a domain
+    false_lit = model.NewConstant(0)
+
+    # --- Theory Literals ---
+    timer.stage("theory_variables")
+    theory_lits, theory_present = {}, {}
+    for section in sections_to_solve:
+        teacher_opts = inst['section_teacher_id_list_map'][section]
+        for (day, slot) in inst['tba_slots_by_section'][section]:
+            domain = set(inst['theory_domains'][section, day, slot])
+            lits = [model.NewBoolVar(f"theory_{section}_{day}_{slot}_is_{j}") if j in domain and teacher_opts[j] != -1
+                    else false_lit for j in range(len(teacher_opts))]
+            if inst['theory_blocks']:
+                # Optional cell: at most one subject, present iff it has one
+                present = model.NewBoolVar(f"has_theory_{section}_{day}_{slot}")
+                model.Add(sum(lits) == present)
+                theory_present[section, day, slot] = present
+            else:
+                model.AddExactlyOne(lits)
+            theory_lits[section, day, slot] = lits
+
+    # --- Lab Literals (and Constraint 3: Lab Parallelism) ---
+    timer.stage("lab_variables")
+    has_lab, lab_lits, room_lits = {}, {}, {}
+    for section in sections_to_solve:
+        num_labs = section_lab_count[section]
+        if num_labs == 0:
+            continue
+        for day in days:
+            for lab_slot_idx in lab_slot_name_to_id.values():
+                subject_domain = set(inst['lab_subject_domains'][section, day, lab_slot_idx])
+                room_domain = inst['lab_room_domains'][section, day, lab_slot_idx]
+                if not subject_domain:
+                    continue
+                teacher_opts = inst['lab_teacher_id_list_map'][section]
+                b = model.NewBoolVar(f"has_lab_{section}_{day}_{lab_slot_idx}")
+                has_lab[section, day, lab_slot_idx] = b
+                for group in groups:
+                    key = (section, day, lab_slot_idx, group)
+                    lab_lits[key] = [model.NewBoolVar(f"lab_{group}_{section}_{day}_{lab_slot_idx}_is_{l}")
+                                     if l in subject_domain and teacher_opts[l] != -1 else false_lit
+                                     for l in range(num_labs)]
+                    room_lits[key] = {r: model.NewBoolVar(f"lab_{group}_room_{section}_{day}_{lab_slot_idx}_is_{r}") for r in room_domain}
+                    # Groups run in parallel: one lab and one room each iff the slot has a lab
+                    model.Add(sum(lab_lits[key]) == b)
+                    model.Add(sum(room_lits[key].values()) == b)
+                # If they have labs, subjects and rooms must be different
+                g_parallel = guard_literal(model, guards, ("lab_parallel", section, day))
+                for l in subject_domain:
+                    add_at_most_one(model, [lab_lits[section, day, lab_slot_idx, g][l] for g in groups], g_parallel)
+                for r in room_domain:
+                    add_at_most_one(model, [room_lits[section, day, lab_slot_idx, g][r] for g in groups], g_parallel)
+
+    cell_index = build_cell_index(theory_lits)
+    lab_index = build_lab_index(lab_lits)
+
+    # --- Constraint 1: Subject Frequency (Theory) ---
+    timer.stage("subject_frequency", "Adding subject frequency constraints (Theory)...")
+    for section in ([] if inst['phase'] == "labs" else sections_to_solve):
+        section_cells = [theory_lits[key] for key in cell_index['by_section'].get(section, [])]
+        needed = required_theory_counts(inst, section, len(section_cells))
+        g_frequency = guard_literal(model, guards, ("frequency", section))
+        for subject_name, subject_index in core_subject_map[section].items():
+            enforce(model.Add(sum(lits[subject_index] for lits in section_cells) == needed[subject_name]), g_frequency)
+
+    # --- Constraint 2: Daily Subject Uniqueness (Theory) ---
+    timer.stage("daily_uniqueness", "Adding daily subject uniqueness constraints (Theory)...")
+    for section in sections_to_solve:
+        for day in days:
+            daily_cells = [theory_lits[key] for key in cell_index['by_section_day'].get((section, day), [])]
+            if not daily_cells:
+                continue
+            already_today = pre_assigned_subjects_on_day(inst, section, day)
+            g_daily = guard_literal(model, guards, ("daily", section, day))
+            for subject_name, subject_index in core_subject_map[section].items():
+                if subject_name in already_today:
+                    for lits in daily_cells:
+                        enforce(model.Add(lits[subject_index] == 0), g_daily)
+                elif len(daily_cells) > 1:
+                    add_at_most_one(model, [lits[subject_index] for lits in daily_cells], g_daily)
+
+    # --- Constraint 3: Lab Parallelism & Properties ---
+    # Enforced while creating the lab literals above.
+
+    # --- Constraint 4: Lab Session Frequency ---
+    timer.stage("lab_frequency", "Adding lab frequency constraints...")
+    for section in sections_to_solve:
+        lab_counts, _ = pre_assigned_labs(inst, section)
+        for group in groups:
+            keys = lab_index['by_section_group'].get((section, group), [])
+            g_lab_frequency = guard_literal(model, guards, ("lab_frequency", section, group))
+            for lab_idx in range(section_lab_count[section]):
+                # Each lab exactly once per week, counting sessions already assigned
+                already = lab_counts.get((group, inst['inv_lab_name_map'][section][lab_idx]), 0)
+                enforce(model.Add(sum(lab_lits[k][lab_idx] for k in keys) == max(0, 1 - already)), g_lab_frequency)
+
+    # --- Constraint 5: Daily Lab Limit ---
+    timer.stage("daily_lab_limit", "Adding daily lab limit constraints...")
+    for section in sections_to_solve:
+        _, daily_counts = pre_assigned_labs(inst, section)
+        for day in days:
+            daily = [has_lab[k[:3]] for k in lab_index['by_section_day'].get((section, day), []) if k[3] == groups[0]]
+            limit = max(0, 2 - daily_counts.get(day, 0))
+            if len(daily) > limit:
+                # At most 2 lab sessions per day
+                enforce(model.Add(sum(daily) <= limit), guard_literal(model, guards, ("lab_daily", section, day)))
+
+    # --- Constraint 6: Resource Uniqueness (Combined Theory + Lab) ---
+    timer.stage("resource_uniqueness", "Adding combined resource uniqueness constraints...")
+    if resources == "interval":
+        theory_teacher_lits = {
+            key: [(t, lits[j]) for j, t in enumerate(inst['section_teacher_id_list_map'][key[0]]) if t != -1]
+            for key, lits in theory_lits.items()}
+        lab_teacher_lits = {
+            key: [(t, lits[l]) for l, t in enumerate(inst['lab_teacher_id_list_map'][key[0]]) if t != -1]
+            for key, lits in lab_lits.items()}
+        lab_room_lits = {key: list(room_lits[key].items()) for key in lab_lits}
+        add_interval_resources(model, inst, theory_teacher_lits, lab_teacher_lits, lab_room_lits, theory_present)
+    else:
+        for day in days:
+            for slot in slots:
+                fixed_teachers, fixed_theory_rooms, fixed_lab_rooms = pre_assigned_resources(inst, day, slot)
+                teacher_lits = {}
+                theory_room_uses = list(fixed_theory_rooms)
+                theory_room_lits, lab_room_lits = {}, {}
+
+                for key in cell_index['by_day_slot'].get((day, slot), []):
+                    section = key[0]
+                    room_id = theory_room_name_to_id[config_data['section_theory_rooms'][section]]
+                    if key in theory_present:
+                        theory_room_lits.setdefault(room_id, []).append(theory_present[key])
+                    else:
+                        theory_room_uses.append(room_id)
+                    for j, teacher_id in enumerate(inst['section_teacher_id_list_map'][section]):
+                        if teacher_id != -1:
+                            teacher_lits.setdefault(teacher_id, []).append(theory_lits[key][j])
+
+                lab_slot_name = THEORY_SLOT_TO_LAB_SLOT_MAP.get(slot)
+                if lab_slot_name in lab_slot_name_to_id:
+                    lab_slot_idx = lab_slot_name_to_id[lab_slot_name]
+                    for key in lab_index['by_day_window'].get((day, lab_slot_idx), []):
+                        section = key[0]
+                        for l, teacher_id in enumerate(inst['lab_teacher_id_list_map'][section]):
+                            if teacher_id != -1:
+                                teacher_lits.setdefault(teacher_id, []).append(lab_lits[key][l])
+                        for r, lit in room_lits[key].items():
+                            lab_room_lits.setdefault(r, []).append(lit)
+
+                for teacher_id in set(teacher_lits) | set(fixed_teachers):
+                    add_at_most_one_use(model, teacher_lits.get(teacher_id, []), fixed_teachers.count(teacher_id),
+                                        guard_literal(model, guards, ("teacher", teacher_id, day)))
+                for room_id in set(lab_room_lits) | set(fixed_lab_rooms):
+                    add_at_most_one_use(model, lab_room_lits.get(room_id, []), fixed_lab_rooms.count(room_id),
+                                        guard_literal(model, guards, ("lab_room", room_id, day)))
+                for room_id in theory_room_lits:
+                    add_at_most_one_use(model, theory_room_lits[room_id], theory_room_uses.count(room_id),
+                                        guard_literal(model, guards, ("theory_room", room_id, day)))
+                # Theory rooms of "To Be Assigned" cells are fixed, so only clashes among constants remain
+                for room_id in set(theory_room_uses) - set(theory_room_lits):
+                    if theory_room_uses.count(room_id) > 1:
+                        enforce(model.Add(model.NewConstant(theory_room_uses.count(room_id)) <= 1),
+                                guard_literal(model, guards, ("theory_room", room_id, day)))
+
+    # --- Constraint 7: Continuous Theory Blocks ---
+    if inst['theory_blocks']:
+        timer.stage("theory_blocks", "Adding theory block constraints...")
+        add_theory_blocks(model, inst, theory_present, has_lab, guards)
+
+    # --- Derived values, readable with solver.Value() like the int formulation ---
+    new_classes = {key: sum(j * lit for j, lit in enumerate(lits)) for key, lits in theory_lits.items()}
+    for key, present in theory_present.items():
+        new_classes[key] += len(core_subject_map[key[0]]) * (1 - present)
+    lab_subject, lab_room = {}, {}
+    for section in sections_to_solve:
+        no_lab_idx = section_lab_count[section]
+        for day in days:
+            for lab_slot_idx in lab_slot_name_to_id.values():
+                for group in groups:
+                    key = (section, day, lab_slot_idx, group)
+                    dummy_room_id = lab_room_name_to_id[inst['dummy_lab_room_id_map'][section, group]]
+                    if key not in lab_lits:
+                        lab_subject[key] = model.NewConstant(no_lab_idx)
+                        lab_room[key] = model.NewConstant(dummy_room_id)
+                        continue
+                    b = has_lab[section, day, lab_slot_idx]
+                    lab_subject[key] = sum(l * lit for l, lit in enumerate(lab_lits[key])) + no_lab_idx * (1 - b)
+                    lab_room[key] = sum(r * lit for r, lit in room_lits[key].items()) + dummy_room_id * (1 - b)
+
+    variables = {
+        'formulation': "bool",
+        'new_classes': new_classes,
+        'lab_subject': lab_subject,
+        'lab_room': lab_room,
+        'theory_lits': theory_lits,
+        'theory_present': theory_present,
+        'has_lab': has_lab,
+        'lab_lits': lab_lits,
+        'room_lits': room_lits,
+        'build_stages': timer.finish(),
+    }
+    return model, variables
+
+
+def extract_solution(solver, inst, variables):
+    """
+    Reads the solved values back into names.
+
+    Returns {'theory': {(section, day, slot): subject},
+             'labs': {(section, day, lab_slot_name): {group: (lab, room)}},
+             'cleared': [(section, day, slot)]}, where 'cleared' lists the
+    "To Be Assigned" cells that optional theory (theory blocks) left empty.
+    """
+    theory, cleared = {}, []
+    for (section, day, slot), var in variables['new_classes'].items():
+        value = solver.Value(var)
+        if value in inst['inv_core_subject_map'][section]:
+            theory[section, day, slot] = inst['inv_core_subject_map'][section][value]
+        elif inst['grid'].status(day, slot, section) == "To Be Assigned":
+            cleared.append((section, day, slot))
+
+    labs = {}
+    for section in inst['sections_to_solve']:
+        no_lab_idx = inst['section_lab_count'][section]
+        for day in inst['days']:
+            for lab_slot_idx, lab_slot_name in inst['inv_lab_slot_id_to_name'].items():
+                cell = {}
+                for group in inst['groups']:
+                    subj_idx = solver.Value(variables['lab_subject'][section, day, lab_slot_idx, group])
+                    if subj_idx == no_lab_idx:
+                        break
+                    room_idx = solver.Value(variables['lab_room'][section, day, lab_slot_idx, group])
+                    cell[group] = (inst['inv_lab_name_map'][section][subj_idx], inst['inv_lab_room_id_to_name'][room_idx])
+                else:
+                    labs[section, day, lab_slot_name] = cell
+    return {'theory': theory, 'labs': labs, 'cleared': cleared}
+
+
+def share_rows(timetable_data):
+    """
+    Copies the day lists and row dicts of a timetable but not its cells.
+    apply_solution() replaces whole cells, so the input stays untouched and
+    the solved cells can be told apart by identity (see writer.py).
+    """
+    return {day: [dict(row) for row in rows] for day, rows in timetable_data.items()}
+
+
+def apply_solution(timetable_data, inst, solution):
+    """Writes a solution into timetable_data, replacing (never mutating) the solved cells."""
+    config_data = inst['config']
+    section_index_map = inst['section_index_map']
+
+    # --- 1. Populate Theory Classes ---
+    for (section, day, slot), subject_name in solution['theory'].items():
+        list_index = section_index_map[day][section]
+        timetable_data[day][list_index][slot] = [{
+            'status': "Assigned",
+            'subject': subject_name,
+            'teacher': inst['teacher_subject_map'][section][subject_name],
+            'room': config_data['section_theory_rooms'][section],
+        }]
+
+    for section, day, slot in solution.get('cleared', []):
+        timetable_data[day][section_index_map[day][section]][slot] = [{'status': "Free"}]
+
+    # --- 2. Populate Lab Classes ---
+    for (section, day, lab_slot_name), cell in solution['labs'].items():
+        groups = [g for g in inst['groups'] if g in cell]
+        subject = " / ".join(f"{cell[g][0]} (G-{g})" for g in groups)
+        teacher = " / ".join(inst['lab_teacher_map'][section][cell[g][0]] for g in groups)
+        room = " / ".join(cell[g][1] for g in groups)
+        list_index = section_index_map[day][section]
+        for slot in LAB_SLOT_MAP[lab_slot_name]:
+            timetable_data[day][list_index][slot] = [
+                {'status': "Assigned", 'subject': subject, 'teacher': teacher, 'room': room}]
+
+
+def read_hints(inst, prior_data):
+    """
+    Maps a previously solved timetable onto the cells of this instance.
+
+    Returns a solution in the extract_solution() format, except that lab
+    windows which were free in prior_data map to None. Cells whose prior
+    value is not a legal value of this model are left out.
+    """
+    prior = {(day, obj['section']): obj for day in inst['days'] for obj in prior_data.get(day, [])}
+    theory, labs = {}, {}
+
+    for (section, day, slot), domain in inst['theory_domains'].items():
+        obj = prior.get((day, section))
+        if not obj or slot not in obj or obj[slot][0]['status'] != "Assigned":
+            continue
+        subject_index = inst['core_subject_map'][section].get(obj[slot][0].get('subject'))
+        if subject_index in domain and inst['section_teacher_id_list_map'][section][subject_index] != -1:
+            theory[section, day, slot] = obj[slot][0]['subject']
+
+    for (section, day, lab_slot_idx), subject_domain in inst['lab_subject_domains'].items():
+        lab_slot_name = inst['inv_lab_slot_id_to_name'][lab_slot_idx]
+        obj = prior.get((day, section))
+        if not subject_domain or not obj or lab_slot_name not in LAB_SLOT_MAP:
+            continue
+        first_slot = LAB_SLOT_MAP[lab_slot_name][0]
+        slot_info = obj[first_slot][0] if first_slot in obj else {}
+        if slot_info.get('status') == "Free":
+            labs[section, day, lab_slot_name] = None
+            continue
+        if slot_info.get('status') != "Assigned":
+            continue
+        parts = [LAB_GROUP_PATTERN.match(p.strip()) for p in str(slot_info.get('subject', '')).split(' / ')]
+        rooms = split_cell(slot_info.get('room'))
+        if not all(parts) or len(rooms) != len(parts):
+            continue
+        cell = {m.group(2): (m.group(1), room) for m, room in zip(parts, rooms)}
+        room_domain = inst['lab_room_domains'][section, day, lab_slot_idx]
+        lab_teachers = inst['lab_teacher_id_list_map'][section]
+        if set(cell) == set(inst['groups']) and all(
+                inst['lab_name_map'][section].get(lab) in subject_domain and
+                lab_teachers[inst['lab_name_map'][section][lab]] != -1 and
+                inst['lab_room_name_to_id'].get(room) in room_domain for lab, room in cell.values()):
+            labs[section, day, lab_slot_name] = cell
+
+    return {'theory': theory, 'labs': labs}
+
+
+def add_hints(model, inst, variables, hints):
+    """
+    Adds the values of read_hints() to the model with AddHint. In the int
+    formulation the auxiliary literals and teacher variables that follow
+    from the hinted cells (variables['derived']) are hinted too, so the
+    hint is a complete partial assignment.
+    """
+    bool_model = variables['formulation'] == "bool"
+    values = {}  # proto index -> hinted value
+
+    def hint(var, value):
+        model.AddHint(var, value)
+        values[var.Index()] = value
+
+    for key, subject_name in hints['theory'].items():
+        subject_index = inst['core_subject_map'][key[0]][subject_name]
+        if bool_model:
+            for j, lit in enumerate(variables['theory_lits'][key]):
+                model.AddHint(lit, j == subject_index)
+        else:
+            hint(variables['new_classes'][key], subject_index)
+
+    for (section, day, lab_slot_name), cell in hints['labs'].items():
+        lab_slot_idx = inst['lab_slot_name_to_id'][lab_slot_name]
+        if bool_model:
+            if (section, day, lab_slot_idx) not in variables['has_lab']:
+                continue
+            model.AddHint(variables['has_lab'][section, day, lab_slot_idx], cell is not None)
+        for group in inst['groups']:
+            key = (section, day, lab_slot_idx, group)
+            if cell is None:
+                lab_index = inst['section_lab_count'][section]
+                room_id = inst['lab_room_name_to_id'][inst['dummy_lab_room_id_map'][section, group]]
+            else:
+                lab_index = inst['lab_name_map'][section][cell[group][0]]
+                room_id = inst['lab_room_name_to_id'][cell[group][1]]
+            if bool_model:
+                for l, lit in enumerate(variables['lab_lits'][key]):
+                    model.AddHint(lit, l == lab_index)
+                for r, lit in variables['room_lits'][key].items():
+                    model.AddHint(lit, r == room_id)
+            else:
+                hint(variables['lab_subject'][key], lab_index)
+                hint(variables['lab_room'][key], room_id)
+
+    # Entries are in build order, so a source is hinted before what it determines.
+    # Variables fixed by their domain (e.g. a lab window no lab fits) count as hinted.
+    proto_vars = model.Proto().variables
+    for kind, target, source, arg in variables.get('derived', []):
+        if target in values:
+            continue
+        if source not in values:
+            domain = proto_vars[source].domain
+            if len(domain) != 2 or domain[0] != domain[1]:
+                continue
+            values[source] = domain[0]
+        if kind == "element":
+            value = arg[values[source]]
+        else:
+            value = int((values[source] == arg) == (kind == "eq"))
+        hint(model.GetIntVarFromProtoIndex(target), value)
+
+
+def count_kept_hints(hints, solution):
+    """Returns how many hinted theory cells and lab windows kept their hinted value."""
+    kept = sum(1 for key, subject in hints['theory'].items() if solution['theory'].get(key) == subject)
+    kept += sum(1 for key, cell in hints['labs'].items() if solution['labs'].get(key) == cell)
+    return kept
+
+
+def save_solution(timetable_data, output_path, base_data=None, patch_path=None, full=True):
+    """
+    Saves the solved timetable atomically. With base_data (the input that
+    timetable_data was derived from by share_rows()), only the solved cells
+    are looked up separately and streamed over the input; patch_path also
+    gets them as a JSON Patch. full=False writes only the patch.
+    """
+    overlay = overlay_of(base_data, timetable_data) if base_data is not None else {}
+    try:
+        if full:
+            write_timetable(output_path, base_data if base_data is not None else timetable_data, overlay)
+            print(f"Successfully saved updated timetable to {output_path}")
+        if patch_path:
+            write_patch(patch_path, overlay)
+            print(f"Saved {len(overlay)} changed slots as a JSON Patch to {patch_path}")
+    except IOError as e:
+        print(f"Error: Could not write to output file. {e}", file=sys.stderr)
+        return False
+    return True
+
+
+class FirstSolutionTimer(cp_model.CpSolverSolutionCallback):
+    """Records the wall time at which the first feasible solution was found."""
+
+    def __init__(self):
+        cp_model.CpSolverSolutionCallback.__init__(self)
+        self.first_solution_time = None
+
+    def on_solution_callback(self):
+        if self.first_solution_time is None:
+            self.first_solution_time = self.WallTime()
+
+
+def progress_path(output_path):
+    """Returns the progress log of a streamed output file."""
+    return f"{output_path}.progress.jsonl"
+
+
+def start_progress(output_path, run_id, sections):
+    """
+    Starts the progress log of a streamed run afresh with a
+    {run, event: "start", timestamp, sections} record, so that it only
+    holds the solutions of this run.
+    """
+    try:
+        with open(progress_path(output_path), 'w') as f:
+            f.write(json.dumps({'run': run_id, 'event': "start", 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                'sections': list(sections)}) + "\n")
+    except IOError as e:
+        print(f"Warning: Could not start {progress_path(output_path)}. {e}", file=sys.stderr)
+
+
+class AnytimeSolutionWriter(FirstSolutionTimer):
+    """
+    Handles every solution as the solver finds it (each one improves on the
+    last when the model has an objective):
+
+    - with output_path, writes the timetable so far there atomically and
+      appends {run, sections, solution, timestamp, wall_seconds, objective}
+      to <output_path>.progress.jsonl (see start_progress())
+    - with stall_seconds, stops the search once no new solution has come
+      for that long (the clock starts at the first solution)
+
+    The models of build_model() have no objective, so CP-SAT ends the search
+    at the first solution: today this streams exactly one solution and
+    stall_seconds never fires. Both start to matter once an objective (e.g.
+    balancing teacher workload) is added.
+    """
+
+    def __init__(self, inst, variables, timetable_data, output_path=None, stall_seconds=None, has_objective=False,
+                 run_id=None):
+        FirstSolutionTimer.__init__(self)
+        self.run_id = run_id
+        self.inst = inst
+        self.variables = variables
+        self.timetable_data = timetable_data
+        self.output_path = output_path
+        self.stall_seconds = stall_seconds
+        self.has_objective = has_objective
+        self.solutions = 0
+        self.stall_timer = None
+
+    def on_solution_callback(self):
+        FirstSolutionTimer.on_solution_callback(self)
+        self.solutions += 1
+        objective = self.ObjectiveValue() if self.has_objective else None
+        if self.output_path:
+            snapshot = share_rows(self.timetable_data)
+            apply_solution(snapshot, self.inst, extract_solution(self, self.inst, self.variables))
+            try:
+                write_timetable(self.output_path, snapshot)
+                with open(progress_path(self.output_path), 'a') as f:
+                    f.write(json.dumps({'run': self.run_id, 'sections': self.inst['sections_to_solve'],
+                                        'solution': self.solutions, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                                        'wall_seconds': self.WallTime(), 'objective': objective}) + "\n")
+            except IOError as e:
+                print(f"Warning: Could not stream solution {self.solutions}. {e}", file=sys.stderr)
+            print(f"  Solution {self.solutions} at {self.WallTime():.3f}s"
+                  + (f" (objective {objective:g})" if objective is not None else "") + f" -> {self.output_path}")
+        if self.stall_seconds is not None:
+            self.cancel()
+            self.stall_timer = threading.Timer(self.stall_seconds, self.StopSearch)
+            self.stall_timer.daemon = True
+            self.stall_timer.start()
+
+    def cancel(self):
+        """Stops a pending stall timer."""
+        if self.stall_timer is not None:
+            self.stall_timer.cancel()
+            self.stall_timer = None
+
+
+def load_solver_profile(path=SOLVER_PROFILE):
+    """
+    Returns the CP-SAT parameters saved by tune.py in path, as text format,
+    or "" if path is None, missing or not a valid profile.
+    """
+    if not path or not os.path.exists(path):
+        return ""
+    try:
+        with open(path, 'r') as f:
+            params = json.load(f).get('params', '')
+    except (IOError, json.JSONDecodeError, AttributeError) as e:
+        print(f"Warning: Ignoring solver profile {path}. {e}", file=sys.stderr)
+        return ""
+    if params and not cp_model.CpSolver().parameters.parse_text_format(params):
+        print(f"Warning: Ignoring invalid parameters in {path}: {params!r}", file=sys.stderr)
+        return ""
+    if params:
+        print(f"Using solver profile {path}: {params}")
+    return params
+
+
+def apply_solver_profile(solver, params):
+    """Applies parameters returned by load_solver_profile() to a solver."""
+    if params:
+        solver.parameters.parse_text_format(params)
+
+
+def print_model_stats(model, build_seconds, formulation):
+    """Prints the size of a built model."""
+    proto = model.Proto()
+    print(f"Model ({formulation}): {len(proto.variables)} variables, "
+          f"{len(proto.constraints)} constraints, built in {build_seconds:.3f}s")
+
+
+def solve_sections(config_data, timetable_data, sections_to_solve, formulation="int", resources="slot",
+                   prune=True, hint_data=None, record_dir=None, metrics=None, anytime=None, cache=None,
+                   phase=None, solver_params=None):
+    """
+    Builds and solves one CP-SAT model over sections_to_solve.
+
+    If hint_data (a previously solved timetable) is given, its values are
+    added as solution hints so that a re-solve keeps as much of it as it can.
+    If record_dir is given, the built model and its input are saved there
+    for corpus.py replay. If metrics is a dict, it is filled with build
+    timers/counters per block and the solver's response stats (see telemetry.py).
+    anytime sets the stop criteria and streaming of AnytimeSolutionWriter:
+    {'output_path': path, 'stop_at_first': bool, 'stall_seconds': N,
+    'run_id': id written to the progress log}.
+    cache ({'dir': path, 'max_mb': N}) reuses the compiled instance, model
+    and solution of an identical earlier call (see cache.py). phase
+    restricts the model to labs or theory (see build_instance()).
+    solver_params are CP-SAT parameters in text format; None loads the
+    profile next to engine.py (see load_solver_profile()).
+
+    Returns (status, solution); solution is None unless a feasible
+    timetable was found.
+    """
+    collect_stats = metrics is not None
+    if metrics is None:
+        metrics = {}
+    metrics.update({'sections': list(sections_to_solve), 'formulation': formulation, 'resources': resources})
+    build_start = time.perf_counter()
+    inst = key = solution_key = None
+    if cache:
+        options = [prune, phase]
+        key = cache_key(config_data, timetable_data, sections_to_solve, formulation, resources, options)
+        solution_key = cache_key(config_data, timetable_data, sections_to_solve, formulation, resources, options,
+                                 hint_data)
+        inst = load_pickle(cache['dir'], "instance", key)
+    if inst is None:
+        inst = build_instance(config_data, timetable_data, sections_to_solve, phase)
+        metrics['instance_seconds'] = time.perf_counter() - build_start
+        if prune:
+            prune_start = time.perf_counter()
+            metrics['pruned'], impossible_cells = prune_domains(inst)
+            metrics['prune_seconds'] = time.perf_counter() - prune_start
+            if impossible_cells:
+                for section, day, slot in impossible_cells:
+                    print(f"  ✗ {section} {day} {slot}: no subject can be taught here "
+                          f"(room or every teacher already busy)", file=sys.stderr)
+                return cp_model.INFEASIBLE, None
+        if cache:
+            store_pickle(cache['dir'], "instance", key, inst, cache['max_mb'])
+    else:
+        print("Cache: reusing the compiled instance")
+
+    if cache:
+        cached = load_pickle(cache['dir'], "solution", solution_key)
+        if cached is not None:
+            status, solution = cached
+            print(f"Cache: reusing the solution of an identical run ({time.perf_counter() - build_start:.3f}s)")
+            metrics['cached_solution'] = True
+            apply_solution(timetable_data, inst, solution)
+            return status, solution
+
+    model = None
+    if cache:
+        model, variables = load_cached_model(cache['dir'], key)
+        if model is not None:
+            print("Cache: reusing the built model")
+    if model is None:
+        model, variables = build_model(inst, formulation, resources)
+        if cache:
+            store_model(cache['dir'], key, model, variables, cache['max_mb'])
+    hints = None
+    if hint_data is not None:
+        hints = read_hints(inst, hint_data)
+        add_hints(model, inst, variables, hints)
+        print(f"Hinted {len(hints['theory'])} of {len(variables['new_classes'])} theory cells and "
+              f"{len(hints['labs'])} of {sum(1 for d in inst['lab_subject_domains'].values() if d)} lab windows")
+    print_model_stats(model, time.perf_counter() - build_start, f"{formulation}/{resources}")
+    metrics.update({'build_seconds': time.perf_counter() - build_start, 'build_stages': variables['build_stages'],
+                    'variables': len(model.Proto().variables), 'constraints': len(model.Proto().constraints)})
+    if record_dir:
+        from corpus import record_instance
+        record_instance(record_dir, model, config_data, timetable_data, sections_to_solve, formulation, resources,
+                        source="engine.py")
+
+    print(f"\nStarting solver for {', '.join(sections_to_solve)}...")
+    solver = cp_model.CpSolver()
+    apply_solver_profile(solver, load_solver_profile() if solver_params is None else solver_params)
+    solver.parameters.max_time_in_seconds = config_data['settings']['solver_timeout_seconds']
+    if hints is not None:
+        # Without this, presolve may map the complete hint to an equivalent solution (two subjects
+        # swapped), and CP-SAT 9.15 presolve can crash on hinted AddElement targets (tests/test_hints.py)
+        solver.parameters.keep_all_feasible_solutions_in_presolve = True
+    log_lines = []
+    if collect_stats:
+        # The search log is only needed for the presolve time; keep it off stdout
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = log_lines.append
+    anytime = anytime or {}
+    solver.parameters.stop_after_first_solution = bool(anytime.get('stop_at_first'))
+    timer = AnytimeSolutionWriter(inst, variables, timetable_data, anytime.get('output_path'),
+                                  anytime.get('stall_seconds'), model.has_objective(), anytime.get('run_id'))
+    status = solver.Solve(model, timer)
+    timer.cancel()
+    if timer.first_solution_time is not None:
+        print(f"First solution after {timer.first_solution_time:.3f}s, solver wall time {solver.WallTime():.3f}s")
+    metrics['first_solution_seconds'] = timer.first_solution_time
+    metrics['solver'] = solver_stats(solver, status, log_lines)
+
+    if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+        solution = extract_solution(solver, inst, variables)
+        if hints is not None:
+            total = len(hints['theory']) + len(hints['labs'])
+            print(f"Hints kept: {count_kept_hints(hints, solution)} of {total}")
+        apply_solution(timetable_data, inst, solution)
+        if cache:
+            store_pickle(cache['dir'], "solution", solution_key, (status, solution), cache['max_mb'])
+        return status, solution
+    return status, None
+
+
+def section_resources(inst, section):
+    """
+    Returns the (kind, name, day, slot) resource-hours that the open cells of
+    a section can still use after prune_domains(): the teachers of the
+    subjects left in each theory cell and its theory room, and the lab
+    teachers and lab rooms left in each lab window, for both of its hours.
+    Values ruled out by pre-assigned occupancy link nothing.
+    """
+    used = set()
+    room = inst['config']['section_theory_rooms'][section]
+    no_class = len(inst['core_subject_map'][section])
+    for day, slot in inst['tba_slots_by_section'][section]:
+        domain = inst['theory_domains'][section, day, slot]
+        if any(j != no_class for j in domain):
+            used.add(("theory_room", room, day, slot))
+        for j in domain:
+            teacher = None if j == no_class else inst['teacher_subject_map'][section].get(
+                inst['inv_core_subject_map'][section][j])
+            if teacher:
+                used.add(("teacher", teacher, day, slot))
+    for day in inst['days']:
+        for lab_slot_idx, lab_slot_name in inst['inv_lab_slot_id_to_name'].items():
+            hours = LAB_SLOT_MAP[lab_slot_name]
+            labs = inst['lab_subject_domains'][section, day, lab_slot_idx]
+            if not labs:
+                continue  # a window no lab can use takes no room either
+            for l in labs:
+                teacher = inst['lab_teacher_map'][section].get(inst['inv_lab_name_map'][section][l])
+                if teacher:
+                    used |= {("teacher", teacher, day, hour) for hour in hours}
+            for r in inst['lab_room_domains'][section, day, lab_slot_idx]:
+                used |= {("lab_room", inst['inv_lab_room_id_to_name'][r], day, hour) for hour in hours}
+    return used
+
+
+def resource_components(config_data, timetable_data, sections):
+    """
+    Splits sections into connected components of the resource-sharing graph:
+    two sections are linked if they can use the same teacher, theory room
+    or lab room in the same hour (see section_resources()). The domains are
+    pruned against the pre-assigned occupancy first, so a resource that is
+    only free for one section at a time links nothing. Components never
+    interact, so they can be solved apart.
+    """
+    inst = build_instance(config_data, timetable_data, sections)
+    prune_domains(inst, verbose=False)
+    resources = {section: section_resources(inst, section) for section in sections}
+    users = {}
+    for section in sections:
+        for resource in resources[section]:
+            users.setdefault(resource, []).append(section)
+
+    components, seen = [], set()
+    for section in sections:
+        if section in seen:
+            continue
+        component, stack = [], [section]
+        seen.add(section)
+        while stack:
+            current = stack.pop()
+            component.append(current)
+            for resource in resources[current]:
+                for other in users[resource]:
+                    if other not in seen:
+                        seen.add(other)
+                        stack.append(other)
+        components.append([s for s in sections if s in component])
+    return components
+
+
+def solve_component(args):
+    """Process-pool entry point: solves one component on its own copy of the timetable."""
+    (config_data, timetable_data, sections_to_solve, formulation, resources, prune, hint_data, record_dir, anytime,
+     cache, solver_params) = args
+    metrics = {}
+    status, solution = solve_sections(config_data, timetable_data, sections_to_solve, formulation, resources, prune,
+                                      hint_data, record_dir, metrics, anytime, cache, solver_params=solver_params)
+    return status, solution, metrics
+
+
+def solve_decomposed(config_data, timetable_data, sections_to_solve, formulation="int", resources="slot",
+                     prune=True, hint_data=None, record_dir=None, metrics=None, anytime=None, cache=None,
+                     workers=None, solver_params=None):
+    """
+    Solves each independent component of sections_to_solve in a process pool
+    and merges the results into timetable_data.
+
+    Returns (status, solution) like solve_sections(); the status is that of
+    the first component that failed, if any. metrics['components'] gets the
+    metrics of every component. The stop criteria in anytime apply to every
+    component, but solutions are only streamed when there is one component:
+    a component alone is not a timetable worth writing out.
+    """
+    if metrics is None:
+        metrics = {}
+    components = resource_components(config_data, timetable_data, sections_to_solve)
+    print(f"Split {len(sections_to_solve)} sections into {len(components)} independent component(s): "
+          + "; ".join(", ".join(c) for c in components))
+    if len(components) == 1:
+        return solve_sections(config_data, timetable_data, sections_to_solve, formulation, resources, prune,
+                              hint_data, record_dir, metrics, anytime, cache, solver_params=solver_params)
+
+    if solver_params is None:
+        solver_params = load_solver_profile()
+    component_anytime = {k: v for k, v in (anytime or {}).items() if k != 'output_path'}
+    tasks = [(config_data, timetable_data, c, formulation, resources, prune, hint_data, record_dir, component_anytime,
+              cache, solver_params) for c in components]
+    with ProcessPoolExecutor(max_workers=min(len(components), workers or os.cpu_count() or 1)) as pool:
+        results = list(pool.map(solve_component, tasks))
+
+    metrics['components'] = [component_metrics for _, _, component_metrics in results]
+    merged = {'theory': {}, 'labs': {}, 'cleared': []}
+    status = cp_model.OPTIMAL
+    for component, (component_status, solution, _) in zip(components, results):
+        if solution is None:
+            return component_status, None
+        if component_status == cp_model.FEASIBLE:
+            status = cp_model.FEASIBLE
+        apply_solution(timetable_data, build_instance(config_data, timetable_data, component), solution)
+        merged['theory'].update(solution['theory'])
+        merged['labs'].update(solution['labs'])
+        merged['cleared'].extend(solution['cleared'])
+    return status, merged
+
+
+def lab_phase_input(config_data, timetable_data):
+    """
+    Reduces the input to what the lab phase depends on: the config without
+    core subjects, and per cell only whether it is free, the teacher and
+    room of an "Assigned" cell and the subject of an assigned lab. Theory-only
+    edits leave it unchanged, so the cached lab phase can be reused.
+    """
+    config = {k: v for k, v in config_data.items() if k != 'core_subjects'}
+    cells = {}
+    for day, rows in timetable_data.items():
+        for row in rows:
+            for slot, cell in row.items():
+                if slot == 'section' or cell[0]['status'] not in ("Free", "Assigned"):
+                    continue
+                info = cell[0]
+                lab = " (G-" in str(info.get('subject', ''))
+                cells[f"{day}|{row['section']}|{slot}"] = (
+                    "Free" if info['status'] == "Free" else [info.get('teacher'), info.get('room'),
+                                                             info.get('subject') if lab else None])
+    return config, cells
+
+
+def solve_two_phase(config_data, timetable_data, sections_to_solve, formulation="int", resources="slot",
+                    prune=True, hint_data=None, record_dir=None, metrics=None, anytime=None, cache=None,
+                    solver_params=None):
+    """
+    Schedules labs first, as constraints.txt describes, then theory:
+
+    1. a model with only the lab windows of every section (theory cells
+       left out) fixes lab timing and rooms; with a cache it is reused
+       across theory-only edits
+    2. a model with only the theory cells, against the fixed labs
+    3. if phase 2 is infeasible, one joint solve as before
+
+    Phase 1 ignores theory, so if it is infeasible the joint model is too.
+    Returns (status, solution) like solve_sections(); metrics['phases'] gets
+    the metrics of each solve.
+    """
+    if metrics is None:
+        metrics = {}
+    metrics['phases'] = []
+    phase_anytime = {k: v for k, v in (anytime or {}).items() if k != 'output_path'}
+
+    print("\n--- Phase 1: labs ---")
+    lab_key = lab_solution = None
+    if cache:
+        lab_config, lab_cells = lab_phase_input(config_data, timetable_data)
+        lab_key = cache_key(lab_config, lab_cells, sections_to_solve, formulation, resources, [prune, "labs"])
+        lab_solution = load_pickle(cache['dir'], "labs", lab_key)
+    view = share_rows(timetable_data)
+    if lab_solution is not None:
+        print("Cache: reusing the lab phase")
+        apply_solution(view, build_instance(config_data, view, sections_to_solve, phase="labs"), lab_solution)
+    else:
+        lab_metrics = {'phase': "labs"}
+        metrics['phases'].append(lab_metrics)
+        status, lab_solution = solve_sections(config_data, view, sections_to_solve, formulation, resources, prune,
+                                              hint_data, None, lab_metrics, phase_anytime, phase="labs",
+                                              solver_params=solver_params)
+        if lab_solution is None:
+            return status, None
+        if cache:
+            store_pickle(cache['dir'], "labs", lab_key, lab_solution, cache['max_mb'])
+
+    print("\n--- Phase 2: theory against the fixed labs ---")
+    theory_metrics = {'phase': "theory"}
+    metrics['phases'].append(theory_metrics)
+    status, solution = solve_sections(config_data, view, sections_to_solve, formulation, resources, prune,
+                                      hint_data, record_dir, theory_metrics, anytime, cache, phase="theory",
+                                      solver_params=solver_params)
+    if solution is not None:
+        merged = {'theory': solution['theory'], 'labs': lab_solution['labs'], 'cleared': solution['cleared']}
+        apply_solution(timetable_data, build_instance(config_data, timetable_data, sections_to_solve), merged)
+        return status, merged
+
+    print("\n--- Phase 2 failed with these labs; falling back to a joint solve ---")
+    joint_metrics = {'phase': "joint"}
+    metrics['phases'].append(joint_metrics)
+    return solve_sections(config_data, timetable_data, sections_to_solve, formulation, resources, prune,
+                          hint_data, record_dir, joint_metrics, anytime, cache, solver_params=solver_params)
+
+
+def report_failure(status):
+    """Prints why no solution was produced."""
+    if status == cp_model.INFEASIBLE:
+        print("No solution found: The problem is infeasible.")
+        print("Check constraints, especially room/teacher clashes or lack of 'Free' slots for labs.")
+        print("ALSO: Check that 'To Be Assigned' slots in data.json match the dynamically calculated requirement.")
+    elif status == cp_model.MODEL_INVALID:
+        print("No solution found: The model is invalid.")
+    else:
+        print(f"No solution found. Solver status: {status}")
+
+
+def run(sections_to_solve=None, mode="joint", config_path='config.json', data_path='data.json',
+        output_path='updated_timetable.json', resume=False, formulation="int", resources="slot", prune=True,
+        precheck=True, explain=False, hint_from=None, decompose=False, workers=None, record_dir=None,
+        stats_path=None, prometheus_path=None, stream=False, stop_at_first=False, stall_seconds=None,
+        cache_dir=None, cache_max_mb=DEFAULT_MAX_MB, patch_path=None, patch_only=False, two_phase=False,
+        blocks=False, profile_path=SOLVER_PROFILE):
+    """
+    Loads the input once, solves the requested sections and saves the result.
+
+    With resume=True an existing output_path is used as the input, which is
+    how the per-semester scripts continue from each other. With explain=True
+    an infeasible stage is re-solved by explain.py to print a minimal conflict.
+    hint_from names a previously solved timetable used to warm-start the solver.
+    With decompose=True each stage is split into independent components that
+    are solved in up to `workers` processes. record_dir saves every built
+    model to a corpus directory (see corpus.py). stats_path and
+    prometheus_path receive the run's metrics (see telemetry.py). With
+    stream=True every solution is written to output_path as soon as it is
+    found; stop_at_first and stall_seconds end the search early (the model
+    has no objective, so today it ends at the first solution anyway). cache_dir
+    enables the on-disk cache of cache.py, limited to cache_max_mb.
+    patch_path also saves the solved slots as a JSON Patch against the
+    input; with patch_only the full timetable is not written. two_phase
+    solves each stage labs first, then theory (see solve_two_phase()).
+    blocks lets the model place theory in continuous blocks (the default
+    block list of verify.py, unless config.json sets settings.theory_blocks).
+    profile_path is the tune.py profile applied to every solve (None: none).
+    Returns True on success.
+    """
+    run_start = time.perf_counter()
+    run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    record = {'run': run_id, 'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"), 'mode': mode,
+              'formulation': formulation, 'resources': resources, 'decompose': decompose, 'solves': []}
+
+    def finish(ok):
+        record.update({'ok': ok, 'total_seconds': time.perf_counter() - run_start})
+        if stats_path:
+            append_run_record(stats_path, record)
+        if prometheus_path:
+            write_prometheus(prometheus_path, record)
+        return ok
+
+    config_data, timetable_data = load_data(config_path, data_path, output_path if resume else None)
+    if blocks and not config_data['settings'].get('theory_blocks'):
+        config_data['settings']['theory_blocks'] = list(THEORY_BLOCKS)
+    solver_params = load_solver_profile(profile_path)
+    record['solver_profile'] = {'path': profile_path if solver_params else None, 'params': solver_params}
+    hint_data = None
+    if hint_from:
+        try:
+            with open(hint_from, 'r') as f:
+                hint_data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Error: Could not load hints. {e}", file=sys.stderr)
+            return finish(False)
+    if not sections_to_solve:
+        sections_to_solve = list(config_data['sections'])
+    record['sections'] = list(sections_to_solve)
+
+    if precheck and config_data['settings'].get('theory_blocks'):
+        print("Precheck skipped: with theory blocks the 'To Be Assigned' cells are not fixed")
+    elif precheck:
+        start = time.perf_counter()
+        reasons = run_precheck(config_data, timetable_data, sections_to_solve)
+        record['precheck_seconds'] = time.perf_counter() - start
+        report_precheck(reasons, record['precheck_seconds'])
+        if reasons:
+            return finish(False)
+
+    timetable_copy = share_rows(timetable_data)
+    stages = group_sections_by_semester(sections_to_solve) if mode == "chained" else [list(sections_to_solve)]
+    if stream:
+        start_progress(output_path, run_id, sections_to_solve)
+
+    for stage in stages:
+        solve = solve_decomposed if decompose else solve_two_phase if two_phase else solve_sections
+        extra = {'workers': workers} if decompose else {}
+        metrics = {} if stats_path or prometheus_path else None
+        anytime = {'output_path': output_path if stream else None, 'stop_at_first': stop_at_first,
+                   'stall_seconds': stall_seconds, 'run_id': run_id}
+        cache = {'dir': cache_dir, 'max_mb': cache_max_mb} if cache_dir else None
+        status, solution = solve(config_data, timetable_copy, stage, formulation, resources, prune, hint_data,
+                                 record_dir, metrics, anytime, cache, solver_params=solver_params, **extra)
+        if metrics is not None:
+            record['solves'] += metrics.get('components') or metrics.get('phases') or [metrics]
+        if solution is None:
+            report_failure(status)
+            if explain and status == cp_model.INFEASIBLE:
+                from explain import explain as explain_conflict
+                explain_conflict(config_data, timetable_copy, stage)
+            return finish(False)
+        print(f"Solution found for {', '.join(stage)}.")
+
+    print(f"Saving to {output_path}...")
+    return finish(save_solution(timetable_copy, output_path, timetable_data, patch_path, not patch_only))
+
+
+def add_profile_arguments(parser):
+    """Adds --profile PATH / --no-profile (shared with alternatives.py)."""
+    parser.add_argument('--profile', metavar='PATH', default=SOLVER_PROFILE,
+                        help="Solver profile written by tune.py (default: solver_profile.json next to engine.py)")
+    parser.add_argument('--no-profile', dest='profile', action='store_const', const=None,
+                        help="Use the default CP-SAT parameters, ignoring any solver profile")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Solve the timetable for any subset of sections.")
+    parser.add_argument('--sections', nargs='+', help="Sections to solve (default: all sections in config.json)")
+    parser.add_argument('--mode', choices=["joint", "chained"], default="joint",
+                        help="joint: one model over all sections; chained: one model per semester")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json')
+    parser.add_argument('--output', default='updated_timetable.json')
+    parser.add_argument('--resume', action='store_true',
+                        help="Read the timetable from --output if it exists (continue an earlier run)")
+    parser.add_argument('--formulation', choices=["int", "bool"], default="int",
+                        help="int: IntVar cells with reified counting; bool: one presence literal per value")
+    parser.add_argument('--resources', choices=["slot", "interval"], default="slot",
+                        help="slot: AllDifferent per 1-hour slot; interval: optional intervals with NoOverlap per resource")
+    parser.add_argument('--no-prune', dest='prune', action='store_false',
+                        help="Skip removing values ruled out by pre-assigned occupancy")
+    parser.add_argument('--no-precheck', dest='precheck', action='store_false',
+                        help="Skip the counting/Hall-bound feasibility precheck")
+    parser.add_argument('--explain', action='store_true',
+                        help="On infeasibility, print a minimal set of conflicting constraint groups")
+    parser.add_argument('--hint-from', metavar='PATH',
+                        help="Start from a previously solved timetable (e.g. last week's updated_timetable.json) "
+                             "and keep the cells that are still legal; on the shipped data this keeps the "
+                             "timetable stable rather than making the solve faster")
+    parser.add_argument('--decompose', action='store_true',
+                        help="Solve sections that share no teacher or room as separate models in parallel")
+    parser.add_argument('--workers', type=int, help="Processes for --decompose (default: CPU count)")
+    parser.add_argument('--record', metavar='DIR', dest='record_dir',
+                        help="Save each built model and its input to a corpus directory for corpus.py replay")
+    parser.add_argument('--stats', metavar='FILE', dest='stats_path',
+                        help="Append one JSON record of build timers and solver stats per run")
+    parser.add_argument('--prometheus', metavar='FILE', dest='prometheus_path',
+                        help="Write the same metrics as a Prometheus textfile-collector file")
+    parser.add_argument('--stream', action='store_true',
+                        help="Write every solution to --output as soon as it is found (progress in "
+                             "<output>.progress.jsonl). The model has no objective, so this is the first and "
+                             "only solution")
+    parser.add_argument('--stop-at-first', action='store_true', help="Stop at the first feasible solution")
+    parser.add_argument('--stall', type=float, metavar='SECONDS', dest='stall_seconds',
+                        help="Stop once no new solution has been found for this long. Has no effect yet: "
+                             "without an objective the search already stops at the first solution")
+    parser.add_argument('--cache', metavar='DIR', dest='cache_dir',
+                        help="Reuse compiled instances, models and solutions of identical inputs (see cache.py)")
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_MAX_MB, metavar='MB',
+                        help="Evict the least recently used cache entries beyond this size")
+    parser.add_argument('--patch', metavar='FILE', dest='patch_path',
+                        help="Also write the solved slots as a JSON Patch (RFC 6902) against the input")
+    parser.add_argument('--patch-only', action='store_true', help="Write only the --patch file, not --output")
+    parser.add_argument('--two-phase', action='store_true',
+                        help="Schedule labs first, then theory against them (falls back to a joint solve)")
+    parser.add_argument('--blocks', action='store_true',
+                        help="Let the model place theory in continuous blocks (9-11, 10-12, ..., 9-11 + 3-5) "
+                             "in any open cell, at most 4 a day")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.patch_only and not args.patch_path:
+        parser.error("--patch-only needs --patch FILE")
+    if args.two_phase and args.decompose:
+        parser.error("--two-phase and --decompose cannot be combined")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ok = run(args.sections, args.mode, args.config, args.data, args.output, args.resume,
+             args.formulation, args.resources, args.prune, args.precheck, args.explain,
+             args.hint_from, args.decompose, args.workers, args.record_dir, args.stats_path, args.prometheus_path,
+             args.stream, args.stop_at_first, args.stall_seconds, args.cache_dir, args.cache_size,
+             args.patch_path, args.patch_only, args.two_phase, args.blocks, args.profile)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
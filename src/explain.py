@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# explain.py
+"""
+Explains why a timetable is infeasible.
+
+Every constraint group of the boolean model (subject frequency per
+section, daily uniqueness per section/day, lab rules, and each
+teacher/room on each day) is guarded by an assumption literal. When the
+solver reports INFEASIBLE, SufficientAssumptionsForInfeasibility() gives
+a core of guards that cannot all hold; it is then shrunk by dropping one
+guard at a time and re-solving, so every group left is needed for the
+conflict.
+
+Reads from:
+- config.json
+- data.json (or any timetable passed with --data)
+
+Usage:
+    python3 explain.py
+    python3 explain.py --sections CSE-7 IT-7
+    python3 engine.py --explain
+"""
+
+import argparse
+import sys
+import time
+from ortools.sat.python import cp_model
+from engine import build_bool_model, build_instance, load_data
+
+
+def describe_guard(inst, key):
+    """Returns a human-readable description of a guarded constraint group."""
+    kind = key[0]
+    if kind == "frequency":
+        return f"{key[1]}: each core subject exactly 3 times a week"
+    if kind == "daily":
+        return f"{key[1]} on {key[2]}: each subject at most once a day"
+    if kind == "lab_parallel":
+        return f"{key[1]} on {key[2]}: parallel group labs need different labs and rooms"
+    if kind == "lab_frequency":
+        return f"{key[1]} group {key[2]}: each lab exactly once a week"
+    if kind == "lab_daily":
+        return f"{key[1]} on {key[2]}: at most 2 lab sessions a day"
+    if kind == "blocks":
+        return f"{key[1]} on {key[2]}: theory classes in one of the allowed continuous blocks"
+    if kind == "teacher":
+        names = {i: name for name, i in inst['teacher_name_to_id'].items()}
+        return f"Teacher {names.get(key[1], key[1])} on {key[2]}: at most one class at a time"
+    if kind == "theory_room":
+        names = {i: name for name, i in inst['theory_room_name_to_id'].items()}
+        return f"Room {names.get(key[1], key[1])} on {key[2]}: at most one class at a time"
+    if kind == "lab_room":
+        return f"Lab room {inst['inv_lab_room_id_to_name'].get(key[1], key[1])} on {key[2]}: at most one lab at a time"
+    return str(key)
+
+
+def solve_with(model, literals, time_limit):
+    """Solves the model assuming only the given guard literals."""
+    model.ClearAssumptions()
+    model.AddAssumptions(literals)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    # Cores are only reported by the single-threaded search
+    solver.parameters.num_workers = 1
+    return solver, solver.Solve(model)
+
+
+def find_conflict(inst, shrink=True):
+    """
+    Returns (status, conflict): conflict is a minimal list of guard keys
+    that cannot hold together, or None if the instance is not proven
+    infeasible.
+    """
+    guards = {}
+    model, _ = build_bool_model(inst, "slot", guards)
+    time_limit = inst['config']['settings']['solver_timeout_seconds']
+    key_of = {lit.Index(): key for key, lit in guards.items()}
+
+    solver, status = solve_with(model, list(guards.values()), time_limit)
+    if status != cp_model.INFEASIBLE:
+        return status, None
+    core = [key_of[i] for i in solver.SufficientAssumptionsForInfeasibility()]
+
+    if shrink:
+        # Deletion filter: a guard stays only if the rest become satisfiable without it
+        shrink_limit = min(10, time_limit)
+        i = 0
+        while i < len(core):
+            trial = core[:i] + core[i + 1:]
+            _, trial_status = solve_with(model, [guards[k] for k in trial], shrink_limit)
+            if trial_status == cp_model.INFEASIBLE:
+                core = trial
+            else:
+                i += 1
+    return status, core
+
+
+def explain(config_data, timetable_data, sections_to_solve, shrink=True):
+    """Prints the conflicting constraint groups. Returns True if a conflict was found."""
+    print(f"\nExplaining infeasibility for {', '.join(sections_to_solve)}...")
+    start = time.perf_counter()
+    inst = build_instance(config_data, timetable_data, sections_to_solve)
+    status, core = find_conflict(inst, shrink)
+    elapsed = time.perf_counter() - start
+
+    if core is None:
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            print("✅ The model is feasible; nothing to explain.")
+        else:
+            print(f"Could not prove infeasibility (solver status: {status}).")
+        return False
+    if not core:
+        print(f"❌ Infeasible without any guarded constraint ({elapsed:.2f}s):")
+        print("  ✗ the fixed cells alone conflict (check 'To Be Assigned' counts and pre-assigned rooms)")
+        return True
+    label = "minimal" if shrink else "sufficient"
+    print(f"❌ Infeasible: {len(core)} constraint group(s) form a {label} conflict ({elapsed:.2f}s):")
+    for key in core:
+        print(f"  ✗ {describe_guard(inst, key)}")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Explain an infeasible timetable with a minimal conflict.")
+    parser.add_argument('--sections', nargs='+', help="Sections to explain (default: all sections in config.json)")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json')
+    parser.add_argument('--no-shrink', dest='shrink', action='store_false',
+                        help="Print the solver's core without shrinking it to a minimal set")
+    args = parser.parse_args(argv)
+
+    config_data, timetable_data = load_data(args.config, args.data)
+    sections = args.sections or list(config_data['sections'])
+    # Like precheck.py, exit 1 when the instance is shown to be infeasible
+    if explain(config_data, timetable_data, sections, args.shrink):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
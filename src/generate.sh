@@ -28,50 +28,35 @@ if [ -f "updated_timetable.json" ]; then
     rm updated_timetable.json
 fi
 
-# Step 1: Run 3rd Semester Solver
+# Step 0: Fail fast on obviously impossible inputs (no solver needed)
 echo -e "\n${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-echo -e "${GREEN}📚 Step 1: Running 3rd Semester Solver (solver.py)...${NC}"
+echo -e "${GREEN}🔎 Step 0: Running feasibility precheck (precheck.py)...${NC}"
 echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-python3 solver.py
+python3 precheck.py
 
 if [ $? -ne 0 ]; then
-    echo -e "${RED}❌ Error: 3rd Semester Solver failed${NC}"
+    echo -e "${RED}❌ Error: Precheck failed, fix data.json/config.json first${NC}"
     exit 1
 fi
 
-if [ ! -f "updated_timetable.json" ]; then
-    echo -e "${RED}❌ Error: solver.py did not create updated_timetable.json${NC}"
-    exit 1
-fi
-
-echo -e "${GREEN}✅ 3rd Semester solved successfully${NC}"
-
-# Step 2: Run 5th Semester Solver
+# Step 1: Solve every semester in one model
 echo -e "\n${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-echo -e "${GREEN}📚 Step 2: Running 5th Semester Solver (5solver.py)...${NC}"
+echo -e "${GREEN}📚 Step 1: Running joint solver for all semesters (engine.py)...${NC}"
 echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-python3 5solver.py
+python3 engine.py --no-precheck
 
 if [ $? -ne 0 ]; then
-    echo -e "${RED}❌ Error: 5th Semester Solver failed${NC}"
+    echo -e "${RED}❌ Error: Joint solver failed${NC}"
+    echo -e "${YELLOW}💡 Tip: Run 'python3 dd.py' to diagnose the issue${NC}"
     exit 1
 fi
 
-echo -e "${GREEN}✅ 5th Semester solved successfully${NC}"
-
-# Step 3: Run 7th Semester Solver
-echo -e "\n${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-echo -e "${GREEN}📚 Step 3: Running 7th Semester Solver (7solver.py)...${NC}"
-echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
-python3 7solver.py
-
-if [ $? -ne 0 ]; then
-    echo -e "${RED}❌ Error: 7th Semester Solver failed${NC}"
-    echo -e "${YELLOW}💡 Tip: Run 'python3 conflict_analyzer.py' to diagnose the issue${NC}"
+if [ ! -f "updated_timetable.json" ]; then
+    echo -e "${RED}❌ Error: engine.py did not create updated_timetable.json${NC}"
     exit 1
 fi
 
-echo -e "${GREEN}✅ 7th Semester solved successfully${NC}"
+echo -e "${GREEN}✅ All semesters solved successfully${NC}"
 
 # Step 6: Run json2pdf.js (if exists)
 if [ -f "json2pdf.js" ]; then
@@ -142,6 +127,6 @@ if [ -f "Timetable.docx" ] || [ -f "src/Timetable.docx" ]; then
     echo -e "   • Docx timetable generated"
 fi
 
-echo -e "\n${YELLOW}💡 Tip: If the 7th semester solver fails, run:${NC}"
-echo -e "   ${BLUE}python3 conflict_analyzer.py${NC}"
+echo -e "\n${YELLOW}💡 Tip: If the solver fails, run:${NC}"
+echo -e "   ${BLUE}python3 dd.py${NC}"
 echo -e "\n"
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# grid.py
+"""
+Compact array-backed form of a timetable.
+
+data.json nests every cell as timetable[day][list index][slot][0], and each
+reader builds its own section -> list index map to find a section. A
+TimetableGrid instead keeps one flat array per field (status, subject,
+teacher, room) indexed by (day, slot, section), with the strings interned
+in one table per field, so lookups are O(1) and a cell costs a few ints.
+
+The conversion is lossless: to_json() returns data equal to the input,
+with the key order of every cell preserved. Cells that do not fit the
+four fields (extra keys, more than one entry) are kept verbatim on the side.
+
+Used by engine.py, occupancy.py, precheck.py, dd.py, diagnose.py and verify.py.
+"""
+
+from array import array
+
+FIELDS = ("status", "subject", "teacher", "room")
+NONE = -1  # id of an absent field, row or cell
+
+
+class StringTable:
+    """Interns strings (and None) to small ints."""
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def intern(self, value):
+        if value not in self.ids:
+            self.ids[value] = len(self.values)
+            self.values.append(value)
+        return self.ids[value]
+
+    def id(self, value):
+        """Returns the id of value, or NONE if it was never interned."""
+        return self.ids.get(value, NONE)
+
+    def __getitem__(self, value_id):
+        return None if value_id == NONE else self.values[value_id]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class TimetableGrid:
+    """A timetable as dense per-field arrays indexed by (day, slot, section)."""
+
+    def __init__(self, days, slots, sections):
+        self.days = list(days)
+        self.slots = list(slots)
+        self.sections = list(sections)
+        self.day_ids = {d: i for i, d in enumerate(self.days)}
+        self.slot_ids = {s: i for i, s in enumerate(self.slots)}
+        self.section_ids = {s: i for i, s in enumerate(self.sections)}
+        size = len(self.days) * len(self.slots) * len(self.sections)
+        self.tables = {field: StringTable() for field in FIELDS}
+        self.arrays = {field: array('i', [NONE]) * size for field in FIELDS}
+        # Key order of each cell dict, interned; NONE marks a missing cell
+        self.layouts = StringTable()
+        self.layout = array('i', [NONE]) * size
+        self.row_order = {d: [] for d in self.days}  # section ids in their list order per day
+        self.overflow = {}  # position -> cell list that does not fit the arrays
+        self.row_extras = {}  # (day, section) -> non-slot keys of a row besides 'section'
+
+    def position(self, day_id, slot_id, section_id):
+        """Index of a cell in the flat arrays."""
+        return (day_id * len(self.slots) + slot_id) * len(self.sections) + section_id
+
+    def locate(self, day, slot, section):
+        """Index of a cell by names, or None if one of them is unknown."""
+        try:
+            return self.position(self.day_ids[day], self.slot_ids[slot], self.section_ids[section])
+        except KeyError:
+            return None
+
+    @classmethod
+    def from_json(cls, timetable_data, days=None, slots=None):
+        """Builds a grid from data.json-shaped data. Days and slots default to those found in it."""
+        days = list(days) if days is not None else list(timetable_data)
+        found_slots, sections = [], []
+        for day in timetable_data:
+            for row in timetable_data[day]:
+                if row['section'] not in sections:
+                    sections.append(row['section'])
+                found_slots += [k for k in row if k != 'section' and k not in found_slots]
+        if slots is None:
+            slots = found_slots
+        else:
+            slots = list(slots) + [s for s in found_slots if s not in slots]
+        grid = cls(days, slots, sections)
+        for day in days:
+            day_id = grid.day_ids[day]
+            for row in timetable_data.get(day, []):
+                section_id = grid.section_ids[row['section']]
+                grid.row_order[day].append(section_id)
+                extras = {k: v for k, v in row.items() if k != 'section' and not isinstance(v, list)}
+                if extras:
+                    grid.row_extras[day, row['section']] = extras
+                for slot, cell in row.items():
+                    if slot == 'section' or slot in extras:
+                        continue
+                    grid.store(grid.position(day_id, grid.slot_ids[slot], section_id), cell)
+        return grid
+
+    def store(self, pos, cell):
+        """Writes a data.json cell list ([{status, ...}]) at a position."""
+        self.overflow.pop(pos, None)
+        first = cell[0] if cell else {}
+        for field in FIELDS:
+            self.arrays[field][pos] = self.tables[field].intern(first[field]) if field in first else NONE
+        self.layout[pos] = self.layouts.intern(tuple(first))
+        if len(cell) != 1 or any(k not in FIELDS for k in first):
+            self.overflow[pos] = [dict(c) for c in cell]
+
+    def load(self, pos):
+        """Returns the data.json cell list stored at a position, or None if the cell is missing."""
+        if pos in self.overflow:
+            return [dict(c) for c in self.overflow[pos]]
+        if self.layout[pos] == NONE:
+            return None
+        return [{field: self.tables[field][self.arrays[field][pos]] for field in self.layouts[self.layout[pos]]}]
+
+    def get(self, field, day, slot, section):
+        """Returns one field of a cell by names (None if absent)."""
+        pos = self.locate(day, slot, section)
+        return None if pos is None else self.tables[field][self.arrays[field][pos]]
+
+    def status(self, day, slot, section):
+        return self.get('status', day, slot, section)
+
+    def cell(self, day, slot, section):
+        """Returns the cell dict (the [0] entry of the data.json list), or None if missing."""
+        pos = self.locate(day, slot, section)
+        cell = None if pos is None else self.load(pos)
+        return cell[0] if cell else None
+
+    def cells_with_status(self, status, sections=None):
+        """Yields (day, slot, section) of every cell with the given status, day by day."""
+        status_id = self.tables['status'].id(status)
+        if status_id == NONE:
+            return
+        wanted = None if sections is None else {self.section_ids[s] for s in sections if s in self.section_ids}
+        statuses = self.arrays['status']
+        for day_id, day in enumerate(self.days):
+            for slot_id, slot in enumerate(self.slots):
+                base = self.position(day_id, slot_id, 0)
+                for section_id, section in enumerate(self.sections):
+                    if statuses[base + section_id] == status_id and (wanted is None or section_id in wanted):
+                        yield day, slot, section
+
+    def to_json(self):
+        """Returns the timetable in the data.json schema."""
+        data = {}
+        for day in self.days:
+            day_id = self.day_ids[day]
+            rows = []
+            for section_id in self.row_order[day]:
+                section = self.sections[section_id]
+                row = {'section': section}
+                for slot_id, slot in enumerate(self.slots):
+                    cell = self.load(self.position(day_id, slot_id, section_id))
+                    if cell is not None:
+                        row[slot] = cell
+                row.update(self.row_extras.get((day, section), {}))
+                rows.append(row)
+            data[day] = rows
+        return data
@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+# incremental.py
+"""
+Re-solves a timetable after a small edit without rebuilding the whole model.
+
+Given the base timetable (data.json, with its "To Be Assigned" and "Free"
+cells, already edited) and the previous solution, every class the solver
+placed earlier is kept fixed unless it touches an edited teacher, room or
+day, or shares a section-day with a class the edit placed. Only those
+sections/days are reopened. If the local problem is infeasible the
+neighborhood is widened step by step:
+
+1. the section-days that touch the edit
+2. the whole week of those sections
+3. plus every section sharing a teacher or theory room with them
+4. every section (a full re-solve)
+
+The previous solution is also passed as hints, so reopened cells keep
+their old values wherever the edit allows.
+
+Reads from:
+- config.json
+- data.json (base timetable, edited)
+- updated_timetable.json (previous solution)
+
+Writes to:
+- updated_timetable.json
+
+Usage:
+    python3 incremental.py --teacher SK
+    python3 incremental.py --teacher SK --day Monday
+    python3 incremental.py --room B-209 --day Tuesday --output edited_timetable.json
+    python3 incremental.py --teacher SK --blocks
+"""
+
+import argparse
+import json
+import sys
+import time
+from engine import load_data, report_failure, save_solution, share_rows, solve_sections, split_cell
+from verify import THEORY_BLOCKS
+
+
+def decided_cells(config_data, base_data, prior_data):
+    """
+    Returns {(section, day): [slots]} of the cells the previous run decided:
+    "To Be Assigned" theory cells and "Free" lab windows it filled, and
+    (with theory blocks) "To Be Assigned" cells it left "Free".
+    Lab windows are listed by both of their 1-hour slots.
+    """
+    prior = {(day, obj['section']): obj for day in config_data['settings']['days'] for obj in prior_data[day]}
+    cells = {}
+    for day in config_data['settings']['days']:
+        for obj in base_data[day]:
+            section = obj['section']
+            old = prior.get((day, section))
+            if old is None:
+                continue
+            for slot in config_data['settings']['all_slots']:
+                status, old_status = obj[slot][0]['status'], old[slot][0]['status']
+                if (status in ("To Be Assigned", "Free") and old_status == "Assigned") or (
+                        status == "To Be Assigned" and old_status == "Free"):
+                    cells.setdefault((section, day), []).append(slot)
+    return cells
+
+
+def edited_section_days(config_data, base_data, prior_data):
+    """
+    Returns the (section, day) pairs whose "Assigned" cells in base_data
+    differ from prior_data, i.e. where the edit itself placed or changed a
+    class (possibly over a cell the previous run had decided).
+    """
+    prior = {(day, obj['section']): obj for day in config_data['settings']['days'] for obj in prior_data[day]}
+    edited = set()
+    for day in config_data['settings']['days']:
+        for obj in base_data[day]:
+            old = prior.get((day, obj['section']))
+            if old is not None and any(obj[slot][0]['status'] == "Assigned" and obj[slot] != old[slot]
+                                       for slot in config_data['settings']['all_slots']):
+                edited.add((obj['section'], day))
+    return edited
+
+
+def touches_edit(config_data, section, day, slot_info, teachers, rooms, days):
+    """True if a previously decided cell uses an edited teacher/room or lies on an edited day."""
+    if days and day not in days:
+        return False
+    if not teachers and not rooms:
+        return True
+    used = set(split_cell(slot_info.get('teacher'))) | set(split_cell(slot_info.get('room')))
+    # A changed subject -> teacher mapping shows up in config, not in the old cell
+    teacher_map = {s: t for s, t in config_data['subjects'][section]}
+    subject = slot_info.get('subject')
+    if subject in teacher_map:
+        used.add(teacher_map[subject])
+    for part in str(subject or '').split(' / '):
+        lab_teacher = teacher_map.get(part.split(" (G-")[0]) or teacher_map.get(part.split(" ")[0])
+        if lab_teacher:
+            used.add(lab_teacher)
+    return bool(used & (set(teachers) | set(rooms)))
+
+
+def neighborhoods(config_data, affected):
+    """Yields growing sets of (section, day) pairs to reopen, starting from the affected ones."""
+    days = config_data['settings']['days']
+    levels = [set(affected)]
+    sections = {section for section, _ in affected}
+    levels.append({(s, d) for s in sections for d in days})
+
+    resources = {}
+    for section in config_data['sections']:
+        resources[section] = {t for _, t in config_data['subjects'][section] if "TBD" not in t}
+        resources[section].add(config_data['section_theory_rooms'][section])
+    neighbors = {s for s in config_data['sections'] if any(resources[s] & resources[a] for a in sections)}
+    levels.append({(s, d) for s in sections | neighbors for d in days})
+    levels.append({(s, d) for s in config_data['sections'] for d in days})
+
+    seen = set()
+    for level in levels:
+        if level and frozenset(level) not in seen:
+            seen.add(frozenset(level))
+            yield level
+
+
+def build_working_timetable(base_data, prior_data, decided, reopen, slots):
+    """
+    Puts the previous solution into every decided cell outside `reopen`.
+    Cells "Free" outside it (including those it emptied) are marked "Held"
+    so no class can move there; release_held_cells() turns them back into
+    "Free" after solving. Like the engine, only the replaced cells are new
+    objects: the rows are copied with share_rows() and the cells shared.
+    """
+    working = share_rows(base_data)
+    prior = {(day, obj['section']): obj for day in prior_data for obj in prior_data[day]}
+    for day in working:
+        for obj in working[day]:
+            key = (obj['section'], day)
+            if key in reopen:
+                continue
+            for slot in decided.get(key, []):
+                obj[slot] = prior[day, obj['section']][slot]
+            for slot in slots:
+                if obj[slot][0]['status'] == "Free":
+                    obj[slot] = [{'status': "Held"}]
+    return working
+
+
+def release_held_cells(timetable_data):
+    """Turns the cells held by build_working_timetable() back into "Free"."""
+    for day in timetable_data:
+        for obj in timetable_data[day]:
+            for slot, cell in obj.items():
+                if slot != 'section' and cell[0]['status'] == "Held":
+                    obj[slot] = [{'status': "Free"}]
+
+
+def resolve_edit(config_data, base_data, prior_data, teachers=(), rooms=(), days=(),
+                 formulation="int", resources="slot"):
+    """
+    Re-solves the neighborhood of an edit.
+
+    Returns the new timetable, or None if even a full re-solve fails.
+    """
+    decided = decided_cells(config_data, base_data, prior_data)
+    prior = {(day, obj['section']): obj for day in prior_data for obj in prior_data[day]}
+    affected = {(section, day) for (section, day), slots in decided.items()
+                if any(touches_edit(config_data, section, day, prior[day, section][slot][0], teachers, rooms, days)
+                       for slot in slots)}
+    affected |= edited_section_days(config_data, base_data, prior_data)
+    if not affected:
+        print("Nothing in the previous solution touches the edit; keeping it unchanged.")
+        return prior_data
+
+    status = None
+    levels = list(neighborhoods(config_data, affected))
+    for level, reopen in enumerate(levels, 1):
+        sections = [s for s in config_data['sections'] if any((s, d) in reopen for d in config_data['settings']['days'])]
+        n_cells = sum(len(decided.get(key, [])) for key in reopen)
+        print(f"\n--- Neighborhood {level}: {n_cells} cells in {len(reopen)} section-days "
+              f"({', '.join(sections)}) ---")
+        start = time.perf_counter()
+        working = build_working_timetable(base_data, prior_data, decided, reopen,
+                                          config_data['settings']['all_slots'])
+        status, solution = solve_sections(config_data, working, sections, formulation, resources,
+                                          hint_data=prior_data)
+        if solution is not None:
+            release_held_cells(working)
+            print(f"✅ Re-solved neighborhood {level} in {time.perf_counter() - start:.3f}s")
+            return working
+        print(f"✗ Neighborhood {level} could not be solved" + (", widening..." if level < len(levels) else ""))
+
+    report_failure(status)
+    return None
+
+
+def count_changed_cells(config_data, old, new):
+    """Counts (section, day, slot) cells whose contents differ between two timetables."""
+    old_cells = {(day, obj['section']): obj for day in old for obj in old[day]}
+    changed = 0
+    for day in new:
+        for obj in new[day]:
+            for slot in config_data['settings']['all_slots']:
+                if obj[slot] != old_cells[day, obj['section']][slot]:
+                    changed += 1
+    return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-solve only the part of a timetable touched by an edit.")
+    parser.add_argument('--teacher', nargs='+', default=[], help="Edited teacher(s)")
+    parser.add_argument('--room', nargs='+', default=[], help="Edited room(s)")
+    parser.add_argument('--day', nargs='+', default=[], help="Edited day(s)")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json', help="Base timetable with the edit applied")
+    parser.add_argument('--previous', default='updated_timetable.json', help="Previously solved timetable")
+    parser.add_argument('--output', default='updated_timetable.json')
+    parser.add_argument('--formulation', choices=["int", "bool"], default="int")
+    parser.add_argument('--resources', choices=["slot", "interval"], default="slot")
+    parser.add_argument('--blocks', action='store_true',
+                        help="Let the model place theory in continuous blocks, as engine.py --blocks")
+    args = parser.parse_args(argv)
+    if not (args.teacher or args.room or args.day):
+        parser.error("give at least one of --teacher, --room or --day")
+
+    config_data, base_data = load_data(args.config, args.data)
+    if args.blocks and not config_data['settings'].get('theory_blocks'):
+        config_data['settings']['theory_blocks'] = list(THEORY_BLOCKS)
+    try:
+        with open(args.previous, 'r') as f:
+            prior_data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: Could not load the previous solution. {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    result = resolve_edit(config_data, base_data, prior_data, args.teacher, args.room, args.day,
+                          args.formulation, args.resources)
+    if result is None:
+        sys.exit(1)
+    print(f"Changed {count_changed_cells(config_data, prior_data, result)} cells "
+          f"in {time.perf_counter() - start:.3f}s")
+    print(f"Saving to {args.output}...")
+    # The result shares its unchanged cells with base_data, so only the rest is looked up
+    if not save_solution(result, args.output, base_data if result is not prior_data else None):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
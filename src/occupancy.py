@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# occupancy.py
+"""
+Busy slots of teachers and rooms, built from the "Assigned" cells of a
+timetable in one pass.
+
+Every (teacher or room, day) gets an integer bitmask with one bit per
+1-hour slot, so "is this teacher free over this window" is a single AND.
+Who occupies a resource is kept alongside for reports.
+
+Shared by dd.py and diagnose.py (which print the analysis), precheck.py,
+verify.py and engine.py (which uses it to prune impossible values before
+the model is built).
+"""
+
+from grid import TimetableGrid
+
+# 2-hour lab windows and the 1-hour slots they cover
+LAB_SLOT_MAP = {
+    "9-11": ("9-10", "10-11"),
+    "11-1": ("11-12", "12-1"),
+    "3-5": ("3-4", "4-5")
+}
+
+KINDS = ("teacher", "room", "lab_room")
+
+
+class Occupancy:
+    """Per-day slot bitmasks of every teacher, theory room and lab room."""
+
+    def __init__(self, slots):
+        self.slot_bits = {slot: 1 << i for i, slot in enumerate(slots)}
+        self.masks = {kind: {} for kind in KINDS}  # kind -> (name, day) -> bitmask
+        self.users = {}  # (kind, name, day) -> [(slot, section)]
+        self.at_slot = {}  # (day, slot) -> [(kind, name, section)]
+        self._window_masks = {}
+
+    def add(self, kind, name, day, slot, section):
+        """Marks a resource busy in one slot."""
+        masks = self.masks[kind]
+        masks[name, day] = masks.get((name, day), 0) | self.slot_bits[slot]
+        self.users.setdefault((kind, name, day), []).append((slot, section))
+        self.at_slot.setdefault((day, slot), []).append((kind, name, section))
+
+    def mask(self, slots):
+        """Bitmask of a tuple of slots (e.g. a lab window), memoized."""
+        slots = tuple(slots)
+        if slots not in self._window_masks:
+            mask = 0
+            for slot in slots:
+                mask |= self.slot_bits.get(slot, 0)
+            self._window_masks[slots] = mask
+        return self._window_masks[slots]
+
+    def is_free(self, kind, name, day, slots):
+        """True if the resource is free in every one of the slots."""
+        return not self.masks[kind].get((name, day), 0) & self.mask(slots)
+
+    def room_free(self, name, day, slots):
+        """True if a room is used neither for theory nor for labs in any of the slots."""
+        mask = self.mask(slots)
+        return not (self.masks['room'].get((name, day), 0) | self.masks['lab_room'].get((name, day), 0)) & mask
+
+    def sections_using(self, kind, name, day, slot):
+        """Sections that occupy a resource in one slot."""
+        return [section for s, section in self.users.get((kind, name, day), []) if s == slot]
+
+
+def build_occupancy(config, data, sections=None):
+    """
+    Builds the Occupancy of every "Assigned" cell (of `sections`, if given).
+    data is a data.json-shaped dict or a TimetableGrid.
+
+    Combined lab cells ("X / Y") are split per group; their rooms count as
+    lab rooms. Teachers containing "TBD" are placeholders and skipped.
+    """
+    grid = data if isinstance(data, TimetableGrid) else TimetableGrid.from_json(
+        data, config['settings']['days'], config['settings']['all_slots'])
+    occupancy = Occupancy(grid.slots)
+
+    for day, slot, section in grid.cells_with_status("Assigned", sections):
+        teacher = grid.get('teacher', day, slot, section) or ''
+        room = grid.get('room', day, slot, section) or ''
+
+        for t in str(teacher).split('/'):
+            t = t.strip()
+            if t and "TBD" not in t:
+                occupancy.add('teacher', t, day, slot, section)
+
+        if room and "/" not in str(room):
+            occupancy.add('room', room, day, slot, section)
+        elif room:
+            for r in room.split('/'):
+                occupancy.add('lab_room', r.strip(), day, slot, section)
+
+    return occupancy
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# precheck.py
+"""
+Fail-fast feasibility precheck for the timetable solver.
+
+Pure Python (no OR-Tools import), so it runs in milliseconds. It uses
+counting and Hall-style bounds to catch instances that can never be
+solved before a CP-SAT model is built:
+
+1. "To Be Assigned" slots vs the classes still needed (core_subjects * 3)
+2. theory rooms already taken in a "To Be Assigned" slot
+3. per subject: days on which its teacher is free vs classes needed
+4. free 2-hour lab windows vs len(labs) (at most 2 labs a day)
+5. per lab: windows in which its teacher is free vs number of groups
+6. per teacher: demanded hours vs free hours over all their sections
+7. per section and overall: lab rooms free per window vs lab sessions
+
+Reads from:
+- config.json
+- data.json (or any timetable passed with --data)
+
+Usage:
+    python3 precheck.py
+    python3 precheck.py --sections CSE-7 IT-7
+"""
+
+import argparse
+import json
+import sys
+import time
+from grid import TimetableGrid
+from occupancy import LAB_SLOT_MAP, build_occupancy
+
+
+def lab_teacher(config, section, lab_name):
+    """Returns the teacher of a lab ("DS Lab" falls back to the "DS" teacher)."""
+    teacher_map = {s: t for s, t in config['subjects'][section]}
+    if lab_name in teacher_map:
+        return teacher_map[lab_name]
+    return teacher_map.get(lab_name.split(" ")[0])
+
+
+def run_precheck(config, data, sections=None):
+    """
+    Returns a list of reasons why the instance is infeasible.
+    An empty list means no obvious problem was found (not that it is feasible).
+    """
+    days = config['settings']['days']
+    slots = config['settings']['all_slots']
+    groups = config['settings']['groups']
+    windows = [w for w in config['settings']['lab_slot'] if w in LAB_SLOT_MAP]
+    sections = list(sections or config['sections'])
+    lab_rooms = config['lab_rooms']
+
+    grid = TimetableGrid.from_json(data, days, slots)
+    occupancy = build_occupancy(config, grid)
+    reasons = []
+
+    missing = [s for s in sections if s not in config['sections'] or s not in grid.section_ids]
+    if missing:
+        return [f"Unknown section(s): {', '.join(missing)}"]
+
+    def status(section, day, slot):
+        return grid.status(day, slot, section)
+
+    # Hours each teacher could work on, and the hours they are asked for
+    teacher_demand, teacher_supply = {}, {}
+    room_sessions_needed = 0
+    window_demand = {}  # (day, window) -> number of sections that could use it
+
+    for section in sections:
+        teacher_map = {s: t for s, t in config['subjects'][section]}
+        core_subjects = config['core_subjects'][section]
+        tba = [(day, slot) for day in days for slot in slots if status(section, day, slot) == "To Be Assigned"]
+
+        # --- 1. Slot count ---
+        pre_count = {subj: 0 for subj in core_subjects}
+        pre_days = {subj: set() for subj in core_subjects}
+        for day in days:
+            for slot in slots:
+                if status(section, day, slot) == "Assigned":
+                    subject = grid.get('subject', day, slot, section)
+                    if subject in pre_count:
+                        pre_count[subject] += 1
+                        pre_days[subject].add(day)
+        needed = {subj: max(0, 3 - c) for subj, c in pre_count.items()}
+        if len(tba) != sum(needed.values()):
+            detail = ", ".join(f"{subj} {n}" for subj, n in needed.items())
+            reasons.append(f"{section}: {len(tba)} 'To Be Assigned' slots but {sum(needed.values())} "
+                           f"theory classes are needed ({detail})")
+
+        # --- 2. Theory room ---
+        room = config['section_theory_rooms'][section]
+        for day, slot in tba:
+            if not occupancy.is_free('room', room, day, (slot,)):
+                others = occupancy.sections_using('room', room, day, slot)
+                reasons.append(f"{section}: room {room} is already used by {', '.join(others)} on {day} {slot}")
+
+        # --- 3. Subject vs teacher-free days ---
+        for subject in core_subjects:
+            teacher = teacher_map.get(subject)
+            free_cells = [(day, slot) for day, slot in tba
+                          if day not in pre_days[subject]
+                          and (not teacher or occupancy.is_free('teacher', teacher, day, (slot,)))]
+            free_days = {day for day, _ in free_cells}
+            if needed[subject] > len(free_days):
+                reasons.append(f"{section}: {subject} ({teacher}) needs {needed[subject]} more classes, one per day, "
+                               f"but its teacher is free in a 'To Be Assigned' slot on only {len(free_days)} day(s)")
+            if teacher and "TBD" not in teacher and needed[subject]:
+                teacher_demand[teacher] = teacher_demand.get(teacher, 0) + needed[subject]
+                teacher_supply.setdefault(teacher, set()).update(free_cells)
+
+        # --- 4. Lab windows ---
+        labs = config['labs'].get(section, [])
+        if not labs:
+            continue
+        if len(labs) < len(groups):
+            reasons.append(f"{section}: {len(labs)} lab(s) cannot run in parallel for {len(groups)} groups")
+        free_windows = [(day, w) for day in days for w in windows
+                        if all(status(section, day, s) == "Free" for s in LAB_SLOT_MAP[w])]
+        per_day = {day: sum(1 for d, _ in free_windows if d == day) for day in days}
+        usable = sum(min(2, n) for n in per_day.values())
+        if usable < len(labs):
+            reasons.append(f"{section}: only {usable} usable free 2-hour lab windows "
+                           f"({len(free_windows)} free, at most 2 a day) for {len(labs)} labs")
+
+        # --- 5. Lab teachers ---
+        for lab_name in labs:
+            teacher = lab_teacher(config, section, lab_name)
+            if not teacher:
+                reasons.append(f"{section}: no teacher mapped for '{lab_name}'")
+                continue
+            teacher_windows = [(day, w) for day, w in free_windows
+                               if occupancy.is_free('teacher', teacher, day, LAB_SLOT_MAP[w])]
+            if len(teacher_windows) < len(groups):
+                reasons.append(f"{section}: '{lab_name}' ({teacher}) must run once per group ({len(groups)}) "
+                               f"but its teacher is free in only {len(teacher_windows)} free lab window(s)")
+            if "TBD" not in teacher:
+                teacher_demand[teacher] = teacher_demand.get(teacher, 0) + 2 * len(groups)
+                teacher_supply.setdefault(teacher, set()).update(
+                    (day, s) for day, w in teacher_windows for s in LAB_SLOT_MAP[w])
+
+        # --- 7a. Lab rooms for this section ---
+        roomy_windows = [(day, w) for day, w in free_windows
+                         if sum(occupancy.room_free(r, day, LAB_SLOT_MAP[w]) for r in lab_rooms) >= len(groups)]
+        if len(roomy_windows) < len(labs):
+            reasons.append(f"{section}: only {len(roomy_windows)} free lab window(s) have {len(groups)} free lab rooms, "
+                           f"{len(labs)} needed")
+        room_sessions_needed += len(labs) * len(groups)
+        for key in free_windows:
+            window_demand[key] = window_demand.get(key, 0) + 1
+
+    # --- 6. Teacher hours (Hall bound over all of a teacher's sections) ---
+    for teacher, demand in sorted(teacher_demand.items()):
+        supply = len(teacher_supply.get(teacher, ()))
+        if demand > supply:
+            reasons.append(f"Teacher {teacher}: {demand} hours demanded but free in only {supply} usable hour(s)")
+
+    # --- 7b. Lab room capacity over all sections ---
+    room_sessions_free = 0
+    for (day, w), n_sections in window_demand.items():
+        free_rooms = sum(occupancy.room_free(r, day, LAB_SLOT_MAP[w]) for r in lab_rooms)
+        room_sessions_free += min(free_rooms, n_sections * len(groups))
+    if room_sessions_needed > room_sessions_free:
+        reasons.append(f"Lab rooms: {room_sessions_needed} group lab sessions needed but only "
+                       f"{room_sessions_free} room-windows are free")
+
+    return reasons
+
+
+def report(reasons, elapsed):
+    """Prints the precheck result."""
+    if reasons:
+        print(f"❌ Precheck found {len(reasons)} reason(s) the timetable cannot be solved:")
+        for reason in reasons:
+            print(f"  ✗ {reason}")
+    else:
+        print(f"✅ Precheck passed in {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fast feasibility precheck (no solver needed).")
+    parser.add_argument('--sections', nargs='+', help="Sections to check (default: all sections in config.json)")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='data.json')
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        with open(args.data, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: Could not load input. {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    reasons = run_precheck(config, data, args.sections)
+    report(reasons, time.perf_counter() - start)
+    if reasons:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
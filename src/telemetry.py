@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# telemetry.py
+"""
+Structured run metrics for engine.py.
+
+engine.py --stats FILE appends one JSON record per run (per-block build
+timers and counters, CP-SAT response stats) and --prometheus FILE writes
+the same numbers in the Prometheus textfile-collector format, so a
+node_exporter can pick them up.
+"""
+
+import json
+import os
+import re
+
+# "Starting presolve at 0.00s" / "Starting search at 0.13s with 8 workers."
+PRESOLVE_START = re.compile(r"^Starting presolve at ([\d.]+)s")
+SEARCH_START = re.compile(r"^Starting search at ([\d.]+)s")
+
+
+def presolve_seconds(log_lines):
+    """Returns the presolve time read from a CP-SAT search log, or None."""
+    start = end = None
+    for line in log_lines:
+        match = PRESOLVE_START.match(line)
+        if match and start is None:
+            start = float(match.group(1))
+        match = SEARCH_START.match(line)
+        if match:
+            end = float(match.group(1))
+    if start is None or end is None:
+        return None
+    return end - start
+
+
+def solver_stats(solver, status, log_lines=None):
+    """Collects the response stats of a finished CpSolver."""
+    response = solver.ResponseProto()
+    return {
+        'status': solver.StatusName(status),
+        'wall_seconds': response.wall_time,
+        'user_seconds': response.user_time,
+        'deterministic_time': response.deterministic_time,
+        'presolve_seconds': presolve_seconds(log_lines or []),
+        'conflicts': response.num_conflicts,
+        'branches': response.num_branches,
+        'booleans': response.num_booleans,
+        'binary_propagations': response.num_binary_propagations,
+        'integer_propagations': response.num_integer_propagations,
+        'best_objective_bound': response.best_objective_bound,
+        'objective_value': response.objective_value,
+    }
+
+
+def append_run_record(path, record):
+    """Appends one run record as a JSON line."""
+    with open(path, 'a') as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def prometheus_lines(record):
+    """Renders a run record as Prometheus gauges, each metric as one group."""
+    metrics = {}  # name -> (help text, samples), in first-seen order
+
+    def gauge(name, value, help_text, labels=None):
+        if value is None:
+            return
+        label_text = ",".join(f'{k}="{v}"' for k, v in (labels or {}).items())
+        sample = f"{name}{{{label_text}}} {float(value)}" if label_text else f"{name} {float(value)}"
+        metrics.setdefault(name, (help_text, []))[1].append(sample)
+
+    gauge("timetable_run_success", 1 if record.get('ok') else 0, "1 if the last run saved a timetable")
+    gauge("timetable_run_seconds", record.get('total_seconds'), "Wall time of the last run")
+    gauge("timetable_precheck_seconds", record.get('precheck_seconds'), "Time spent in the precheck")
+    for i, solve in enumerate(record.get('solves', [])):
+        labels = {'solve': str(i)}
+        gauge("timetable_instance_seconds", solve.get('instance_seconds'), "Time to build the instance maps", labels)
+        gauge("timetable_prune_seconds", solve.get('prune_seconds'), "Time spent pruning domains", labels)
+        gauge("timetable_model_variables", solve.get('variables'), "Variables in the model", labels)
+        gauge("timetable_model_constraints", solve.get('constraints'), "Constraints in the model", labels)
+        for block in solve.get('build_stages', []):
+            block_labels = {**labels, 'block': block['name']}
+            gauge("timetable_build_block_seconds", block['seconds'], "Build time per model block", block_labels)
+            gauge("timetable_build_block_variables", block['variables'], "Variables added per model block",
+                  block_labels)
+            gauge("timetable_build_block_constraints", block['constraints'], "Constraints added per model block",
+                  block_labels)
+        stats = solve.get('solver', {})
+        gauge("timetable_solver_first_solution_seconds", solve.get('first_solution_seconds'),
+              "Time to the first feasible solution", labels)
+        for key in ('wall_seconds', 'presolve_seconds', 'conflicts', 'branches', 'best_objective_bound'):
+            gauge(f"timetable_solver_{key}", stats.get(key), f"CP-SAT {key.replace('_', ' ')}", labels)
+
+    lines = []
+    for name, (help_text, samples) in metrics.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"] + samples
+    return lines
+
+
+def write_prometheus(path, record):
+    """Writes a textfile-collector file atomically (write to a temp file, then rename)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write("\n".join(prometheus_lines(record)) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# timetable.py
+"""
+One command line for every timetable tool:
+
+    solve     solve any set of sections with CP-SAT (engine.py)
+    precheck  fast feasibility precheck (precheck.py)
+    diagnose  teacher and room double-bookings (diagnose.py)
+    analyze   detailed per-section conflict analysis (dd.py)
+    verify    check a solved timetable against the hard rules (verify.py)
+
+Each subcommand takes the options of the script it runs (see
+`python3 timetable.py solve -h`). Modules are imported only when their
+subcommand runs, so OR-Tools is loaded by `solve` alone and the checks
+start in milliseconds.
+
+Usage:
+    python3 timetable.py solve --sections CSE-7 IT-7 --resume
+    python3 timetable.py precheck --sections CSE-5 CSE-AI-ML-5
+    python3 timetable.py analyze --sections CSE-7 IT-7
+    python3 timetable.py verify --data updated_timetable.json
+"""
+
+import argparse
+import importlib
+
+# subcommand -> (module, help)
+COMMANDS = {
+    'solve': ("engine", "Solve sections with CP-SAT"),
+    'precheck': ("precheck", "Fast feasibility precheck (no solver needed)"),
+    'diagnose': ("diagnose", "Find teacher and room double-bookings"),
+    'analyze': ("dd", "Show why the solver fails for some sections"),
+    'verify': ("verify", "Check a solved timetable against the hard rules"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="timetable.py", description="University timetable tools.")
+    subparsers = parser.add_subparsers(dest='command', metavar='command', required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        # Options (including -h) are left for the subcommand's own parser
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    args, rest = parser.parse_known_args(argv)
+
+    importlib.import_module(COMMANDS[args.command][0]).main(rest)
+
+
+if __name__ == "__main__":
+    main()
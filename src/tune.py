@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# tune.py
+"""
+Tunes CP-SAT parameters over recorded or synthetic instances.
+
+Candidate configurations (workers, search branching, linearization level,
+presolve, symmetry level) are sampled from a small grid and every
+(configuration, instance) pair is solved --repeats times, one run at a
+time so that no run competes with another for the CPU. With --jobs N the
+single-worker configurations (num_workers: 1) are solved first in N
+processes side by side (at most one per CPU); the others still run alone
+afterwards. A configuration is scored by the sum over instances of its
+median wall time, with unsolved runs (UNKNOWN or MODEL_INVALID) charged
+twice the time limit. The best one is written to solver_profile.json
+(next to engine.py, which loads it) only if it beats the defaults by
+--min-gain; otherwise the default profile (no parameters) is written.
+
+Reads from:
+- corpus/ (see corpus.py) and/or synthetic instances from benchmark.py
+
+Writes to:
+- solver_profile.json
+
+Usage:
+    python3 tune.py
+    python3 tune.py --corpus corpus --trials 20 --repeats 5
+    python3 tune.py --synthetic 7 28 --time-limit 30
+    python3 tune.py --jobs 4
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from benchmark import generate_instance
+from corpus import build_corpus_model, load_corpus, load_model, solve_with_params
+from engine import SOLVER_PROFILE
+
+SEARCH_SPACE = {
+    'num_workers': [1, 4, 8, 16],
+    'search_branching': ["AUTOMATIC_SEARCH", "FIXED_SEARCH", "PORTFOLIO_SEARCH"],
+    'linearization_level': [0, 1, 2],
+    'cp_model_presolve': ["true", "false"],
+    'symmetry_level': [0, 2],
+}
+
+
+def candidate_params(trials, seed=0):
+    """Returns the default configuration ("") plus up to `trials` sampled text-format configurations."""
+    grid = [" ".join(f"{k}: {v}" for k, v in zip(SEARCH_SPACE, values))
+            for values in itertools.product(*SEARCH_SPACE.values())]
+    random.Random(seed).shuffle(grid)
+    return [""] + grid[:trials]
+
+
+def synthetic_instances(scales, timeout):
+    """Returns corpus-style metadata for synthetic instances of the given section counts."""
+    metas = []
+    for n in scales:
+        config, data = generate_instance(n, round(n * 3), max(2, round(n * 0.75)), timeout=timeout)
+        metas.append({'hash': f"synthetic-{n}", 'source': "benchmark.py", 'config': config, 'timetable': data,
+                      'sections': config['sections'], 'formulation': "int", 'resources': "slot"})
+    return metas
+
+
+def instance_model(corpus_dir, meta):
+    """Loads a recorded model, or builds the model of a synthetic instance."""
+    if corpus_dir:
+        return load_model(corpus_dir, meta)
+    return build_corpus_model(meta['config'], meta['timetable'], meta['sections'], meta['formulation'],
+                              meta['resources'])
+
+
+def run_seconds(status, wall, time_limit):
+    """Wall time of one run, charging unsolved runs twice the time limit."""
+    return wall if status in ("OPTIMAL", "FEASIBLE", "INFEASIBLE") else 2 * time_limit
+
+
+def score(results, time_limit):
+    """Sum over instances of the median run time; results holds one list of (status, wall) runs per instance."""
+    return sum(statistics.median(run_seconds(status, wall, time_limit) for status, wall in runs)
+               for runs in results)
+
+
+def single_worker(params):
+    """True if a text-format configuration runs CP-SAT on one worker."""
+    return re.search(r"\bnum_workers: 1\b", params) is not None
+
+
+def solve_runs(task):
+    """Solves one instance `repeats` times under one configuration (a process pool task)."""
+    corpus_dir, meta, params, time_limit, repeats = task
+    model = instance_model(corpus_dir, meta)
+    return [solve_with_params(model, params, time_limit) for _ in range(repeats)]
+
+
+def tune(instances, param_sets, time_limit, repeats, jobs=1):
+    """
+    Solves every (configuration, instance) pair `repeats` times, one run
+    at a time. With jobs > 1 the single-worker configurations are solved
+    first in that many processes. Returns [(score, params, results)]
+    sorted best first.
+    """
+    pooled = [params for params in param_sets if jobs > 1 and single_worker(params)]
+    results_by_params = {}
+    if pooled:
+        tasks = [(corpus_dir, meta, params, time_limit, repeats) for params in pooled for corpus_dir, meta in instances]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            runs = list(pool.map(solve_runs, tasks))
+        for i, params in enumerate(pooled):
+            results_by_params[params] = runs[i * len(instances):(i + 1) * len(instances)]
+
+    models = [instance_model(corpus_dir, meta) for corpus_dir, meta in instances]
+    ranked = []
+    for params in param_sets:
+        results = results_by_params.get(params)
+        if results is None:
+            results = [[solve_with_params(model, params, time_limit) for _ in range(repeats)] for model in models]
+        ranked.append((score(results, time_limit), params, results))
+    return sorted(ranked, key=lambda r: r[0])
+
+
+def write_profile(path, params, best_score, default_score, n_instances):
+    """Writes the tuned configuration for engine.py to load."""
+    profile = {
+        'params': params,
+        'score_seconds': best_score,
+        'default_score_seconds': default_score,
+        'instances': n_instances,
+        'tuned': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search CP-SAT parameters and save the best as a solver profile.")
+    parser.add_argument('--corpus', default='corpus', help="Recorded instances (see corpus.py); skipped if missing")
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[], help="Also tune on synthetic instances")
+    parser.add_argument('--trials', type=int, default=12, help="Sampled configurations besides the defaults")
+    parser.add_argument('--time-limit', type=float, default=30)
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per configuration and instance (median is scored)")
+    parser.add_argument('--min-gain', type=float, default=0.1,
+                        help="Keep the defaults unless the best configuration is this fraction faster")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help="Processes for the single-worker configurations (the others always run alone)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', default=SOLVER_PROFILE)
+    args = parser.parse_args(argv)
+
+    instances = []
+    if os.path.isdir(args.corpus):
+        instances += [(args.corpus, meta) for meta in load_corpus(args.corpus)]
+    instances += [(None, meta) for meta in synthetic_instances(args.synthetic, args.time_limit)]
+    if not instances:
+        print("Error: No instances. Record some with 'python3 corpus.py seed' or pass --synthetic.",
+              file=sys.stderr)
+        sys.exit(1)
+
+    param_sets = candidate_params(args.trials, args.seed)
+    cpus = os.cpu_count() or 1
+    if args.jobs > cpus:
+        # More processes than cores would make the pooled runs compete, which is what --jobs must avoid
+        print(f"Only {cpus} CPU(s): running --jobs {cpus}")
+        args.jobs = cpus
+    print(f"Tuning {len(param_sets)} configurations on {len(instances)} instance(s), "
+          f"{args.repeats} run(s) each...")
+    ranked = tune(instances, param_sets, args.time_limit, args.repeats, args.jobs)
+
+    default_score = next(s for s, params, _ in ranked if params == "")
+    for s, params, results in ranked[:5]:
+        statuses = ", ".join(sorted({status for runs in results for status, _ in runs}))
+        print(f"  {s:8.3f}s  {params or 'defaults'}  ({statuses})")
+
+    best_score, best_params, _ = ranked[0]
+    if best_params and best_score > default_score * (1 - args.min_gain):
+        print(f"No configuration beats the defaults by {args.min_gain:.0%} "
+              f"({best_score:.3f}s vs {default_score:.3f}s); keeping the defaults")
+        best_params, best_score = "", default_score
+    write_profile(args.profile, best_params, best_score, default_score, len(instances))
+    print(f"✅ Saved {best_params or 'the default parameters'!r} to {args.profile} "
+          f"({best_score:.3f}s vs {default_score:.3f}s with defaults)")
+
+
+if __name__ == "__main__":
+    main()
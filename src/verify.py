@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# verify.py
+"""
+Independent check of a solved timetable against the hard rules of
+constraints.txt, without OR-Tools:
+
+- teacher_clash / room_clash: one teacher or room in two places at once
+- frequency: every core subject 3 times a week, every lab once per group
+- daily_limit: a core subject at most once a day, at most 4 theory classes a day
+- block: a day's theory classes form one of the allowed continuous blocks
+- recess: no teacher takes both 12-1 and 2-3 on the same day
+- lab_parallelism: lab cells hold one lab per group, with distinct rooms,
+  over a whole 2-hour lab window
+- unassigned: no "To Be Assigned" cells are left
+
+The timetable is read once into a TimetableGrid and an Occupancy
+(occupancy.py); the checks are then set and bitmask operations on
+per-(section, day) and per-(teacher or room, day) masks. Every violation
+is a dict with a 'rule', the day/slot/section/name it concerns and a
+'message', so the result can gate a pipeline run.
+
+Reads from:
+- config.json
+- updated_timetable.json (or any timetable passed with --data)
+
+Writes to:
+- the JSON Lines file given with --report (one record per violation)
+
+Usage:
+    python3 verify.py
+    python3 verify.py --data updated_timetable.json --sections CSE-7 IT-7
+    python3 verify.py --rules teacher_clash room_clash frequency --report violations.jsonl
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from grid import TimetableGrid
+from occupancy import LAB_SLOT_MAP, build_occupancy
+
+RULES = ("teacher_clash", "room_clash", "frequency", "daily_limit", "block", "recess", "lab_parallelism",
+         "unassigned")
+
+# Allowed layouts of a day's theory classes (constraints.txt, section rules);
+# config.json can replace them with settings.theory_blocks
+THEORY_BLOCKS = ["9-11", "10-12", "2-4", "3-5", "9-12", "10-1", "2-5", "9-1", "9-11 + 3-5"]
+MAX_THEORY_PER_DAY = 4
+CLASSES_PER_SUBJECT = 3
+RECESS_SLOTS = ("12-1", "2-3")
+
+LAB_PART = re.compile(r"^(.*) \(G-(\w+)\)$")
+
+
+def block_slots(block, slots):
+    """
+    Returns the 1-hour slots of a block name such as "10-1" or "9-11 + 3-5":
+    every slot from the one starting at "10" to the one ending at "1".
+    """
+    covered = []
+    for part in block.split('+'):
+        start, end = part.strip().split('-')
+        starts = [i for i, slot in enumerate(slots) if slot.split('-')[0] == start]
+        ends = [i for i, slot in enumerate(slots) if slot.split('-')[1] == end]
+        if not starts or not ends or ends[0] < starts[0]:
+            raise ValueError(f"Theory block '{block}' does not match the slots {', '.join(slots)}")
+        covered.extend(slots[starts[0]:ends[0] + 1])
+    return tuple(covered)
+
+
+def theory_blocks(config):
+    """Returns {block name: slots} of the allowed theory blocks."""
+    slots = config['settings']['all_slots']
+    return {name: block_slots(name, slots) for name in config['settings'].get('theory_blocks') or THEORY_BLOCKS}
+
+
+def violation(rule, message, **fields):
+    return {'rule': rule, **fields, 'message': message}
+
+
+def find_clashes(occupancy, sections):
+    """Teacher and room clashes that involve at least one of the sections."""
+    # A room is one resource whether it hosts theory or a lab group
+    uses = {}
+    for (kind, name, day), users in occupancy.users.items():
+        resource = "teacher" if kind == "teacher" else "room"
+        for slot, section in users:
+            uses.setdefault((resource, name, day, slot), []).append(section)
+
+    found = []
+    for (resource, name, day, slot), users in uses.items():
+        if len(users) > 1 and any(s in sections for s in users):
+            found.append(violation(f"{resource}_clash",
+                                   f"{resource.capitalize()} {name} is double-booked on {day} {slot}: "
+                                   f"{', '.join(users)}",
+                                   day=day, slot=slot, name=name, sections=users))
+    return found
+
+
+def find_recess(occupancy, sections):
+    """Teachers who take both recess slots on a day."""
+    recess = occupancy.mask(RECESS_SLOTS)
+    found = []
+    for (name, day), mask in occupancy.masks['teacher'].items():
+        if mask & recess != recess:
+            continue
+        users = [s for slot in RECESS_SLOTS for s in occupancy.sections_using('teacher', name, day, slot)]
+        if any(s in sections for s in users):
+            found.append(violation("recess", f"Teacher {name} takes both 12-1 and 2-3 on {day} "
+                                   f"({', '.join(users)})", day=day, name=name, sections=users))
+    return found
+
+
+def check_labs(config, section, day, lab_cells):
+    """
+    Checks the lab cells of one (section, day), {slot: (subject, teacher, room)}.
+    Returns (violations, windows): windows is a list of (window, [(lab, group)]).
+    """
+    groups = config['settings']['groups']
+    found, windows, covered = [], [], set()
+
+    for window, hours in LAB_SLOT_MAP.items():
+        cells = [lab_cells.get(h) for h in hours]
+        if cells[0] is None or cells[0] != cells[1]:
+            continue
+        covered.update(hours)
+        subject, teacher, room = cells[0]
+        parts = [LAB_PART.match(p.strip()) for p in subject.split(' / ')]
+        labs = [(m.group(1), m.group(2)) for m in parts if m]
+        rooms = [r.strip() for r in str(room or '').split('/') if r.strip()]
+        teachers = [t.strip() for t in str(teacher or '').split('/') if t.strip()]
+        problems = []
+        if len(labs) != len(parts) or [g for _, g in labs] != groups:
+            problems.append(f"groups {', '.join(g for _, g in labs) or 'none'} instead of {', '.join(groups)}")
+        unknown = [lab for lab, _ in labs if lab not in config['labs'].get(section, [])]
+        if unknown:
+            problems.append(f"unknown lab(s) {', '.join(unknown)}")
+        if len(teachers) != len(parts):
+            problems.append(f"{len(teachers)} teacher(s) for {len(parts)} group(s)")
+        if len(rooms) != len(parts) or len(set(rooms)) != len(rooms):
+            problems.append(f"rooms '{room}' are not one distinct room per group")
+        if problems:
+            found.append(violation("lab_parallelism", f"{section} {day} {window}: {'; '.join(problems)}",
+                                   section=section, day=day, slot=window))
+        windows.append((window, labs))
+
+    for slot in lab_cells:
+        if slot not in covered:
+            found.append(violation("lab_parallelism", f"{section} {day} {slot}: lab does not fill a 2-hour lab window",
+                                   section=section, day=day, slot=slot))
+    return found, windows
+
+
+def verify_timetable(config, timetable, sections=None, rules=None):
+    """
+    Returns every violation of the hard rules in the timetable, for the
+    given sections (default: all sections in config.json) and rules
+    (default: RULES).
+    """
+    days = config['settings']['days']
+    slots = config['settings']['all_slots']
+    groups = config['settings']['groups']
+    sections = list(sections or config['sections'])
+    rules = set(rules or RULES)
+
+    grid = TimetableGrid.from_json(timetable, days, slots)
+    missing = [s for s in sections if s not in config['sections'] or s not in grid.section_ids]
+    if missing:
+        raise ValueError(f"Unknown section(s): {', '.join(missing)}")
+    occupancy = build_occupancy(config, grid)
+    slot_bits = occupancy.slot_bits
+    blocks = theory_blocks(config)
+    allowed_days = {0} | {occupancy.mask(block) for block in blocks.values()}
+
+    found = []
+    if rules & {"teacher_clash", "room_clash"}:
+        found += [v for v in find_clashes(occupancy, set(sections)) if v['rule'] in rules]
+    if "recess" in rules:
+        found += find_recess(occupancy, set(sections))
+
+    for section in sections:
+        core_subjects = config['core_subjects'][section]
+        subject_count = {subject: 0 for subject in core_subjects}
+        lab_count = {(lab, g): 0 for lab in config['labs'].get(section, []) for g in groups}
+
+        for day in days:
+            theory_mask = 0
+            theory_subjects = []
+            lab_cells = {}
+            for slot in slots:
+                status = grid.status(day, slot, section)
+                if status == "To Be Assigned" and "unassigned" in rules:
+                    found.append(violation("unassigned", f"{section} {day} {slot} is still 'To Be Assigned'",
+                                           section=section, day=day, slot=slot))
+                if status != "Assigned":
+                    continue
+                subject = grid.get('subject', day, slot, section) or ''
+                if "(G-" in subject:
+                    lab_cells[slot] = (subject, grid.get('teacher', day, slot, section),
+                                       grid.get('room', day, slot, section))
+                else:
+                    theory_mask |= slot_bits[slot]
+                    theory_subjects.append(subject)
+
+            for subject in theory_subjects:
+                if subject in subject_count:
+                    subject_count[subject] += 1
+
+            if "daily_limit" in rules:
+                repeated = sorted({s for s in theory_subjects if s in subject_count and theory_subjects.count(s) > 1})
+                for subject in repeated:
+                    found.append(violation("daily_limit", f"{section} has {subject} {theory_subjects.count(subject)} "
+                                           f"times on {day}", section=section, day=day, name=subject))
+                if len(theory_subjects) > MAX_THEORY_PER_DAY:
+                    found.append(violation("daily_limit", f"{section} has {len(theory_subjects)} theory classes on "
+                                           f"{day} (at most {MAX_THEORY_PER_DAY})", section=section, day=day))
+
+            if "block" in rules and theory_mask not in allowed_days:
+                taken = [slot for slot in slots if theory_mask & slot_bits[slot]]
+                found.append(violation("block", f"{section} {day}: theory in {', '.join(taken)} is not one of the "
+                                       f"allowed blocks ({', '.join(blocks)})", section=section, day=day))
+
+            lab_violations, windows = check_labs(config, section, day, lab_cells)
+            if "lab_parallelism" in rules:
+                found += lab_violations
+            for _, labs in windows:
+                for key in labs:
+                    if key in lab_count:
+                        lab_count[key] += 1
+
+        if "frequency" in rules:
+            for subject, n in subject_count.items():
+                if n != CLASSES_PER_SUBJECT:
+                    found.append(violation("frequency", f"{section} has {subject} {n} times a week "
+                                           f"(needs {CLASSES_PER_SUBJECT})", section=section, name=subject))
+            for (lab, group), n in lab_count.items():
+                if n != 1:
+                    found.append(violation("frequency", f"{section} group {group} has {lab} {n} times a week "
+                                           f"(needs 1)", section=section, name=lab, group=group))
+    return found
+
+
+def report(violations, path, elapsed):
+    """Prints the verification result."""
+    if violations:
+        print(f"❌ {len(violations)} violation(s) in {path}:")
+        for v in violations:
+            print(f"  ✗ [{v['rule']}] {v['message']}")
+    else:
+        print(f"✅ {path} verified in {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a solved timetable against the hard rules.")
+    parser.add_argument('--sections', nargs='+', help="Sections to check (default: all sections in config.json)")
+    parser.add_argument('--rules', nargs='+', choices=RULES, metavar='RULE',
+                        help=f"Rules to check (default: all of {', '.join(RULES)})")
+    parser.add_argument('--config', default='config.json')
+    parser.add_argument('--data', default='updated_timetable.json')
+    parser.add_argument('--report', help="Write the violations to this JSON Lines file")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        with open(args.data, 'r') as f:
+            timetable = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Error: Could not load input. {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    try:
+        violations = verify_timetable(config, timetable, args.sections, args.rules)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    report(violations, args.data, time.perf_counter() - start)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write("".join(json.dumps(v) + "\n" for v in violations))
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
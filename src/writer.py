@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# writer.py
+"""
+Writes solved timetables without copying them.
+
+The engine keeps the input timetable untouched and lets the solution
+replace whole cells in shallow copies of its rows (see share_rows() in
+engine.py), so the solved cells form a sparse overlay on the input:
+every cell that is not the very same object as in the input was solved.
+
+write_timetable() streams base + overlay to disk row by row, in the same
+layout as json.dump(indent=2), through a temporary file that is renamed
+into place, so readers never see a half-written timetable. If orjson is
+installed it encodes the rows. write_patch() writes only the changed
+slots as an RFC 6902 JSON Patch against the input.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def overlay_of(base_data, timetable_data):
+    """Returns {(day, list index, slot): cell} of the cells timetable_data replaced in base_data."""
+    overlay = {}
+    for day, rows in timetable_data.items():
+        base_rows = base_data.get(day, [])
+        for i, row in enumerate(rows):
+            base_row = base_rows[i] if i < len(base_rows) else {}
+            for slot, cell in row.items():
+                if slot != 'section' and cell is not base_row.get(slot):
+                    overlay[day, i, slot] = cell
+    return overlay
+
+
+def encode(value, fast=True):
+    """Encodes a value like json.dumps(indent=2), with orjson when available and fast is set."""
+    if fast and orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(value, indent=2)
+
+
+def iter_json(base_data, overlay, fast=True):
+    """Yields the text of base_data with the overlay cells swapped in, one row at a time."""
+    yield "{"
+    for d, (day, rows) in enumerate(base_data.items()):
+        yield ("," if d else "") + f"\n  {json.dumps(day)}: "
+        if not rows:
+            yield "[]"
+            continue
+        yield "["
+        for i, row in enumerate(rows):
+            merged = {slot: overlay.get((day, i, slot), cell) if slot != 'section' else cell
+                      for slot, cell in row.items()}
+            text = encode(merged, fast).replace("\n", "\n    ")
+            yield ("," if i else "") + "\n    " + text
+        yield "\n  ]"
+    yield "\n}" if base_data else "}"
+
+
+def write_atomic(path, chunks):
+    """Writes text chunks to a temporary file and renames it over path."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def write_timetable(path, base_data, overlay=None, fast=True):
+    """Streams base_data plus an overlay ({(day, list index, slot): cell}) to path atomically."""
+    write_atomic(path, iter_json(base_data, overlay or {}, fast))
+
+
+def json_patch(overlay):
+    """Returns the overlay as RFC 6902 "replace" operations, in (day, row, slot) order."""
+    def pointer(*parts):
+        return "".join("/" + str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+    return [{'op': "replace", 'path': pointer(day, i, slot), 'value': cell}
+            for (day, i, slot), cell in overlay.items()]
+
+
+def write_patch(path, overlay, fast=True):
+    """Writes the changed slots as a JSON Patch document atomically."""
+    write_atomic(path, [encode(json_patch(overlay), fast) + "\n"])
@@ -0,0 +1,39 @@
+"""
+Shared fixtures. The tools in src/ are flat scripts that import each other
+by module name, so src/ is put on sys.path here.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+
+def load(name):
+    with open(os.path.join(SRC_DIR, name), 'r') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def config():
+    return load("config.json")
+
+
+@pytest.fixture
+def data():
+    return load("data.json")
+
+
+@pytest.fixture(scope="session")
+def solved(tmp_path_factory):
+    """Solves src/data.json once: returns (output path, patch path)."""
+    from engine import run
+    out_dir = tmp_path_factory.mktemp("solved")
+    output_path, patch_path = str(out_dir / "updated_timetable.json"), str(out_dir / "solved.patch.json")
+    assert run(config_path=os.path.join(SRC_DIR, "config.json"), data_path=os.path.join(SRC_DIR, "data.json"),
+               output_path=output_path, patch_path=patch_path, profile_path=None)
+    return output_path, patch_path
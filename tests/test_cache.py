@@ -0,0 +1,83 @@
+import copy
+import json
+
+import pytest
+
+import cache
+from engine import solve_sections
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return {'dir': str(tmp_path / "cache"), 'max_mb': cache.DEFAULT_MAX_MB}
+
+
+def solve(config, data, cache_dir, hint_data=None):
+    """Solves every section; returns (timetable, metrics)."""
+    timetable = copy.deepcopy(data)
+    metrics = {}
+    status, solution = solve_sections(config, timetable, list(config['sections']), hint_data=hint_data,
+                                      metrics=metrics, cache=cache_dir, solver_params="")
+    assert solution is not None
+    return timetable, metrics
+
+
+def test_identical_run_reuses_the_solution(config, data, cache_dir, capsys):
+    first, metrics = solve(config, data, cache_dir)
+    assert 'cached_solution' not in metrics
+    second, metrics = solve(config, data, cache_dir)
+    assert metrics['cached_solution']
+    assert second == first
+    assert "Cache: reusing the solution of an identical run" in capsys.readouterr().out
+
+
+def test_hints_reuse_the_instance_and_model(config, data, cache_dir, capsys):
+    first, _ = solve(config, data, cache_dir)
+    capsys.readouterr()
+    # Hints are part of the solution key only: the model is reloaded from disk and hinted
+    _, metrics = solve(config, data, cache_dir, hint_data=first)
+    out = capsys.readouterr().out
+    assert 'cached_solution' not in metrics
+    assert "Cache: reusing the compiled instance" in out and "Cache: reusing the built model" in out
+    assert "Hints kept: 138 of 138" in out
+
+
+def test_changed_input_misses(config, data, cache_dir, capsys):
+    solve(config, data, cache_dir)
+    capsys.readouterr()
+    config['settings']['solver_timeout_seconds'] += 1
+    _, metrics = solve(config, data, cache_dir)
+    assert 'cached_solution' not in metrics
+    assert "Cache: reusing" not in capsys.readouterr().out
+
+
+def test_engine_version_change_misses(config, data, cache_dir, capsys, monkeypatch):
+    solve(config, data, cache_dir)
+    capsys.readouterr()
+    monkeypatch.setattr(cache, "_engine_version", "0" * 16)
+    _, metrics = solve(config, data, cache_dir)
+    assert 'cached_solution' not in metrics
+    assert "Cache: reusing" not in capsys.readouterr().out
+
+
+def test_engine_version_follows_the_sources(tmp_path, monkeypatch):
+    source = tmp_path / "engine.py"
+    source.write_text("VERSION = 1\n")
+    monkeypatch.setattr(cache, "ENGINE_SOURCES", [str(source)])
+    monkeypatch.setattr(cache, "_engine_version", None)
+    before = cache.engine_version()
+    source.write_text("VERSION = 2\n")
+    monkeypatch.setattr(cache, "_engine_version", None)
+    assert cache.engine_version() != before
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache_dir = str(tmp_path)
+    for i in range(3):
+        cache.store_pickle(cache_dir, "solution", f"key{i}", json.dumps([i] * 200_000))
+    assert cache.load_pickle(cache_dir, "solution", "key0") is not None
+    sizes = sorted(size for _, size, _ in cache.entries(cache_dir))
+    # Room for two entries: key1 was used least recently
+    assert cache.evict(cache_dir, max_mb=(sizes[0] + sizes[1]) / 1024 / 1024) == 1
+    assert cache.load_pickle(cache_dir, "solution", "key1") is None
+    assert cache.load_pickle(cache_dir, "solution", "key0") is not None
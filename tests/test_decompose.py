@@ -0,0 +1,37 @@
+import json
+
+from engine import resource_components, solve_decomposed
+from verify import verify_timetable
+
+
+def without_labs(config, sections):
+    config = json.loads(json.dumps(config))
+    for section in sections:
+        config['labs'][section] = []
+    return config
+
+
+def test_shared_lab_rooms_link_sections(config, data):
+    # Every section can still put a lab into the same lab rooms at the same hours
+    assert resource_components(config, data, config['sections']) == [list(config['sections'])]
+
+
+def test_sections_without_open_labs_split(config, data):
+    config = without_labs(config, ["CSE-7", "IT-7"])
+    components = resource_components(config, data, config['sections'])
+    assert components == [["CSE-A-3", "CSE-B-3", "CSE-AIML-3", "CSE-5", "CSE-AI-ML-5"], ["CSE-7"], ["IT-7"]]
+
+
+def test_pre_assigned_labs_unlink_sections(config, solved):
+    # In a solved timetable every lab is placed, so no section can take another's lab room
+    with open(solved[0]) as f:
+        timetable = json.load(f)
+    assert resource_components(config, timetable, config['sections']) == [[s] for s in config['sections']]
+
+
+def test_decomposed_solve_is_valid(config, data):
+    config = without_labs(config, ["CSE-7", "IT-7"])
+    status, solution = solve_decomposed(config, data, list(config['sections']), solver_params="")
+    assert solution is not None
+    rules = ["teacher_clash", "room_clash", "frequency", "lab_parallelism", "unassigned"]
+    assert verify_timetable(config, data, rules=rules) == []
@@ -0,0 +1,40 @@
+import copy
+
+import pytest
+from ortools.sat.python import cp_model
+
+from engine import add_hints, build_instance, build_model, prune_domains, read_hints, solve_sections
+from verify import verify_timetable
+
+RULES = ["teacher_clash", "room_clash", "frequency", "lab_parallelism", "unassigned"]
+
+
+def solve(config, data, formulation, resources):
+    timetable = copy.deepcopy(data)
+    status, solution = solve_sections(config, timetable, list(config['sections']), formulation, resources,
+                                      solver_params="")
+    assert solution is not None
+    return timetable
+
+
+def accepts(config, data, formulation, resources, timetable):
+    """True if the model of this formulation allows every cell of a solved timetable."""
+    inst = build_instance(config, data, list(config['sections']))
+    prune_domains(inst, verbose=False)
+    model, variables = build_model(inst, formulation, resources)
+    hints = read_hints(inst, timetable)
+    assert len(hints['theory']) == len(inst['theory_domains'])
+    add_hints(model, inst, variables, hints)
+    solver = cp_model.CpSolver()
+    solver.parameters.fix_variables_to_their_hinted_value = True
+    return solver.Solve(model) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+@pytest.mark.parametrize("formulation, resources", [("bool", "slot"), ("int", "interval"), ("bool", "interval")])
+def test_formulation_matches_int(config, data, formulation, resources):
+    # Each model accepts the other's timetable, so they allow the same solutions here
+    reference = solve(config, data, "int", "slot")
+    other = solve(config, data, formulation, resources)
+    assert verify_timetable(config, other, rules=RULES) == []
+    assert accepts(config, data, formulation, resources, reference)
+    assert accepts(config, data, "int", "slot", other)
@@ -0,0 +1,10 @@
+from grid import TimetableGrid
+
+
+def test_to_json_round_trips_data(config, data):
+    grid = TimetableGrid.from_json(data, config['settings']['days'], config['settings']['all_slots'])
+    assert grid.to_json() == data
+
+
+def test_to_json_round_trips_without_config(data):
+    assert TimetableGrid.from_json(data).to_json() == data
@@ -0,0 +1,89 @@
+"""
+Warm starts: --hint-from hints every open variable, the solve keeps the
+hinted timetable, and the presolve crash that keep_all_feasible_solutions_in_presolve
+avoids on hinted solves is still there.
+"""
+
+import copy
+import json
+
+import pytest
+from ortools.sat.python import cp_model
+
+from engine import add_hints, build_instance, build_model, count_kept_hints, prune_domains, read_hints
+from engine import solve_sections
+
+
+def reproducer():
+    """The smallest model found from `incremental.py --room B-209 --day Tuesday` that still crashes."""
+    model = cp_model.CpModel()
+    x = [model.NewIntVar(0, 3, f"x{i}") for i in range(3)]
+    x += [model.NewIntVarFromDomain(cp_model.Domain.FromValues([0, 1, 4]), f"x{i}") for i in range(3, 7)]
+    x += [model.NewConstant(4) for _ in range(7, 11)]
+    x += [model.NewBoolVar(f"x{i}") for i in range(11, 30)]
+    x += [model.NewConstant(c) for c in (13, 27, 15, 10, 30, 26, 19)]
+    for i in range(37, 52):
+        values = [14, 17, 32, 33] if i in (37, 42, 47) else list(range(34))
+        x.append(model.NewIntVarFromDomain(cp_model.Domain.FromValues(values), f"x{i}"))
+    model.Add(x[0] != 0).OnlyEnforceIf(x[11].Not())
+    model.Add(x[1] != 0).OnlyEnforceIf(x[13].Not())
+    model.Add(x[2] != 0).OnlyEnforceIf(x[14].Not())
+    model.Add(sum(x[11:15]) == 1)
+    model.AddLinearExpressionInDomain(x[6], cp_model.Domain.FromIntervals([[-100, 0], [2, 100]])).OnlyEnforceIf(
+        x[20].Not())
+    model.Add(sum(x[15:30]) == 0)
+    theory = [33, 14, 17, 32]
+    for first, cells, fixed in ((37, (0, 3, 4, 7, 8), [32]), (42, (1, 5, 6, 9, 10), [31, 30, 35, 36]),
+                                (47, (2, 5, 6, 9, 10), [33, 34, 35, 36])):
+        options = [theory, [1, 24, 29, 2, 4], [1, 24, 29, 2, 5], theory + [6], theory + [7]]
+        for target, index, opts in zip(range(first, first + 5), cells, options):
+            model.AddElement(x[index], opts, x[target])
+        model.AddAllDifferent([x[i] for i in fixed + list(range(first, first + 5))])
+    for i, value in zip([0, 2, 37, 47], [0, 1, 33, 14]):
+        model.AddHint(x[i], value)
+    return model
+
+
+def test_hinted_add_element_crash_is_avoided():
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = 1
+    try:
+        solver.Solve(reproducer())
+    except IndexError:
+        pass
+    else:
+        pytest.fail("CP-SAT no longer crashes on hinted AddElement targets: update the comment in solve_sections()")
+    solver.parameters.keep_all_feasible_solutions_in_presolve = True
+    assert solver.Solve(reproducer()) == cp_model.OPTIMAL
+
+
+@pytest.mark.parametrize("formulation", ["int", "bool"])
+def test_hint_is_complete_and_feasible(config, data, solved, formulation):
+    with open(solved[0], 'r') as f:
+        prior = json.load(f)
+    inst = build_instance(config, data, list(config['sections']))
+    prune_domains(inst, verbose=False)
+    model, variables = build_model(inst, formulation)
+    add_hints(model, inst, variables, read_hints(inst, prior))
+    proto = model.Proto()
+    open_vars = {i for i, v in enumerate(proto.variables) if not (len(v.domain) == 2 and v.domain[0] == v.domain[1])}
+    assert open_vars <= set(proto.solution_hint.vars)
+
+    solver = cp_model.CpSolver()
+    solver.parameters.fix_variables_to_their_hinted_value = True
+    assert solver.Solve(model) in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def test_solve_keeps_every_hint(config, data, solved, capsys):
+    with open(solved[0], 'r') as f:
+        prior = json.load(f)
+    timetable = copy.deepcopy(data)
+    status, solution = solve_sections(config, timetable, list(config['sections']), hint_data=prior,
+                                      solver_params="")
+    assert status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    inst = build_instance(config, data, list(config['sections']))
+    prune_domains(inst, verbose=False)
+    hints = read_hints(inst, prior)
+    total = len(hints['theory']) + len(hints['labs'])
+    assert total and count_kept_hints(hints, solution) == total
+    assert f"Hints kept: {total} of {total}" in capsys.readouterr().out
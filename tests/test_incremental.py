@@ -0,0 +1,38 @@
+import json
+
+from incremental import neighborhoods, resolve_edit
+from verify import verify_timetable
+
+
+def row(data, day, section):
+    return next(r for r in data[day] if r['section'] == section)
+
+
+def test_neighborhoods_widen_to_sharing_sections(config):
+    days = config['settings']['days']
+    levels = list(neighborhoods(config, {("CSE-A-3", "Monday")}))
+    assert levels[0] == {("CSE-A-3", "Monday")}
+    assert levels[1] == {("CSE-A-3", d) for d in days}
+    # CSE-B-3 shares room B-209 with CSE-A-3
+    assert {s for s, _ in levels[2]} >= {"CSE-A-3", "CSE-B-3"}
+    assert levels[-1] == {(s, d) for s in config['sections'] for d in days}
+
+
+def test_edit_that_moves_a_class_to_another_day_widens(config, data, solved, capsys):
+    with open(solved[0]) as f:
+        prior = json.load(f)
+    # CSE-B-3 has one open cell on Monday; its teacher becomes busy then, so that subject
+    # has to move to a day it is not taught yet, which the first neighborhood keeps fixed
+    assert [s for s, c in row(data, "Monday", "CSE-B-3").items()
+            if s != 'section' and c[0]['status'] == "To Be Assigned"] == ["11-12"]
+    teacher = row(prior, "Monday", "CSE-B-3")["11-12"][0]['teacher']
+    other = next(r for r in data["Monday"] if r['section'] != "CSE-B-3" and r["11-12"][0]['status'] == "Free")
+    other["11-12"] = [{'status': "Assigned", 'subject': "Seminar", 'teacher': teacher, 'room': "X-001"}]
+
+    result = resolve_edit(config, data, prior, teachers=[teacher])
+    out = capsys.readouterr().out
+    assert "✗ Neighborhood 1 could not be solved, widening..." in out
+    assert "✅ Re-solved neighborhood 2" in out
+    assert row(result, "Monday", "CSE-B-3")["11-12"][0]['teacher'] != teacher
+    rules = ["teacher_clash", "room_clash", "frequency", "lab_parallelism", "unassigned"]
+    assert verify_timetable(config, result, rules=rules) == []
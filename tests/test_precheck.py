@@ -0,0 +1,38 @@
+from precheck import run_precheck
+
+
+def row(data, day, section):
+    return next(r for r in data[day] if r['section'] == section)
+
+
+def test_shipped_data_passes(config, data):
+    assert run_precheck(config, data) == []
+
+
+def test_unknown_section(config, data):
+    assert run_precheck(config, data, ["CSE-9"]) == ["Unknown section(s): CSE-9"]
+
+
+def test_extra_tba_slot(config, data):
+    cells = row(data, "Monday", "CSE-A-3")
+    slot = next(s for s in config['settings']['all_slots'] if cells[s][0]['status'] == "Free")
+    cells[slot] = [{'status': "To Be Assigned"}]
+    reasons = run_precheck(config, data, ["CSE-A-3"])
+    assert any(r.startswith("CSE-A-3: 13 'To Be Assigned' slots but 12 theory classes are needed") for r in reasons)
+
+
+def test_theory_room_taken(config, data):
+    # CSE-B-3 shares room B-209 and is free while CSE-A-3 waits for a class
+    assert row(data, "Monday", "CSE-A-3")["9-10"][0]['status'] == "To Be Assigned"
+    row(data, "Monday", "CSE-B-3")["9-10"] = [{'status': "Assigned", 'subject': "DS", 'teacher': "SK", 'room': "B-209"}]
+    assert "CSE-A-3: room B-209 is already used by CSE-B-3 on Monday 9-10" in run_precheck(config, data)
+
+
+def test_too_few_labs_for_the_groups(config, data):
+    config['labs']['CSE-A-3'] = ["DLD Lab"]
+    assert "CSE-A-3: 1 lab(s) cannot run in parallel for 2 groups" in run_precheck(config, data, ["CSE-A-3"])
+
+
+def test_lab_without_teacher(config, data):
+    config['labs']['CSE-A-3'].append("Robotics Lab")
+    assert "CSE-A-3: no teacher mapped for 'Robotics Lab'" in run_precheck(config, data, ["CSE-A-3"])
@@ -0,0 +1,58 @@
+from engine import LAB_SLOT_MAP, build_instance, prune_domains
+
+
+def instance(config, data):
+    return build_instance(config, data, list(config['sections']))
+
+
+def occupy(data, day, slot, teacher, room, skip):
+    """Makes the first "Free" cell at (day, slot) outside section `skip` an assigned class."""
+    for row in data[day]:
+        if row['section'] != skip and row[slot][0]['status'] == "Free":
+            row[slot] = [{'status': "Assigned", 'subject': "Seminar", 'teacher': teacher, 'room': room}]
+            return row['section']
+    raise AssertionError(f"no free cell at {day} {slot}")
+
+
+def test_shipped_data_prunes_nothing(config, data):
+    removed, impossible_cells = prune_domains(instance(config, data), verbose=False)
+    assert removed == {'theory': 0, 'lab_subject': 0, 'lab_room': 0, 'lab_windows': 0}
+    assert impossible_cells == []
+
+
+def test_busy_teacher_is_removed_from_theory_cells(config, data):
+    before = instance(config, data)
+    teacher = before['teacher_subject_map']['CSE-A-3']['DLD']
+    occupy(data, "Monday", "9-10", teacher, "A-101", skip="CSE-A-3")
+    # Every open cell at that hour loses the subjects this teacher teaches
+    expected = sum(1 for (section, day, slot), domain in before['theory_domains'].items()
+                   if (day, slot) == ("Monday", "9-10")
+                   for subject, index in before['core_subject_map'][section].items()
+                   if index in domain and before['teacher_subject_map'][section][subject] == teacher)
+
+    inst = instance(config, data)
+    removed, impossible_cells = prune_domains(inst, verbose=False)
+    assert expected >= 1 and removed['theory'] == expected
+    assert inst['core_subject_map']['CSE-A-3']['DLD'] not in inst['theory_domains']['CSE-A-3', "Monday", "9-10"]
+    assert impossible_cells == []
+
+
+def test_busy_lab_room_is_removed_from_lab_windows(config, data):
+    before = instance(config, data)
+    room = config['lab_rooms'][0]
+    room_id = before['lab_room_name_to_id'][room]
+    used_by = occupy(data, "Monday", "3-4", "RS2", room, skip=None)
+    expected = sum(1 for (section, day, lab_slot_idx), rooms in before['lab_room_domains'].items()
+                   if day == "Monday" and room_id in rooms and before['lab_subject_domains'][section, day, lab_slot_idx]
+                   and "3-4" in LAB_SLOT_MAP[before['inv_lab_slot_id_to_name'][lab_slot_idx]] and section != used_by)
+
+    removed, _ = prune_domains(instance(config, data), verbose=False)
+    assert expected >= 1 and removed['lab_room'] == expected
+
+
+def test_cell_with_every_teacher_busy_is_impossible(config, data):
+    inst = instance(config, data)
+    for subject in inst['core_subject_map']['CSE-A-3']:
+        occupy(data, "Monday", "9-10", inst['teacher_subject_map']['CSE-A-3'][subject], "A-101", skip="CSE-A-3")
+    _, impossible_cells = prune_domains(instance(config, data), verbose=False)
+    assert ("CSE-A-3", "Monday", "9-10") in impossible_cells
@@ -0,0 +1,52 @@
+import copy
+
+from ortools.sat.python import cp_model
+
+import engine
+from verify import verify_timetable
+
+RULES = ["teacher_clash", "room_clash", "frequency", "lab_parallelism", "unassigned"]
+
+
+def solve(config, data, cache=None):
+    """Solves every section in two phases; returns (timetable, metrics)."""
+    timetable = copy.deepcopy(data)
+    metrics = {}
+    status, solution = engine.solve_two_phase(config, timetable, list(config['sections']), metrics=metrics,
+                                              cache=cache, solver_params="")
+    assert solution is not None
+    return timetable, metrics
+
+
+def test_labs_then_theory(config, data):
+    timetable, metrics = solve(config, data)
+    assert [m['phase'] for m in metrics['phases']] == ["labs", "theory"]
+    assert verify_timetable(config, timetable, rules=RULES) == []
+
+
+def test_lab_phase_is_reused_across_theory_edits(config, data, tmp_path, capsys):
+    cache = {'dir': str(tmp_path), 'max_mb': 256}
+    solve(config, data, cache)
+    # Swapping which core subject is which changes only theory
+    for section in config['sections']:
+        config['core_subjects'][section] = list(reversed(config['core_subjects'][section]))
+    capsys.readouterr()
+    timetable, metrics = solve(config, data, cache)
+    assert "Cache: reusing the lab phase" in capsys.readouterr().out
+    assert [m['phase'] for m in metrics['phases']] == ["theory"]
+    assert verify_timetable(config, timetable, rules=RULES) == []
+
+
+def test_failed_theory_phase_falls_back_to_a_joint_solve(config, data, monkeypatch, capsys):
+    solve_sections = engine.solve_sections
+
+    def theory_fails(*args, phase=None, **kwargs):
+        if phase == "theory":
+            return cp_model.INFEASIBLE, None
+        return solve_sections(*args, phase=phase, **kwargs)
+
+    monkeypatch.setattr(engine, "solve_sections", theory_fails)
+    timetable, metrics = solve(config, data)
+    assert "Phase 2 failed with these labs; falling back to a joint solve" in capsys.readouterr().out
+    assert [m['phase'] for m in metrics['phases']] == ["labs", "theory", "joint"]
+    assert verify_timetable(config, timetable, rules=RULES) == []
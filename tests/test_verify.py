@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from verify import verify_timetable
+
+
+@pytest.fixture
+def timetable(solved):
+    with open(solved[0]) as f:
+        return json.load(f)
+
+
+def theory_cell(timetable):
+    """Returns (day, row index, slot) of the first assigned theory cell."""
+    for day, rows in timetable.items():
+        for i, row in enumerate(rows):
+            for slot, cell in row.items():
+                if slot != 'section' and cell[0]['status'] == "Assigned" and "(G-" not in cell[0]['subject']:
+                    return day, i, slot
+
+
+def test_solved_timetable_passes(config, timetable):
+    # Without --blocks the layout of data.json is kept, so only these rules are the engine's
+    rules = ["teacher_clash", "room_clash", "frequency", "lab_parallelism", "unassigned"]
+    assert verify_timetable(config, timetable, rules=rules) == []
+
+
+def test_clash_and_leftover_tba_are_flagged(config, timetable):
+    day, i, slot = theory_cell(timetable)
+    other = 1 if i == 0 else 0
+    # Another section gets the same teacher and room in the same slot
+    timetable[day][other][slot] = [dict(timetable[day][i][slot][0])]
+    # and one cell is left unsolved
+    timetable[day][i][slot] = [{'status': "To Be Assigned"}]
+
+    rules = {v['rule'] for v in verify_timetable(config, timetable)}
+    assert "unassigned" in rules
+
+    timetable[day][i][slot] = [dict(timetable[day][other][slot][0])]
+    violations = verify_timetable(config, timetable, rules=["teacher_clash", "room_clash"])
+    assert {v['rule'] for v in violations} == {"teacher_clash", "room_clash"}
+    assert all(v['day'] == day and v['slot'] == slot for v in violations)
+
+
+def test_unknown_section_is_rejected(config, timetable):
+    with pytest.raises(ValueError):
+        verify_timetable(config, timetable, sections=["NOPE-1"])
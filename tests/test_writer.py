@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from engine import share_rows
+from writer import overlay_of, write_timetable
+
+
+def apply_patch(document, patch):
+    """Applies the "replace" operations of an RFC 6902 JSON Patch in place."""
+    for op in patch:
+        assert op['op'] == "replace"
+        parts = [p.replace("~1", "/").replace("~0", "~") for p in op['path'].split("/")[1:]]
+        target = document
+        for part in parts[:-1]:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        target[parts[-1]] = op['value']
+    return document
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_write_timetable_matches_json_dumps(tmp_path, data, fast):
+    solved = share_rows(data)
+    first_day = next(iter(solved))
+    solved[first_day][0]['9-10'] = [{'status': "Assigned", 'subject': "DS", 'teacher': "T / U", 'room': "B-101"}]
+    path = tmp_path / "out.json"
+
+    write_timetable(str(path), data, overlay_of(data, solved), fast)
+
+    assert path.read_text() == json.dumps(solved, indent=2)
+    assert not (tmp_path / "out.json.tmp").exists()
+
+
+def test_write_timetable_without_overlay(tmp_path, data):
+    path = tmp_path / "out.json"
+    write_timetable(str(path), data)
+    assert path.read_text() == json.dumps(data, indent=2)
+
+
+def test_patch_applied_to_input_gives_solved_file(data, solved):
+    output_path, patch_path = solved
+    with open(output_path) as f:
+        expected = json.load(f)
+    with open(patch_path) as f:
+        patch = json.load(f)
+
+    assert patch
+    assert apply_patch(data, patch) == expected